@@ -1,3 +1,6 @@
+import sys
+import importlib
+
 import dspace.SWIG as __c_toolbox__
 from dspace.models.base import Equations
 from dspace.models.gma import GMASystem
@@ -6,7 +9,26 @@ from dspace.models.designspace import DesignSpace
 from dspace.models.case import Case, CaseIntersection, CaseColocalization
 from dspace.variables import VariablePool
 from dspace.expressions import Expression
-from dspace.models.fullsystem import FullSystem
+from dspace.profiling import profile, Profile
+
+# FullSystem loads scipy, IPython and assimulo, so it is imported when first
+# used. The plotting methods of dspace.plotutils are loaded in the same way by
+# Model.__getattr__.
+_lazy_attributes = {'FullSystem':'dspace.models.fullsystem'}
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name not in _lazy_attributes:
+            raise AttributeError("module 'dspace' has no attribute '" + name + "'")
+        module = importlib.import_module(_lazy_attributes[name])
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(list(globals().keys()) + list(_lazy_attributes.keys()))
+else:
+    from dspace.models.fullsystem import FullSystem
 
 
 
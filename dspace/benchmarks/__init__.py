@@ -0,0 +1,22 @@
+''' Benchmarks of the design space pipeline.
+
+The suite times the construction of design spaces, the enumeration of valid
+cases, the drawing of slices and steady state functions, the volume of cases
+and the simulation of the full system, for the models of dspace.examples and
+for synthetic networks of increasing size. It is run with
+
+    python -m dspace.benchmarks --output results.json
+
+and two result files are compared with
+
+    python -m dspace.benchmarks --compare baseline.json results.json
+
+The time taken by import dspace, and the optional packages it loads, are
+checked against a budget with
+
+    python -m dspace.benchmarks --imports
+'''
+
+from dspace.benchmarks.models import BenchmarkModel, benchmark_models, example_models, synthetic_models
+from dspace.benchmarks.suite import Benchmark, benchmarks, measure, run, compare
+from dspace.benchmarks.imports import check_import_budget
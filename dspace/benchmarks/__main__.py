@@ -0,0 +1,68 @@
+''' Command line interface of the benchmark suite. '''
+
+import sys
+import json
+import argparse
+
+from dspace.benchmarks.models import benchmark_models
+from dspace.benchmarks.suite import benchmarks, run, compare
+from dspace.benchmarks.imports import IMPORT_BUDGET, check_import_budget, format_import_check
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m dspace.benchmarks',
+                                     description='Benchmarks of the design space pipeline.')
+    parser.add_argument('-o', '--output',
+                        help='write the results to this JSON file')
+    parser.add_argument('-k', '--filter', action='append', dest='patterns',
+                        help='run the benchmarks whose names contain this string; may be repeated')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='number of times each benchmark is timed (default: 3)')
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=[2, 3, 4],
+                        help='sizes of the synthetic networks (default: 2 3 4)')
+    parser.add_argument('--no-isolate', action='store_true',
+                        help='run every benchmark in this process')
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET,
+                        help='largest acceptable time to import dspace, in seconds (default: %(default)s)')
+    parser.add_argument('--imports', action='store_true',
+                        help='only check the time to import dspace and the modules it loads')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='compare two result files and exit')
+    args = parser.parse_args(argv)
+
+    if args.compare is not None:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        for name, previous, time, ratio in compare(baseline, current):
+            print('%-60s %10.4f s %10.4f s %8.2fx' % (name, previous, time, ratio))
+        return 0
+
+    if args.imports is True:
+        result = check_import_budget(budget=args.import_budget, repeat=args.repeat)
+        print(format_import_check(result))
+        return 0 if result['passed'] is True else 1
+
+    models = benchmark_models(sizes=args.sizes)
+    if args.list is True:
+        for benchmark in benchmarks(models=models):
+            print(benchmark.name)
+        return 0
+
+    report = run(patterns=args.patterns,
+                 repeat=args.repeat,
+                 isolate=not args.no_isolate,
+                 models=models,
+                 output=args.output,
+                 import_budget=args.import_budget)
+    failed = [i for i in report['results'] if i['error'] is not None]
+    if len(failed) > 0 or report['imports']['passed'] is False:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
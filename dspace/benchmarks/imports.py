@@ -0,0 +1,96 @@
+''' The import time budget of the dspace package.
+
+Importing dspace should only load the design space models and the C library.
+The full system, the plotting utilities, the display widgets and the graphs,
+and the packages they depend on, are loaded when first used. Each check
+imports the package in a new interpreter, so that the modules already loaded
+by the caller do not affect the result.
+'''
+
+import sys
+import json
+import subprocess
+
+IMPORT_BUDGET = 1.0
+
+HEAVY_MODULES = ['scipy',
+                 'matplotlib',
+                 'mpl_toolkits',
+                 'IPython',
+                 'ipywidgets',
+                 'assimulo',
+                 'pandas',
+                 'dspace.models.fullsystem',
+                 'dspace.plotutils',
+                 'dspace.display',
+                 'dspace.graphs']
+
+_script = '''
+import sys
+import json
+from timeit import default_timer
+start = default_timer()
+import %(module)s
+elapsed = default_timer() - start
+try:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak = peak // 1024
+except ImportError:
+    peak = None
+heavy = %(heavy)r
+loaded = [i for i in heavy if i in sys.modules]
+sys.stdout.write(json.dumps(dict(time=elapsed, peak_rss_kb=peak, heavy_modules=loaded)))
+'''
+
+
+def import_time(module='dspace'):
+    ''' Imports a module in a new interpreter.
+
+    Returns:
+        A dictionary with the time taken by the import, in seconds, the peak
+        resident set size of the interpreter, in kilobytes, and the heavy
+        modules that were loaded.
+    '''
+    script = _script % dict(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', script])
+    return json.loads(output.decode('utf-8'))
+
+
+def check_import_budget(budget=IMPORT_BUDGET, module='dspace', repeat=3):
+    ''' Checks that importing a module takes less than budget seconds and
+        loads none of the heavy modules.
+
+    Kwargs:
+        budget (float): The largest acceptable import time, in seconds. The
+            fastest of the repetitions is compared to it.
+        module (str): The module imported.
+        repeat (int): The number of times the module is imported.
+
+    Returns:
+        A dictionary with the time of each import, the peak resident set size
+        of the fastest one, the heavy modules loaded, the budget and whether
+        the check passed.
+    '''
+    results = [import_time(module=module) for i in range(repeat)]
+    fastest = min(results, key=lambda result: result['time'])
+    heavy = sorted(set(i for result in results for i in result['heavy_modules']))
+    return dict(module=module,
+                times=[result['time'] for result in results],
+                min=fastest['time'],
+                peak_rss_kb=fastest['peak_rss_kb'],
+                heavy_modules=heavy,
+                budget=budget,
+                passed=fastest['time'] <= budget and len(heavy) == 0)
+
+
+def format_import_check(result):
+    ''' A description of the result of check_import_budget. '''
+    string = 'import %s: %.4f s (budget %.4f s)' % (result['module'], result['min'], result['budget'])
+    if result['peak_rss_kb'] is not None:
+        string += ', rss %d kB' % result['peak_rss_kb']
+    if len(result['heavy_modules']) > 0:
+        string += ', loaded ' + ', '.join(result['heavy_modules'])
+    string += ': ' + ('passed' if result['passed'] is True else 'FAILED')
+    return string
@@ -0,0 +1,220 @@
+''' Models used by the benchmark suite.
+
+The models of dspace.examples are reproduced here because the example scripts
+run their analyses and open figures when imported. The synthetic networks are
+generalized mass action systems whose size is set by the number of dependent
+variables, so that the cost of each step can be followed as systems grow.
+'''
+
+
+class BenchmarkModel(object):
+    ''' A system of equations with the reference parameter set and the slice
+        used by the benchmarks.
+    '''
+
+    def __init__(self, name, equations, x_variable, y_variable,
+                 parameters=None,
+                 auxiliary_variables=None,
+                 function=None,
+                 resolve_cycles=False,
+                 resolve_codominance=False,
+                 simulate=False,
+                 range_x=[1e-3, 1e3],
+                 range_y=[1e-3, 1e3]):
+        ''' Init method for a benchmark model.
+
+        Args:
+            name (str): The name of the model, used to name the benchmarks.
+            equations (list): The equations of the system, as strings.
+            x_variable (str): The independent variable on the x-axis.
+            y_variable (str): The independent variable on the y-axis.
+
+        Kwargs:
+            parameters (dict): Values of the independent variables. Variables
+                not in the dictionary take a value of 1.
+            auxiliary_variables (list): The auxiliary variables of the system.
+            function (str): The function of the steady state drawn by
+                draw_2D_ss_function. Defaults to the logarithm of the first
+                dependent variable.
+            resolve_cycles (bool): If the cycles of the system are resolved
+                by the benchmarks that resolve cycles.
+            resolve_codominance (bool): If the codominant phenotypes of the
+                system are resolved by the benchmarks that resolve cycles.
+            simulate (bool): If the system is used by the benchmarks of the
+                full system.
+            range_x (list): The range of the x-axis.
+            range_y (list): The range of the y-axis.
+        '''
+        setattr(self, 'name', name)
+        setattr(self, 'equations', list(equations))
+        setattr(self, 'x_variable', x_variable)
+        setattr(self, 'y_variable', y_variable)
+        setattr(self, 'parameters', dict(parameters) if parameters is not None else dict())
+        setattr(self, 'auxiliary_variables', list(auxiliary_variables) if auxiliary_variables is not None else list())
+        setattr(self, 'function', function)
+        setattr(self, 'resolve_cycles', resolve_cycles)
+        setattr(self, 'resolve_codominance', resolve_codominance)
+        setattr(self, 'simulate', simulate)
+        setattr(self, 'range_x', range_x)
+        setattr(self, 'range_y', range_y)
+
+    def __repr__(self):
+        return 'BenchmarkModel(' + self.name + ')'
+
+    def equations_object(self):
+        import dspace
+        return dspace.Equations(self.equations,
+                                auxiliary_variables=self.auxiliary_variables)
+
+    def design_space(self, resolve_cycles=False, resolve_codominance=False):
+        ''' Constructs the design space of the model, bypassing the design
+            space cache.
+        '''
+        import dspace
+        return dspace.DesignSpace(self.equations_object(),
+                                  resolve_cycles=resolve_cycles,
+                                  resolve_codominance=resolve_codominance,
+                                  cache=False,
+                                  name=self.name)
+
+    def parameter_values(self, ds):
+        ''' The reference parameter set of the model, as a VariablePool. '''
+        import dspace
+        pvals = dspace.VariablePool(names=ds.independent_variables)
+        for name in ds.independent_variables:
+            pvals[name] = self.parameters.get(name, 1.)
+        return pvals
+
+    def p_bounds(self, ds):
+        ''' Bounds with the slice variables in their ranges and the remaining
+            variables fixed at their reference values.
+        '''
+        bounds = dict()
+        for name in ds.independent_variables:
+            bounds[name] = self.parameters.get(name, 1.)
+        bounds[self.x_variable] = list(self.range_x)
+        bounds[self.y_variable] = list(self.range_y)
+        return bounds
+
+    def ss_function(self, ds):
+        if self.function is not None:
+            return self.function
+        return 'log(' + sorted(ds.dependent_variables)[0] + ')'
+
+
+def example_models():
+    ''' The models of examples 1 to 7. '''
+    models = list()
+    models.append(BenchmarkModel('example_1',
+                                 ['X1. = alpha*X1*X2*X3*X4 + X1*X2 - X1',
+                                  'X2. = alpha^-1*X1*X2*X3*X4 + X1*X2 - X2'],
+                                 'X3', 'X4',
+                                 parameters={'alpha':10}))
+    models.append(BenchmarkModel('example_2',
+                                 ['X1. = alpha*X5 + X1*X2 - alpha*X1*X3*X4^-1 - X1',
+                                  'X2. = (1/alpha)*X5 + X1*X2 - (1/alpha)*X2*X3*X4^-1 - X2',
+                                  'X5 = X1*X2*X3*X4'],
+                                 'X3', 'X4',
+                                 parameters={'alpha':10},
+                                 auxiliary_variables=['X5']))
+    models.append(BenchmarkModel('example_3',
+                                 ['X1. = 1000*X1^2*X2^-1 + 100*X2^-1 - X1*X3*X4',
+                                  'X2. = X1^2 + 1000 - X2'],
+                                 'X3', 'X4'))
+    models.append(BenchmarkModel('example_4',
+                                 ['X1. = 10*X1*X2*X3*X4 + X1*X2 - X1',
+                                  'X2. = (1/10)*X1*X2*X3*X4 + X1*X2 - X2'],
+                                 'X3', 'X4',
+                                 function='log(X1)'))
+    models.append(BenchmarkModel('example_5',
+                                 ['X1. = a1 + a2*X3 - b1*X1',
+                                  'X2. = a3*X1 + a2*X3^2 - b2*X2'],
+                                 'X3', 'a1',
+                                 parameters={'a1':1, 'a2':1, 'b1':1e-3,
+                                             'b2':1e-3, 'a3':1e-3, 'X3':100},
+                                 simulate=True))
+    models.append(BenchmarkModel('example_6',
+                                 ['X1. = alpha*X5 + 2*k41*X4 + 4*gamma*X2^2 - 2*X1^2',
+                                  'X2. = X1^2 + k32*X3 - X2*X8 - X2*X7 - 2*gamma*X2^2',
+                                  'X3. = X2*X8 - k34*X3*X6 - k32*X3',
+                                  'X4. = k34*X3*X6 + X2*X7 - k41*X4 - 2*beta*X4^2',
+                                  'X6 = 1 + X3'],
+                                 'X7', 'X8',
+                                 resolve_cycles=True,
+                                 resolve_codominance=True))
+    models.append(BenchmarkModel('example_7',
+                                 ['X1. = a1*X1^3*X2^2 - 6*X1^2*X2 - epsilon*X1',
+                                  'X2. = 11*X2 - b1*6*X1^-1'],
+                                 'a1', 'b1',
+                                 parameters={'epsilon':1e-20}))
+    return models
+
+
+def reversible_chain(n):
+    ''' A chain of n reversible conversions with an input and degradation of
+        every species. The number of cases is 8*6**(n-2).
+    '''
+    equations = list()
+    for i in range(1, n+1):
+        positive = list()
+        negative = list()
+        if i == 1:
+            positive.append('a0')
+        else:
+            positive.append('k%d%d*X%d' % (i-1, i, i-1))
+            negative.append('k%d%d*X%d' % (i, i-1, i))
+        if i < n:
+            positive.append('k%d%d*X%d' % (i+1, i, i+1))
+            negative.append('k%d%d*X%d' % (i, i+1, i))
+        negative.append('b%d*X%d' % (i, i))
+        equations.append('X%d. = ' % i + ' + '.join(positive) + ' - ' + ' - '.join(negative))
+    return BenchmarkModel('reversible_chain_%d' % n, equations,
+                          'a0', 'b%d' % n,
+                          simulate=True)
+
+
+def feedback_chain(n):
+    ''' An unbranched pathway of n steps whose first step is inhibited by the
+        last product. The number of cases is 2 for any n.
+    '''
+    equations = ['X1. = a0*X%d^-0.5 + a1 - b1*X1' % n]
+    for i in range(2, n+1):
+        equations.append('X%d. = b%d*X%d - b%d*X%d' % (i, i-1, i-1, i, i))
+    return BenchmarkModel('feedback_chain_%d' % n, equations,
+                          'a0', 'b%d' % n,
+                          simulate=True)
+
+
+def cyclic_network(n):
+    ''' A cycle of n species with an input and a degradation of every
+        species, whose cases are resolved by cycles.
+    '''
+    equations = list()
+    for i in range(1, n+1):
+        previous = n if i == 1 else i-1
+        following = 1 if i == n else i+1
+        positive = ['k%d_%d*X%d' % (previous, i, previous)]
+        if i == 1:
+            positive.insert(0, 'a0')
+        negative = ['k%d_%d*X%d' % (i, following, i), 'b%d*X%d' % (i, i)]
+        equations.append('X%d. = ' % i + ' + '.join(positive) + ' - ' + ' - '.join(negative))
+    return BenchmarkModel('cyclic_network_%d' % n, equations,
+                          'a0', 'b1',
+                          resolve_cycles=True)
+
+
+def synthetic_models(sizes=(2, 3, 4)):
+    ''' The synthetic networks, for each of the sizes. '''
+    models = list()
+    for n in sizes:
+        models.append(reversible_chain(n))
+    for n in sizes:
+        models.append(feedback_chain(2*n))
+    for n in sizes:
+        models.append(cyclic_network(n+1))
+    return models
+
+
+def benchmark_models(sizes=(2, 3, 4)):
+    ''' The example and synthetic models of the benchmark suite. '''
+    return example_models() + synthetic_models(sizes)
@@ -0,0 +1,369 @@
+''' The benchmarks of the design space pipeline and the functions that run
+them.
+
+Each benchmark has a setup, which is not timed, and a step, which is timed.
+The setup runs again before every repetition so that results memoized by a
+previous repetition are not reused. Benchmarks run in a child process by
+default, so that the peak memory reported for each one is not affected by
+the benchmarks that ran before it.
+'''
+
+import os
+import sys
+import time
+import json
+import platform
+import subprocess
+import multiprocessing
+import traceback
+from timeit import default_timer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from dspace.benchmarks.models import benchmark_models
+from dspace.benchmarks.imports import IMPORT_BUDGET, check_import_budget, format_import_check
+
+VOLUME_METHODS = ['Tolerances',
+                  'Bounding Box',
+                  'Geometric Mean T. & BB.',
+                  'Vertex Enumeration']
+
+
+class Benchmark(object):
+    ''' A timed step of the design space pipeline for one model. '''
+
+    def __init__(self, name, group, model, setup, step):
+        setattr(self, 'name', name)
+        setattr(self, 'group', group)
+        setattr(self, 'model', model)
+        setattr(self, '_setup', setup)
+        setattr(self, '_step', step)
+
+    def setup(self):
+        return self._setup(self.model)
+
+    def step(self, state):
+        return self._step(state)
+
+
+def _construct(resolve_cycles, resolve_codominance):
+    def setup(model):
+        return model.equations_object()
+    def step(eq):
+        import dspace
+        return dspace.DesignSpace(eq,
+                                  resolve_cycles=resolve_cycles,
+                                  resolve_codominance=resolve_codominance,
+                                  cache=False)
+    return setup, step
+
+
+def _design_space(model):
+    return model.design_space(resolve_cycles=model.resolve_cycles,
+                              resolve_codominance=model.resolve_codominance)
+
+
+def _valid_cases(bounded):
+    def setup(model):
+        ds = _design_space(model)
+        p_bounds = model.p_bounds(ds) if bounded is True else None
+        return ds, p_bounds
+    def step(state):
+        ds, p_bounds = state
+        return ds.valid_cases(p_bounds=p_bounds)
+    return setup, step
+
+
+def _figure():
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot
+    pyplot.close('all')
+    return pyplot.figure()
+
+
+def _slice_setup(model):
+    import dspace.plotutils
+    ds = _design_space(model)
+    fig = _figure()
+    return model, ds, model.parameter_values(ds), fig.gca()
+
+
+def _draw_2D_slice(state):
+    model, ds, pvals, ax = state
+    return ds.draw_2D_slice(ax, pvals,
+                            model.x_variable, model.y_variable,
+                            model.range_x, model.range_y)
+
+
+def _draw_2D_ss_function(state):
+    model, ds, pvals, ax = state
+    return ds.draw_2D_ss_function(ax, model.ss_function(ds), pvals,
+                                  model.x_variable, model.y_variable,
+                                  model.range_x, model.range_y,
+                                  resolution=50)
+
+
+def _volume(method):
+    def setup(model):
+        ds = _design_space(model)
+        cases = [ds(i) for i in ds.valid_cases(p_bounds=model.p_bounds(ds))]
+        for case in cases:
+            case.clear_memo()
+        return cases
+    def step(cases):
+        kwargs = dict(lowerBounds=1e-3, upperBounds=1e3, method=method)
+        if method == 'Vertex Enumeration':
+            kwargs.update(maxVertices=0, limitVertices=False)
+        return [case.volume(**kwargs) for case in cases]
+    return setup, step
+
+
+def _full_system_setup(model):
+    import dspace
+    ds = _design_space(model)
+    return model, dspace.FullSystem(ds), model.parameter_values(ds)
+
+
+def _time_course_case(state):
+    model, fs, pvals = state
+    return fs.time_course_case(pvals, 0, 100, 1000)
+
+
+def _titrations_case(state):
+    model, fs, pvals = state
+    return fs.titrations_case(pvals, 0, 100, 1000, model.x_variable,
+                              titration_range_min=model.range_x[0],
+                              titration_range_max=model.range_x[1],
+                              variable_steps=20)
+
+
+def benchmarks(models=None):
+    ''' The benchmarks of the suite.
+
+    Kwargs:
+        models (list): The BenchmarkModel objects used by the benchmarks.
+            Defaults to the examples and the synthetic networks.
+
+    Returns:
+        A list of Benchmark objects.
+    '''
+    if models is None:
+        models = benchmark_models()
+    suite = list()
+    def add(group, model, setup, step):
+        suite.append(Benchmark(group + '[' + model.name + ']', group, model, setup, step))
+    for model in models:
+        add('construct', model, *_construct(False, False))
+        if model.resolve_cycles is True:
+            add('construct_cycles', model, *_construct(True, False))
+            add('construct_cycles_codominance', model, *_construct(True, True))
+        add('valid_cases', model, *_valid_cases(False))
+        add('valid_cases_bounded', model, *_valid_cases(True))
+        add('draw_2D_slice', model, _slice_setup, _draw_2D_slice)
+        add('draw_2D_ss_function', model, _slice_setup, _draw_2D_ss_function)
+        for method in VOLUME_METHODS:
+            add('volume[' + method + ']', model, *_volume(method))
+        if model.simulate is True:
+            add('time_course_case', model, _full_system_setup, _time_course_case)
+            add('titrations_case', model, _full_system_setup, _titrations_case)
+    return suite
+
+
+def _peak_rss():
+    ''' The peak resident set size of the process, in kilobytes. '''
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak = peak // 1024
+    return peak
+
+
+def measure(benchmark, repeat=3, trace_memory=True):
+    ''' Runs a benchmark in the current process.
+
+    Kwargs:
+        repeat (int): The number of times the step is timed.
+        trace_memory (bool): If the step runs once more, untimed, to measure
+            the peak memory allocated by Python. Python 3 only.
+
+    Returns:
+        A dictionary with the time of each repetition, in seconds, the peak
+        memory allocated by Python during the step and the peak resident set
+        size of the process, in kilobytes.
+    '''
+    result = dict(name=benchmark.name,
+                  group=benchmark.group,
+                  model=benchmark.model.name,
+                  times=list(),
+                  peak_python_kb=None,
+                  peak_rss_kb=None,
+                  error=None)
+    try:
+        for i in range(repeat):
+            state = benchmark.setup()
+            start = default_timer()
+            benchmark.step(state)
+            result['times'].append(default_timer() - start)
+            del state
+        if trace_memory is True and tracemalloc is not None:
+            state = benchmark.setup()
+            tracemalloc.start()
+            try:
+                benchmark.step(state)
+                result['peak_python_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+            finally:
+                tracemalloc.stop()
+            del state
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['peak_rss_kb'] = _peak_rss()
+    if len(result['times']) > 0:
+        result['min'] = min(result['times'])
+        result['mean'] = sum(result['times'])/len(result['times'])
+    return result
+
+
+def _measure_in_child(connection, model, name, repeat):
+    benchmark = [i for i in benchmarks(models=[model]) if i.name == name][0]
+    connection.send(measure(benchmark, repeat=repeat))
+    connection.close()
+
+
+def measure_isolated(benchmark, repeat=3):
+    ''' Runs a benchmark in a child process. See measure.
+
+    The child process constructs the benchmark again from its model, so that
+    it does not depend on how processes are started on the platform.
+    '''
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_measure_in_child,
+                                      args=(sender, benchmark.model, benchmark.name, repeat))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = dict(name=benchmark.name,
+                      group=benchmark.group,
+                      model=benchmark.model.name,
+                      times=list(),
+                      peak_python_kb=None,
+                      peak_rss_kb=None,
+                      error='The benchmark process exited with code ' + str(process.exitcode))
+    process.join()
+    if process.exitcode not in (0, None) and result['error'] is None:
+        result['error'] = 'The benchmark process exited with code ' + str(process.exitcode)
+    return result
+
+
+def _commit():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        with open(os.devnull, 'w') as devnull:
+            commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                             cwd=directory, stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit.decode('utf-8').strip()
+
+
+def environment():
+    ''' A description of the environment the benchmarks run in. '''
+    import dspace
+    from dspace.SWIG.dspace_interface import DSDesignSpaceToolboxVersionString
+    return dict(dspace=dspace.__version__,
+                toolbox=DSDesignSpaceToolboxVersionString(),
+                commit=_commit(),
+                python=platform.python_version(),
+                platform=platform.platform(),
+                processor=platform.processor(),
+                timestamp=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()))
+
+
+def run(patterns=None, repeat=3, isolate=True, models=None, output=None, stream=None,
+        import_budget=IMPORT_BUDGET):
+    ''' Runs the benchmarks and reports their results.
+
+    Kwargs:
+        patterns (list): Substrings of the names of the benchmarks to run.
+            All benchmarks are run if None.
+        repeat (int): The number of times each benchmark is timed.
+        isolate (bool): If each benchmark runs in its own process.
+        models (list): The BenchmarkModel objects used by the benchmarks.
+        output (str): The path of the JSON file the results are written to.
+        stream (file): Where progress is reported. Defaults to sys.stdout;
+            nothing is reported if False.
+        import_budget (float): The largest acceptable time to import dspace,
+            in seconds. The import is not checked if None.
+
+    Returns:
+        A dictionary with the environment and the results of each benchmark.
+    '''
+    if stream is None:
+        stream = sys.stdout
+    selected = benchmarks(models=models)
+    if patterns is not None:
+        selected = [i for i in selected if any([pattern in i.name for pattern in patterns])]
+    results = list()
+    for benchmark in selected:
+        if isolate is True:
+            result = measure_isolated(benchmark, repeat=repeat)
+        else:
+            result = measure(benchmark, repeat=repeat)
+        results.append(result)
+        if stream is not False:
+            stream.write(format_result(result) + '\n')
+            stream.flush()
+    report = dict(environment=environment(), repeat=repeat, results=results)
+    if import_budget is not None:
+        report['imports'] = check_import_budget(budget=import_budget, repeat=repeat)
+        if stream is not False:
+            stream.write(format_import_check(report['imports']) + '\n')
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    return report
+
+
+def format_result(result):
+    ''' A line describing the result of a benchmark. '''
+    if result['error'] is not None:
+        return '%-60s failed: %s' % (result['name'], result['error'].strip().split('\n')[-1])
+    string = '%-60s min %10.4f s  mean %10.4f s' % (result['name'], result['min'], result['mean'])
+    if result['peak_python_kb'] is not None:
+        string += '  python %8d kB' % result['peak_python_kb']
+    if result['peak_rss_kb'] is not None:
+        string += '  rss %8d kB' % result['peak_rss_kb']
+    return string
+
+
+def compare(baseline, current):
+    ''' The ratio of the minimum time of each benchmark in current to its
+        minimum time in baseline, for the benchmarks that succeeded in both.
+
+    Args:
+        baseline (dict): A report returned by run or read from its JSON file.
+        current (dict): A report returned by run or read from its JSON file.
+
+    Returns:
+        A list of (name, baseline time, current time, ratio) tuples.
+    '''
+    times = dict((i['name'], i['min']) for i in baseline['results'] if i['error'] is None)
+    ratios = list()
+    for result in current['results']:
+        if result['error'] is not None or result['name'] not in times:
+            continue
+        previous = times[result['name']]
+        ratio = result['min']/previous if previous > 0 else float('inf')
+        ratios.append((result['name'], previous, result['min'], ratio))
+    return ratios
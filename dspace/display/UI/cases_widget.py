@@ -3,10 +3,12 @@ import dspace
 import dspace.plotutils
 import dspace.display
 import time
+import multiprocessing
 from dspace.SWIG.dspace_interface import DSCaseFree
 from decimal import Decimal
 from math import log10, floor
 import pandas as pd
+import numpy as np
 from dspace.SWIG.dspace_interface import DSDesignSpaceNumberOfBoundaries
 
 
@@ -80,6 +82,7 @@ class CasesTable(object):
         show_signature = Checkbox(description='Show signature?', value=True)
         show_parents = Checkbox(description='Show parent cases?', value=False)
         export_table = Checkbox(description='Export Phenotypic Repertoire (.xlsx)', value=False)
+        parallel = Checkbox(description='Compute in Parallel', value=False)
         add_column = Button(description='Add column')
         add_filter = Button(description='Add column filter')
         remove_column = Button(description='Remove column')
@@ -101,6 +104,7 @@ class CasesTable(object):
                             by_signature,
                             constraints,
                             show_signature, show_parents, export_table,
+                            parallel,
                             add_column,
                             extra_columns,
                             remove_column,
@@ -119,6 +123,7 @@ class CasesTable(object):
         button.show_signature = show_signature
         button.show_parents = show_parents
         button.export_table = export_table
+        button.parallel = parallel
         cases_table = VBox(description='Cases Table', children=[wi, button, self.table])
         wi.visible = False
         return ('Phenotypic Repertoire', cases_table)
@@ -385,185 +390,168 @@ class CasesTable(object):
         b.wi.visible = False
         b.description = 'Enumerate Phenotypic Repertoire' #  'Create/modify cases table'
 
-    def create_string_for_table_long(self, cases, b, s):
-        d = dict((i, []) for i in b.headers)
+    def column_spec(self, column):
+        ''' The description of an extra column used by DesignSpace.case_table. '''
+        header = str(column.header.value)
+        lower_bound = 10**column.lower_bound_par_space.value
+        upper_bound = 10**column.upper_bound_par_space.value
+        if header == '# eigenvalues w/ positive real part':
+            return dict(column='Eigenvalues',
+                        root_method=str(column.root_method.value),
+                        complex_conjugates=column.show_complex_conjugates.value)
+        if header == 'Volume' or header == 'Normalized Volume':
+            return dict(column=header,
+                        method=str(column.volume_method.value),
+                        ignore_unbounded=column.ignore_infinity.value,
+                        log_coordinate=column.log_coordinates.value,
+                        lower_bound=lower_bound,
+                        upper_bound=upper_bound,
+                        max_vertices=column.nr_vertices.value,
+                        limit_vertices=column.limit_vertices.value,
+                        normalize=False)
+        if header == 'Dimension':
+            return dict(column=header,
+                        lower_bound=lower_bound,
+                        upper_bound=upper_bound)
+        if header in ['Validity', 'Is a Blowup', 'Is False Blowing']:
+            return dict(column=header)
+        return dict(column='Log-Gain',
+                    dependent=str(column.dependent.value),
+                    independent=str(column.independent.value))
+
+    def case_table(self, cases, b):
+        ''' The values of the case number, signature and extra columns of
+            each case, with columns numbered as in the column filters.
+        '''
+        controller = self.controller
+        specs = [dict(column='Case Number'), dict(column='Signature')]
+        specs += [self.column_spec(column) for column in b.extra_columns.children]
+        for i, spec in enumerate(specs):
+            spec['name'] = i + 1
+        workers = 1
+        if getattr(b, 'parallel', None) is not None and b.parallel.value is True:
+            workers = multiprocessing.cpu_count()
+        table = controller.ds.case_table(cases, specs, workers=workers)
+        table.index = range(len(table))
+        return table
+
+    def normalized_table(self, table, b):
+        ''' Replaces the volumes of normalized volume columns by their
+            fraction of the total volume of the column.
+        '''
+        table = table.copy()
+        for i, column in enumerate(b.extra_columns.children):
+            if column.header.value != 'Normalized Volume':
+                continue
+            total_volume = getattr(column, 'total_volume', 0)
+            if total_volume == 0:
+                total_volume = 1
+                print("Warning, setting total volumes to 1")
+            values = pd.to_numeric(table.iloc[:, i + 2], errors='coerce')/total_volume
+            values = values.map(lambda x: round_sig(x) if x != 0.0 and x == x else x)
+            table.iloc[:, i + 2] = values.where(values.notnull(), table.iloc[:, i + 2])
+        return table
+
+    def calculate_total_volumes(self, valid, table, b):
+        ''' Sets the total volume of each normalized volume column, summing
+            the volumes of the rows marked as valid that pass the column
+            filters.
+        '''
+        filtering = table.copy()
+        for i, column in enumerate(b.extra_columns.children):
+            if column.header.value != 'Normalized Volume':
+                continue
+            values = pd.to_numeric(filtering.iloc[:, i + 2], errors='coerce')
+            values = values.map(lambda x: round_sig(x) if x != 0.0 and x == x else x)
+            filtering.iloc[:, i + 2] = values.where(values.notnull(), filtering.iloc[:, i + 2])
+        included = valid & self.filter_mask(filtering, b)
+        for i, column in enumerate(b.extra_columns.children):
+            if column.header.value != 'Normalized Volume':
+                continue
+            volumes = pd.to_numeric(table.iloc[:, i + 2], errors='coerce').fillna(0.)
+            column.total_volume = float(volumes[included].sum())
+
+    def uses_total_volumes(self, b):
+        ''' True if the table has a normalized volume column whose total is
+            summed over its valid cases.
+        '''
+        if getattr(b, 'mode', None) not in ('Valid', 'User Specified'):
+            return False
+        return any([column.header.value == 'Normalized Volume' for column in b.extra_columns.children])
+
+    def case_rows(self, cases, b, chunk_size=500):
+        ''' Builds the case table chunk by chunk from a stream of cases, so
+            that only the cases of one chunk are alive at a time.
+
+        Returns:
+            The case table and, for each of its rows, a tuple with the case
+            number as shown, whether the row is a parent case, and whether the
+            case counts towards total volumes. Cases are only checked for the
+            total volumes if the table uses them.
+        '''
         controller = self.controller
+        total_volumes = self.uses_total_volumes(b)
+        tables = []
+        rows = []
         parents = []
-        if controller.ds.instability is True:
-            if b.show_signature.value is True:
-                for c in cases:
-                    # if (c.is_valid() is False or c.is_valid(p_bounds=c.valid_interior_parameter_set()) is False) and b.mode == "Valid":
-                    if c.is_valid() is False and b.mode == "Valid":
-                        continue
-                    if b.show_parents.value is True:
-                        p = c.case_number.split('_')
-                        if len(p) - 1 != 0:
-                            case_number = '_'.join([p[i] for i in range(0, len(p)-1)])
-                            if case_number not in parents:
-                                parents.append(case_number)
-                                parent = self.controller.ds(case_number)
-                                values = [parent.case_number, parent.signature]
-                                values += [self.value_for_extra_column(parent, column) for column in
-                                           b.extra_columns.children]
-                                if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                                    continue
-                                if b.export_table.value is True:
-                                    for i in range(len(b.headers)):
-                                            d[b.headers[i]].append(values[i])
-                                s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td>' \
-                                     '<td style="padding:0 15px 0 15px;">{1}</td>'.format(
-                                    parent.case_number + '&#1007' if (
-                                                parent.is_cyclical is False and parent.is_unstable is True) else parent.case_number,
-                                    parent.signature)
-                                for column in b.extra_columns.children:
-                                    s += self.html_for_extra_column(parent, column)
-                                s += '</tr>\n'
-                    values = [c.case_number, c.signature]
-                    values += [self.value_for_extra_column(c, column) for column in b.extra_columns.children]
-                    if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                        continue
-                    if b.export_table.value is True:
-                        for i in range(len(b.headers)):
-                                d[b.headers[i]].append(values[i])
-                    s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td><td style="padding:0 15px 0 15px;">{1}</td>'.format(
-                         c.case_number+'&#1007' if (c.is_cyclical is False and c.is_unstable is True) else c.case_number, c.signature)
-                    for column in b.extra_columns.children:
-                        s += self.html_for_extra_column(c, column)
-                    s += '</tr>\n'
-
-            else:
-                for c in cases:
-                    # if (c.is_valid() is False or c.is_valid(p_bounds=c.valid_interior_parameter_set()) is False) and b.mode == "Valid":
-                    if c.is_valid() is False and b.mode == "Valid":
-                        continue
-                    if b.show_parents.value is True:
-                        p = c.case_number.split('_')
-                        if len(p) - 1 != 0:
-                            case_number = '_'.join([p[i] for i in range(0, len(p)-1)])
-                            if case_number not in parents:
-                                parents.append(case_number)
-                                parent = self.controller.ds(case_number)
-                                values = [parent.case_number]
-                                values += [self.value_for_extra_column(parent, column) for column in
-                                           b.extra_columns.children]
-                                if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                                    continue
-                                if b.export_table.value is True:
-                                    for i in range(len(b.headers)):
-                                            d[b.headers[i]].append(values[i])
-                                s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td>'.format(
-                                    parent.case_number + '&#1007' if (parent.is_cyclical is False and
-                                                                      parent.is_unstable is True) else parent.case_number)
-                                for column in b.extra_columns.children:
-                                    s += self.html_for_extra_column(parent, column)
-                                s += '</tr>\n'
-                    values = [c.case_number]  # [c.case_number, c.signature]
-                    values += [self.value_for_extra_column(c, column) for column in b.extra_columns.children]
-                    if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                        continue
-                    if b.export_table.value is True:
-                        for i in range(len(b.headers)):
-                                d[b.headers[i]].append(values[i])
-                    s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td>'.format(
-                         c.case_number+'&#1007' if (c.is_cyclical is False and c.is_unstable is True) else c.case_number)
-                    for column in b.extra_columns.children:
-                        s += self.html_for_extra_column(c, column)
-                    s += '</tr>\n'
-        else:
-            if b.show_signature.value is True:
-                for c in cases:
-                    # if (c.is_valid() is False or c.is_valid(p_bounds=c.valid_interior_parameter_set()) is False) and b.mode == "Valid":
-                    if c.is_valid() is False and b.mode == "Valid":
-                        continue
-                    if b.show_parents.value is True:
-                        p = c.case_number.split('_')
-                        if len(p) - 1 != 0:
-                            case_number = '_'.join([p[i] for i in range(0, len(p)-1)])
-                            if case_number not in parents:
-                                parents.append(case_number)
-                                parent = self.controller.ds(case_number)
-                                values = [parent.case_number, parent.signature]
-                                values += [self.value_for_extra_column(parent, column) for column in
-                                           b.extra_columns.children]
-                                if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                                    continue
-                                if b.export_table.value is True:
-                                    for i in range(len(b.headers)):
-                                            d[b.headers[i]].append(values[i])
-                                s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td>' \
-                                     '<td style="padding:0 15px 0 15px;">{1}</td>'.format(
-                                    parent.case_number + '&#1007' if (
-                                                parent.is_cyclical is False and parent.is_unstable is True) else parent.case_number,
-                                    parent.signature)
-                                for column in b.extra_columns.children:
-                                    s += self.html_for_extra_column(parent, column)
-                                s += '</tr>\n'
-                    # self.show_case(c, b.extra_columns)
-                    values = [c.case_number, c.signature]
-                    values += [self.value_for_extra_column(c, column) for column in b.extra_columns.children]
-                    if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                        continue
-                    if b.export_table.value is True:
-                        for i in range(len(b.headers)):
-                                d[b.headers[i]].append(values[i])
-                    s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td><td style="padding:0 15px 0 15px;">{1}</td>'.format(
-                         c.case_number, c.signature)
-                    for column in b.extra_columns.children:
-                        s += self.html_for_extra_column(c, column)
-                    s += '</tr>\n'
-            else:
-                for c in cases:
-                    # if (c.is_valid() is False or c.is_valid(p_bounds=c.valid_interior_parameter_set()) is False) and b.mode == "Valid":
-                    if c.is_valid() is False and b.mode == "Valid":
-                        continue
-                    if b.show_parents.value is True:
-                        p = c.case_number.split('_')
-                        if len(p) - 1 != 0:
-                            case_number = '_'.join([p[i] for i in range(0,len(p)-1)])
-                            if case_number not in parents:
-                                parents.append(case_number)
-                                parent = self.controller.ds(case_number)
-                                values = [parent.case_number]
-                                values += [self.value_for_extra_column(parent, column) for column in
-                                           b.extra_columns.children]
-                                if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                                    continue
-                                if b.export_table.value is True:
-                                    for i in range(len(b.headers)):
-                                            d[b.headers[i]].append(values[i])
-                                s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td>'.format(
-                                    parent.case_number + '&#1007' if (parent.is_cyclical is False and parent.is_unstable
-                                                                      is True) else parent.case_number)
-                                for column in b.extra_columns.children:
-                                    s += self.html_for_extra_column(parent, column)
-                                s += '</tr>\n'
-                    # self.show_case(c, b.extra_columns)
-                    values = [c.case_number] # [c.case_number, c.signature]
-                    values += [self.value_for_extra_column(c, column) for column in b.extra_columns.children]
-                    if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                        continue
-                    if b.export_table.value is True:
-                        for i in range(len(b.headers)):
-                            d[b.headers[i]].append(values[i])
-                    s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td>'.format(c.case_number)
-                    for column in b.extra_columns.children:
-                        s += self.html_for_extra_column(c, column)
-                    s += '</tr>\n'
-        b.table_data = d
-        return s
-
-    def create_string_for_table(self, b, cases, s):
+        chunk = []
+
+        def flush(chunk):
+            tables.append(self.case_table([c for c, is_parent in chunk], b))
+            for c, is_parent in chunk:
+                case_number = c.case_number
+                if controller.ds.instability is True and c.is_cyclical is False and c.is_unstable is True:
+                    case_number += '&#1007'
+                valid = (total_volumes is True and is_parent is False and c.is_valid() is True and
+                         c.is_valid(p_bounds=c.valid_interior_parameter_set()) is True)
+                rows.append((case_number, is_parent, valid))
 
         for c in cases:
-            values = [c.case_number, c.signature]
-            values += [self.value_for_extra_column(c, column) for column in b.extra_columns.children]
-            if self.show_case(values, b.extra_columns.children, b.filters) is False:
+            if b.show_parents.value is True:
+                p = c.case_number.split('_')
+                if len(p) - 1 != 0:
+                    case_number = '_'.join([p[i] for i in range(0, len(p)-1)])
+                    if case_number not in parents:
+                        parents.append(case_number)
+                        chunk.append((controller.ds(case_number), True))
+            chunk.append((c, False))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if len(chunk) > 0 or len(tables) == 0:
+            flush(chunk)
+        table = pd.concat(tables, ignore_index=True)
+        return table, rows
+
+    def create_string_for_table_long(self, cases, b, s):
+        d = dict((i, []) for i in b.headers)
+        table, rows = self.case_rows(cases, b)
+        if self.uses_total_volumes(b) is True:
+            self.calculate_total_volumes(np.array([row[2] for row in rows], dtype=bool), table, b)
+        table = self.normalized_table(table, b)
+        if b.show_signature.value is False:
+            table = table.drop(2, axis=1)
+        shown = self.filter_mask(table, b)
+        skip = False
+        for i, (case_number, is_parent, valid) in enumerate(rows):
+            if skip is True:
+                skip = False
+                continue
+            if bool(shown[i]) is False:
+                skip = is_parent
                 continue
-            s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td><td style="padding:0 15px 0 15px;">{1}</td>'.format(
-                c.case_number, c.signature)
-            for column in b.extra_columns.children:
-                s += self.html_for_extra_column(c, column)
+            values = list(table.iloc[i])
+            if b.export_table.value is True:
+                for j in range(len(b.headers)):
+                    d[b.headers[j]].append(values[j])
+            s += '<tr align=center><td style="padding:0 15px 0 15px;">{0}</td>'.format(case_number)
+            if b.show_signature.value is True:
+                s += '<td style="padding:0 15px 0 15px;">{0}</td>'.format(values[1])
+            extra_values = values[len(values) - len(b.extra_columns.children):]
+            for column, value in zip(b.extra_columns.children, extra_values):
+                s += self.html_for_extra_column(value, column)
             s += '</tr>\n'
+        b.table_data = d
         return s
 
     def create_case_table(self, b, mode='All'):
@@ -636,21 +624,22 @@ class CasesTable(object):
             s += '<td><b>' + header + '</b></td>'
             headers += [header]
         s += '</tr>'
-        if mode == 'Valid':
-            cases = controller.ds(controller.ds.valid_cases(),
-                                  constraints=constraints)
+        case_constraints = constraints if len(constraints) > 0 else None
+        if mode == 'Valid' and controller.ds._resolve_cycles is True:
+            # Valid subcases of cyclical cases are only listed by valid_cases.
+            cases = controller.ds.iter_cases(controller.ds.valid_cases(),
+                                             valid_only=case_constraints is not None,
+                                             constraints=case_constraints)
+        elif mode == 'Valid':
+            cases = controller.ds.iter_cases(valid_only=True,
+                                             constraints=case_constraints)
         elif mode == 'All':
-            cases = controller.ds(
-                [i for i in range(1, controller.ds.number_of_cases + 1)],
-                constraints=constraints)
+            cases = controller.ds.iter_cases(constraints=case_constraints)
         else:
             case_signatures = [i.strip() for i in str(b.cases.value).split(',') if len(i.strip()) > 0]
-            cases = controller.ds(["".join(i.split()) for i in case_signatures],
-                                  by_signature=b.by_signature.value,
-                                  constraints=constraints)
-
-        if mode == 'Valid' or mode == 'User Specified':
-            self.calculate_total_volumes(cases, b, log_coordinate=False)
+            cases = controller.ds.iter_cases(["".join(i.split()) for i in case_signatures],
+                                             by_signature=b.by_signature.value,
+                                             constraints=case_constraints)
 
         b.headers = headers
         s = self.create_string_for_table_long(cases, b, s)
@@ -679,56 +668,6 @@ class CasesTable(object):
             table_container.overflow_y = 'auto'
         self.table.children = [table_container]
 
-    def calculate_total_volumes(self, cases, b, log_coordinate=True):
-
-        n = 0
-        for column in b.extra_columns.children:
-
-            method = column.volume_method.value
-            ignore_unbounded = column.ignore_infinity.value
-            log_coordinate = column.log_coordinates.value
-            lowerBounds = 10 ** column.lower_bound_par_space.value
-            upperBounds = 10 ** column.upper_bound_par_space.value
-            maxVertices = column.nr_vertices.value
-            limitVertices = column.limit_vertices.value
-
-            if column.header.value == 'Normalized Volume':
-                vol = 0
-                for c in cases:
-                    if c.is_valid() is False or c.is_valid(p_bounds=c.valid_interior_parameter_set()) is False:
-                        continue
-                    values = [c.case_number, c.signature]
-                    values += [self.value_for_extra_column(c, column, filtering_mode=True) for column in b.extra_columns.children]
-                    if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                        continue
-
-                    vol += c.volume(ignore_unbounded=ignore_unbounded,
-                                    log_coordinate=log_coordinate,
-                                    lowerBounds=lowerBounds,
-                                    upperBounds=upperBounds,
-                                    maxVertices=maxVertices,
-                                    limitVertices=limitVertices,
-                                    method=method)
-
-                b.extra_columns.children[n].total_volume = vol
-            n += 1
-
-    def calculate_total_volumes_geometric(self, cases, b, log_coordinate=True):
-
-        vol_unbounded = 0
-        vol_bounded = 0
-        for c in cases:
-            if c.is_valid() is False or c.is_valid(p_bounds=c.valid_interior_parameter_set()) is False:
-                continue
-            values = [c.case_number, c.signature]
-            values += [self.value_for_extra_column(c, column, filtering_mode=True) for column in b.extra_columns.children]
-            if self.show_case(values, b.extra_columns.children, b.filters) is False:
-                continue
-            vol_unbounded += c.volume_geometric_mean(ignore_unbounded=False, log_coordinate=log_coordinate)
-            vol_bounded += c.volume_geometric_mean(ignore_unbounded=True, log_coordinate=log_coordinate)
-        vol = [vol_unbounded, vol_bounded]
-        return vol
-
     def save_table(self, b):
 
         controller = self.controller
@@ -773,20 +712,24 @@ class CasesTable(object):
                 break
         return showCase
 
-    def show_case(self, values, columns, filters):
-        showCase = True
-        for filter_box in filters.children:
+    def filter_mask(self, table, b):
+        ''' The rows of a case table that pass the column filters. '''
+        columns = b.extra_columns.children
+        mask = np.ones(len(table), dtype=bool)
+        for filter_box in b.filters.children:
             a_filter = filter_box.children
             column_number = int(a_filter[0].value)
+            condition = a_filter[1].value
+            values = table.iloc[:, column_number - 1]
             if column_number == 1:
                 rhs = int(a_filter[2].value)
-                lhs = int(values[column_number - 1])
+                lhs = values.astype(int)
             elif column_number == 2:
                 rhs = str(a_filter[2].value).replace(" ", "")
-                lhs = str(values[column_number - 1]).replace(" ", "")
+                lhs = values.astype(str).str.replace(" ", "")
                 if rhs.find("*") != -1:
                     siglist = self.generate_multiple_signatures(rhs)
-                    showCase = self.show_case_multiple_signatures(siglist, a_filter, lhs)
+                    mask &= lhs.map(lambda x: self.show_case_multiple_signatures(siglist, a_filter, x)).values.astype(bool)
                     break
             else:
                 column_type = columns[column_number - 3].header.value
@@ -795,219 +738,41 @@ class CasesTable(object):
                                                  columns[column_number - 3].show_complex_conjugates.value is True)\
                         or (column_type == 'Is a Blowup') or (column_type == 'Is False Blowing'):
                     rhs = str(a_filter[2].value)
-                    lhs = str(values[column_number - 1])
+                    lhs = values.astype(str)
                 else:
-                    if values[column_number - 1] == '-' or values[column_number - 1] == '*':
-                        showCase = False
-                        break
+                    mask &= ~values.astype(str).isin(['-', '*']).values
                     rhs = float(a_filter[2].value)
-                    lhs = float((str(values[column_number - 1])).replace("*",
-                                                                         ""))
-            if a_filter[1].value == '==' and lhs != rhs:
-                showCase = False
-                break
-            if a_filter[1].value == '>=' and lhs < rhs:
-                showCase = False
-                break
-            if a_filter[1].value == '<=' and lhs > rhs:
-                showCase = False
-                break
-            if a_filter[1].value == '>' and lhs <= rhs:
-                showCase = False
-                break
-            if a_filter[1].value == '<' and lhs >= rhs:
-                showCase = False
-                break
-            if a_filter[1].value == '!=' and lhs == rhs:
-                showCase = False
-                break
-        return showCase
-
-    def value_for_extra_column(self, case, column, filtering_mode=False):
-        controller = self.controller
-        s = '<td style="padding:0 15px 0 15px;">'
-        if filtering_mode is True:
-            volumes = 1
-        cyclical = False
-        if case.is_cyclical is True:
-            cyclical = True
-            case = case.original_case
-        if case.is_valid() is False:
-            if cyclical is True:
-                value = '*'
-            else:
-                value = '-'
-            return value
-        if column.header.value == 'Validity':
-            value = '+'
-        elif column.header.value == 'Is a Blowup':
-            if case.is_unstable is False:
-                value = '-'
-            else:
-                value = '+'
-        elif column.header.value == 'Is False Blowing':
-            if case.is_false_blowing is False:
-                value = '-'
-            else:
-                value = '+'
-        elif column.header.value == '# eigenvalues w/ positive real part':
-            pvals = case.valid_interior_parameter_set()
-            if column.root_method.value == 'Routh Array':
-                value = case.positive_roots(pvals)
-            else:
-                    if column.show_complex_conjugates.value is True:
-                        if case.has_complex_conjugates(pvals) is True:
-                            value = '+'
-                        else:
-                            value = '-'
-                    else:
-                        value = case.positive_roots_numpy(pvals)
-        elif column.header.value == 'Volume':
-            if column.volume_method.value != 'Vertex Enumeration':
-
-                ignore_unbounded = column.ignore_infinity.value
-                log_coordinate = column.log_coordinates.value
-                method = column.volume_method.value
-                lowerBounds = 10 ** column.lower_bound_par_space.value
-                upperBounds = 10 ** column.upper_bound_par_space.value
-
-                value = case.volume(ignore_unbounded=ignore_unbounded,
-                                    log_coordinate=log_coordinate,
-                                    method=method,
-                                    lowerBounds=lowerBounds,
-                                    upperBounds=upperBounds,
-                                    )
-            else:
-                lb = controller.pvals.copy()
-                ub = controller.pvals.copy()
-                maxVertices = int(column.nr_vertices.value)
-                for key in lb.keys():
-                    lb[key] = 10**column.lower_bound_par_space.value    #1E-6
-                    ub[key] = 10**column.upper_bound_par_space.value    #1E6
-                value, vertices = case.volume_lrs(lb, ub, maxVertices, column.limit_vertices.value)
-                value = value if vertices != 0 else 0
-
-        elif column.header.value == 'Dimension':
-            lb = controller.pvals.copy()
-            ub = controller.pvals.copy()
-            for key in lb.keys():
-                lb[key] = 10**column.lower_bound_par_space.value        #1E-6
-                ub[key] = 10**column.upper_bound_par_space.value        #1E6
-            value = case.dimension(lb, ub)
-
-        elif column.header.value == 'Normalized Volume':
-            total_vol = column.total_volume if filtering_mode is False else volumes
-            if total_vol == 0:
-                total_vol = 1
-                print("Warning, setting total volumes to 1")
-            value = case.volume(ignore_unbounded=column.ignore_infinity.value,
-                                log_coordinate=column.log_coordinates.value,
-                                lowerBounds=10**column.lower_bound_par_space.value,
-                                upperBounds=10**column.upper_bound_par_space.value,
-                                maxVertices=column.nr_vertices.value,
-                                limitVertices=column.limit_vertices.value,
-                                method=column.volume_method.value,
-                                )/total_vol
-            value = round_sig(value) if value != 0.0 else 0.0
-        else:
-            xd = str(column.dependent.value)
-            xi = str(column.independent.value)
-            value = case.ssystem.log_gain(xd, xi)
-        return value
-
-    def html_for_extra_column(self, case, column):
-        controller = self.controller
+                    lhs = pd.to_numeric(values.astype(str).str.replace("*", "", regex=False), errors='coerce')
+            if condition == '==':
+                mask &= (lhs == rhs).values
+            elif condition == '>=':
+                mask &= (lhs >= rhs).values
+            elif condition == '<=':
+                mask &= (lhs <= rhs).values
+            elif condition == '>':
+                mask &= (lhs > rhs).values
+            elif condition == '<':
+                mask &= (lhs < rhs).values
+            elif condition == '!=':
+                mask &= (lhs != rhs).values
+        return mask
+
+    def html_for_extra_column(self, value, column):
         s = '<td style="padding:0 15px 0 15px;">'
-        cyclical = False
-        if case.is_cyclical is True:
-            cyclical = True
-            case = case.original_case
-        if case.is_valid() is False:
-            if cyclical is True:
-                s += '*'
-            else:
-                s += '-'
-            s += '</td>'
-            return s
-        if column.header.value == 'Validity':
-            s += '+'
-        elif column.header.value == 'Is a Blowup':
-            if case.is_unstable is False:
-                s += '-'
-            else:
-                s += '+'
-        elif column.header.value == 'Is False Blowing':
-            if case.is_false_blowing is False:
-                s += '-'
-            else:
-                s += '+'
-        elif column.header.value == '# eigenvalues w/ positive real part':
-            pvals = case.valid_interior_parameter_set()
-            if column.root_method.value == 'Routh Array':
-                s += str(case.positive_roots(pvals))
-            else:
-                if column.show_complex_conjugates.value is True:
-                        if case.has_complex_conjugates(pvals) is True:
-                            s += '+'
-                        else:
-                            s += '-'
-                else:
-                        s += str(case.positive_roots_numpy(pvals))
-
+        if value == '-' or value == '*':
+            s += value
         elif column.header.value == 'Volume':
-            if column.volume_method.value != 'Vertex Enumeration':
-                ignore_unbounded = column.ignore_infinity.value
-                log_coordinate = column.log_coordinates.value
-                lowerBounds = 10 ** column.lower_bound_par_space.value
-                upperBounds = 10 ** column.upper_bound_par_space.value
-                method = column.volume_method.value
-
-                vol = case.volume(ignore_unbounded=ignore_unbounded,
-                                  log_coordinate=log_coordinate,
-                                  lowerBounds=lowerBounds,
-                                  upperBounds=upperBounds,
-                                  method=method,
-                                  )
-                s += '%.2E' % Decimal(str(round_sig(vol))) if vol != 0.0 else '0.0'
-            else:
-                lb = controller.pvals.copy()
-                ub = controller.pvals.copy()
-                maxVertices = int(column.nr_vertices.value)
-                for key in lb.keys():
-                    lb[key] = 10**column.lower_bound_par_space.value       #1E-6
-                    ub[key] = 10**column.upper_bound_par_space.value       #1E6
-                value, vertices = case.volume_lrs(lb, ub, maxVertices, column.limit_vertices.value)
-                value = value if vertices != 0 else 0
-                s += '%.2E' % Decimal(str(round_sig(value))) if value != 0 else '0.0'
-
-        elif column.header.value == 'Dimension':
-            lb = controller.pvals.copy()
-            ub = controller.pvals.copy()
-            for key in lb.keys():
-                lb[key] = 10**column.lower_bound_par_space.value           #1E-6
-                ub[key] = 10**column.upper_bound_par_space.value           #1E6
-            s += str(case.dimension(lb, ub))
-
+            s += '%.2E' % Decimal(str(round_sig(value))) if value != 0 else '0.0'
         elif column.header.value == 'Normalized Volume':
-            total_volume = column.total_volume
-            value = case.volume(ignore_unbounded=column.ignore_infinity.value,
-                                log_coordinate=column.log_coordinates.value,
-                                lowerBounds=10**column.lower_bound_par_space.value,
-                                upperBounds=10**column.upper_bound_par_space.value,
-                                maxVertices=column.nr_vertices.value,
-                                limitVertices=column.limit_vertices.value,
-                                method=column.volume_method.value,
-                                )/total_volume
-            value = round_sig(value) if value != 0.0 else 0.0
             s += '%.2E' % Decimal(str(value))
-
+        elif column.header.value == 'Log-Gain':
+            s += '%.3f' % value
         else:
-            xd = str(column.dependent.value)
-            xi = str(column.independent.value)
-            s += '%.3f' % case.ssystem.log_gain(xd, xi)
+            s += str(value)
         s += '</td>'
         return s
 
 
+
 def round_sig(x, sig=3):
     return round(x, sig-int(floor(log10(abs(x))))-1)
@@ -968,8 +968,6 @@ class Evolution(object):
         file_name = block['file_name'].value                                                            #13
         controller = self.controller
         par_values_volumes = {}
-        par_values_k = {}
-        par_values_k_vol = {}
 
         valid_cases = controller.ds.valid_cases()
 
@@ -1017,54 +1015,18 @@ class Evolution(object):
 
         #####
 
-        par_values_normalization_factors = {}
-        for from_case in valid_cases:
-            key_from_normalization = str(from_case)
-            from_case = controller.ds(from_case)
-            if 'v'+from_case.case_number not in par_values_volumes:
-                vol = from_case.volume(ignore_unbounded=False,
-                                  log_coordinate=True,
-                                  shared_boundaries=False,
-                                  method=volume_method,
-                                  # lowerBounds=lb,
-                                  # upperBounds=ub,
-                                  p_bounds=p_bounds,
-                                  maxVertices=0,
-                                  limitVertices=False)
-                par_values_volumes['v'+from_case.case_number] = vol
-
-            from_normalization = 0
-            for to_case in valid_cases:
-                to_case = controller.ds(to_case)
-                if 'v' + to_case.case_number not in par_values_volumes:
-                    vol = to_case.volume(ignore_unbounded=False,
-                                           log_coordinate=True,
-                                           shared_boundaries=False,
-                                           method=volume_method,
-                                           # lowerBounds=lb,
-                                           # upperBounds=ub,
-                                           p_bounds=p_bounds,
-                                           maxVertices=0,
-                                           limitVertices=False)
-                    par_values_volumes['v' + to_case.case_number] = vol
-                mutation_rate = from_case.mutation_rate_to_phenotype(to_case,
-                                                                     identity,
-                                                                     delta=delta,
-                                                                     lamb=lamb,
-                                                                     method=operating_point_method,
-                                                                     p_bounds=p_bounds)
-                key = from_case.mutation_key_to_case(to_case)
-                par_values_k[key] = mutation_rate
-                par_values_k_vol[key] = mutation_rate * par_values_volumes['v'+to_case.case_number]
-                from_normalization += par_values_k_vol[key]
-            par_values_normalization_factors['from_' + key_from_normalization] = from_normalization
-
+        rates, case_numbers, volumes = controller.ds.mutation_rate_matrix(method=operating_point_method,
+                                                                           lamb=lamb,
+                                                                           delta=delta,
+                                                                           identity=identity,
+                                                                           p_bounds=p_bounds,
+                                                                           case_numbers=valid_cases,
+                                                                           volume_method=volume_method)
         par_values_k_norm = {}
-        for from_case in valid_cases:
-            norm_factor = par_values_normalization_factors['from_' + str(from_case)]
-            for to_case in valid_cases:
-                key = mutation_key_to_case(from_case, to_case)
-                par_values_k_norm[key] = par_values_k[key]/norm_factor
+        for i, from_case in enumerate(case_numbers):
+            par_values_volumes['v' + from_case] = volumes[i]
+            for j, to_case in enumerate(case_numbers):
+                par_values_k_norm[mutation_key_to_case(from_case, to_case)] = rates[i, j]
 
         par_vals_dic.update(par_values_k_norm)
         par_vals_dic.update(par_values_volumes)
@@ -41,6 +41,7 @@ import matplotlib.pyplot as plt
 
 import cStringIO
 import base64
+from session_file import SessionFile, SessionImage
 from matplotlib.backends.backend_agg import FigureCanvasAgg  
 
 from subprocess import call, Popen, PIPE
@@ -1056,8 +1057,6 @@ function toggleColumn(el, n) {
                 tab_widget.set_title(1, 'Colorbar')
             
     def save_figure_widget(self, image_data, title='', caption = '', pvals=None, colors=None):
-        image_widget = Image()
-        image_widget.value = image_data
         children = [i for i in self.figures_widget.children]      
         html_str = '<b>Figure '+str(len(children)+1)+'.  '+title+'</b>' + caption
         html_widget = HTML(value=html_str)
@@ -1065,7 +1064,15 @@ function toggleColumn(el, n) {
         restore_pvals.pvals = pvals
         if pvals is None:
             restore_pvals.visible = False
-        if old_ipython is True:
+        if isinstance(image_data, SessionImage) is True:
+            show_figure = Button(description='Show Figure')
+            tab_widget = VBox(children=[show_figure, html_widget])
+            show_figure.image_data = image_data
+            show_figure.html_widget = html_widget
+            show_figure.colors = colors
+            show_figure.tab_widget = tab_widget
+            show_figure.on_click(self.show_saved_figure)
+        elif old_ipython is True:
             image_widget = Image()
             image_widget.value = image_data
             tab_widget = VBox(children=[image_widget, html_widget])
@@ -1086,10 +1093,27 @@ function toggleColumn(el, n) {
             wi.border = '1px solid black'
         children.append(wi)
         self.figures_widget.children = children
-        if colors is not None:
+        if colors is not None and isinstance(image_data, SessionImage) is False:
             if old_ipython is True:
                 tab_widget.set_title(0, 'Figure')
                 tab_widget.set_title(1, 'Colorbar')
+
+    def show_saved_figure(self, b):
+        ''' Reads the image of a figure of a session file and shows it in
+            place of its button.
+        '''
+        image_data = b.image_data.read()
+        if old_ipython is True:
+            image_widget = Image()
+            image_widget.value = image_data
+            b.tab_widget.children = [image_widget, b.html_widget]
+            if b.colors is not None:
+                figure_widget = VBox(children=[image_widget, b.html_widget])
+                figure_widget.description = 'Figure'
+                b.tab_widget.children = [Tab(children=[figure_widget]+self.colorbar_tabs(b.colors))]
+        else:
+            image_widget = self._image_widget_new(image_data, colors=b.colors)
+            b.tab_widget.children = [image_widget, b.html_widget]
                 
     def restore_figure_pvals(self, b):
         controller = self.controller
@@ -1118,6 +1142,27 @@ function toggleColumn(el, n) {
         deleteButton.on_click(self.updatefile)
         cancelButton.on_click(self.cancelDelete)
     
+    def remove_saved_figures(self, b, file_name):
+        controller = self.controller
+        number_of_figures = len(controller.figure_data)
+        indices = set()
+        if b.indValue.value:
+            indices.update([int(s)-1 for s in b.indValue.value.split(',')])
+        if b.rangeValue.value:
+            indicesRange = [int(s) for s in b.rangeValue.value.split('-')]
+            if len(indicesRange) == 2:
+                indices.update(range(indicesRange[0]-1, indicesRange[1]))
+        indices = set([i for i in indices if 0 <= i < number_of_figures])
+        session = SessionFile(file_name)
+        figures = session.remove_figures(indices)
+        kept = [figure for index, figure in enumerate(controller.figure_data) if index not in indices]
+        controller.figure_data = figures + kept[len(figures):]
+        sucessMessage = Latex()
+        sucessMessage.value = "Figures were deleted and file was updated!"
+        self.delete_menu.children = [sucessMessage, self.delete_figures_button]
+        controller.figures.create_figures_widget()
+        self.load_widgets()
+
     def cancelDelete(self, b):
         self.delete_menu.children = [self.delete_figures_button]
 
@@ -1130,6 +1175,9 @@ function toggleColumn(el, n) {
             file_name = controller.name + ".dsipy"
         else:
             file_name = controller.name + '-V' + str(version) + ".dsipy"
+        if SessionFile.is_session_file(file_name) is True:
+            self.remove_saved_figures(b, file_name)
+            return
         f = open(file_name, "r")
         saved_data = pickle.load(f)
         f.close()
@@ -1445,14 +1445,8 @@ class FullSystem(object):
 
         if self.include_dynamical_in_excel.value is True:
 
-            xi = dspace.VariablePool(names=self.controller.ds.independent_variables)
-            xi.update(self.controller.pvals)
-            dom_sig = self.controller.ds.dominant_signature(xi, results_dic, len(time))
-            ## Now let's construct a vector containing the case number.
-            dynamic_case = []
-            for element in dom_sig:
-                element = element.strip().replace(' ', '').replace(' ', '').replace(' ', '')
-                dynamic_case.append(self.controller.ds.case_number_for_signature(element))
+            dom_sig, dynamic_case = self.full_system_model().dynamic_phenotypes(results_dic, len(time),
+                                                                               self.controller.pvals)
 
             ## Let's attach these variables to the self.dynamical_phenotypes_box
             self.dynamical_phenotypes_box.dom_sig = dom_sig
@@ -1941,27 +1935,20 @@ class FullSystem(object):
 
             # Actualize parameters
             self.parameters.update(self.controller.pvals)
-            for element in sampled_points:
-                yinit = element[:len(self.ode_equations)]
-                if controller.ds.number_conservations != 0:
-                    yinit_conserved = element[-len(self.conservations_variable_list):]
-                else:
-                    yinit_conserved = []
-                results_dic = self.solve_ode(yinit, yinit_conserved, time)
-                self.complement_results_dic_with_aux_variables(results_dic, len(time))
-                results_list_sampled_points.append(results_dic)
+            full_system = self.full_system_model()
+            yinit = [element[:len(self.ode_equations)] for element in sampled_points]
+            if controller.ds.number_conservations != 0 and self.solver.value != 'ODEINT':
+                yinit_conserved = [element[-len(self.conservations_variable_list):] for element in sampled_points]
+            else:
+                yinit_conserved = None
+            results_list_sampled_points = full_system.trajectories(controller.pvals, time, yinit, yinit_conserved,
+                                                                   solver=self.solver.value)
+            for results_dic in results_list_sampled_points:
 
                 ## Get dominat signatures and dynamic phenotypes
-                xi = dspace.VariablePool(names=controller.ds.independent_variables)
-                xi.update(controller.pvals)
-                dom_sig_aux = controller.ds.dominant_signature(xi, results_dic, len(time))
+                dom_sig_aux, dynamic_case_aux = full_system.dynamic_phenotypes(results_dic, len(time),
+                                                                               controller.pvals)
                 dom_sig_sampled.append(dom_sig_aux)
-
-                ## Now let's construct a vector containing the case number.
-                dynamic_case_aux = []
-                for element_ in dom_sig_aux:
-                    element_ = element_.strip().replace(' ', '').replace(' ', '').replace(' ', '')
-                    dynamic_case_aux.append(self.controller.ds.case_number_for_signature(element_))
                 dynamic_case_sampled.append(dynamic_case_aux)
 
                 ax.plot(self.process_results_vector(results_dic[self.xlabel.value]),
@@ -1974,32 +1961,25 @@ class FullSystem(object):
         # Now generate trajectories for each custom point
         if len(self.customized_points_list) != 0:
             self.parameters.update(self.controller.pvals)
+            full_system = self.full_system_model()
+
+            # parse initial concentration vectors
+            yinit = [[element[str(variable.lhs).replace('.', '')].value for variable in self.ode_equations]
+                     for element in self.customized_points_list]
+            if controller.ds.number_conservations != 0 and self.solver.value != 'ODEINT':
+                yinit_conserved = [[element[variable].value for variable in self.conservations_variable_list]
+                                   for element in self.customized_points_list]
+            else:
+                yinit_conserved = None
+            results_custom_points = full_system.trajectories(controller.pvals, time, yinit, yinit_conserved,
+                                                             solver=self.solver.value)
 
-            for element in self.customized_points_list:
-                # parse initial concentration vector
-                yinit = np.array([])
-                yinit_conserved = np.array([])
-
-                for variable in self.ode_equations:
-                    yinit = np.append(yinit, element[str(variable.lhs).replace('.', '')].value)
-                if controller.ds.number_conservations != 0:
-                    for variable in self.conservations_variable_list:
-                        yinit_conserved = np.append(yinit_conserved, element[variable].value)
-                else:
-                    yinit_conserved = []
-                results_dic = self.solve_ode(yinit, yinit_conserved, time)
-                self.complement_results_dic_with_aux_variables(results_dic, len(time))
+            for results_dic in results_custom_points:
 
                 ## Get dominat signatures and dynamic phenotypes
-                xi = dspace.VariablePool(names=controller.ds.independent_variables)
-                xi.update(controller.pvals)
-                dom_sig_custom.append(controller.ds.dominant_signature(xi, results_dic, len(time)))
-
-                ## Now let's construct a vector containing the case number.
-                dynamic_case_aux = []
-                for element_ in dom_sig_sampled:
-                    element_ = element_.strip().replace(' ', '').replace(' ', '').replace(' ', '')
-                    dynamic_case_aux.append(controller.ds.case_number_for_signature(element_))
+                dom_sig_aux, dynamic_case_aux = full_system.dynamic_phenotypes(results_dic, len(time),
+                                                                               controller.pvals)
+                dom_sig_custom.append(dom_sig_aux)
                 dynamic_case_custom.append(dynamic_case_aux)
 
                 # plot
@@ -2074,6 +2054,13 @@ class FullSystem(object):
                                       pvals=controller.pvals.copy(),
                                       colors=None)
 
+    def full_system_model(self):
+
+        # The model-level FullSystem integrates many initial conditions at once with a compiled right hand side.
+        if getattr(self, '_full_system_model', None) is None:
+            self._full_system_model = dspace.models.fullsystem.FullSystem(self.controller.ds)
+        return self._full_system_model
+
     def get_fixed_points_ssystems(self):
 
         pvals = self.controller.pvals
@@ -36,18 +36,13 @@ from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 from system_widget import DisplaySystem
 from symbols_widget import EditSymbols
-from cases_widget import CasesTable
-from case_widget import CaseReport
-from co_localize_widget import CaseColocalization
-from case_intersection_widget import CaseIntersection
 from figures_widget import MakePlot, DisplayFigures
 from tables_widget import DisplayTables
 from parameters_widget import EditParameters
-from fullsystem_widget import FullSystem
-from evolution_widget import Evolution
 
 import cPickle as pickle
 import base64
+from session_file import SessionFile, SessionImage
 
 from os import listdir
 from os.path import isfile, join
@@ -56,10 +51,8 @@ from os.path import isfile, join
 class WidgetSavedData(object):
    
     @staticmethod
-    def load_widget_data(interactive, version=''):
-        
+    def file_name(interactive, version=''):
         name = interactive.name
-        version = interactive.version
         if version == '':
             files = [f for f in listdir('.') if isfile(join('.',f))]
             files = [f.split('-V') for f in files if f.startswith(interactive.name) and f.endswith('.dsipy')]
@@ -70,7 +63,19 @@ class WidgetSavedData(object):
                 version = '-V'+str(max(versions))
         else:
             version = '-V' + version
-        file_name = name+version+'.dsipy'
+        return name+version+'.dsipy'
+
+    @staticmethod
+    def load_widget_data(interactive, version=''):
+        
+        file_name = WidgetSavedData.file_name(interactive, version=interactive.version)
+        if SessionFile.is_session_file(file_name) is True:
+            session = SessionFile(file_name)
+            saved = session.load()
+            interactive.__dict__.update(saved)
+            interactive._session_path = session.path
+            interactive._session_ds = saved.get('ds')
+            return
         f = open(file_name, 'r')
         saved_data = pickle.load(f)
         f.close()
@@ -83,8 +88,8 @@ class WidgetSavedData(object):
     
     def __init__(self, interactive):
         setattr(self, 'saved', {})
-        save_fields = ['ds' if interactive.save_data_structures is True else '',
-                       'equations',
+        setattr(self, 'interactive', interactive)
+        save_fields = ['equations',
                        'name',
                        'version',
                        'pvals',
@@ -92,21 +97,52 @@ class WidgetSavedData(object):
                        'codominance',
                        'auxiliary',
                        'constraints',
-                       'table_data',
                        'symbols',
                        'options',]
         self.saved.update({i:interactive.__dict__[i] for i in save_fields if i in interactive.__dict__})
-        figure_data = interactive.figure_data
-        figure_data = [tuple([base64.b64encode(i[0])] + list(i[1:])) for i in figure_data]
-        self.saved['figure_data'] = figure_data
         
     def save_data(self):
+        ''' Saves the session to its file. If the file already holds the
+            design space and the earlier figures of the session, only the new
+            figures and the widget state are appended to it.
+        '''
+        interactive = self.interactive
         version = self.saved['version']
         if version != '':
             version = '-V'+self.saved['version']
-        f = open(self.saved['name']+version+'.dsipy', 'w')
-        pickle.dump(self, f)
-        f.close() 
+        session = SessionFile(self.saved['name']+version+'.dsipy')
+        ds = interactive.ds if interactive.save_data_structures is True else None
+        figures = interactive.figure_data
+        tables = interactive.table_data
+        if self._appendable(session, ds) is True:
+            figures = session.append(self.saved, tables, figures)
+        else:
+            figures = session.write(self.saved, tables, figures, ds=ds)
+        interactive.figure_data = figures
+        interactive._session_path = session.path
+        interactive._session_ds = ds
+
+    def _appendable(self, session, ds):
+        interactive = self.interactive
+        if getattr(interactive, '_session_path', None) != session.path:
+            return False
+        if getattr(interactive, '_session_ds', None) is not ds:
+            return False
+        if SessionFile.is_session_file(session.path) is False:
+            return False
+        if session.has_design_space is not (ds is not None):
+            return False
+        number_of_figures = session.number_of_figures
+        figures = interactive.figure_data
+        if number_of_figures > len(figures):
+            return False
+        for index in range(number_of_figures):
+            image = figures[index][0]
+            if isinstance(image, SessionImage) is False:
+                return False
+            if image.path != session.path or image.index != index:
+                return False
+        return True
                        
 
 class InteractiveInput(object):
@@ -237,30 +273,36 @@ class InteractiveInput(object):
         self.widget.selected_index = index
         
     def enumerate_phenotypes_menu(self, b):
+        from cases_widget import CasesTable
         cases_table = CasesTable(self)
         return cases_table.cases_table_widget()
         
         
     def case_report_menu(self, b):
+        from case_widget import CaseReport
         case_report = CaseReport(self, 
                                  self.defaults('by_signature'))
         return case_report.create_case_widget()
 
     def co_localize_menu(self, b):
+        from co_localize_widget import CaseColocalization
         case_report = CaseColocalization(self, 
                                          self.defaults('by_signature'))
         return case_report.colocalization_widget()
     
     def case_intersect_menu(self, b):
+        from case_intersection_widget import CaseIntersection
         case_report = CaseIntersection(self,
                                        self.defaults('by_signature'))
         return case_report.case_intersection_widget()
     
     def full_system_menu(self,b):
+        from fullsystem_widget import FullSystem
         fullsystem = FullSystem(self)
         return fullsystem.fullsystem_widget()
 
     def evolution_menu(self,b):
+        from evolution_widget import Evolution
         evolution = Evolution(self)
         return evolution.create_evolution_widget()
 
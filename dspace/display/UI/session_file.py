@@ -0,0 +1,277 @@
+''' Session files of the interactive input.
+
+A session file is a zip archive with one entry per part of a saved session:
+
+    manifest.json           The name and version of the format.
+    designspace.pickle      The design space, if its data structures are saved.
+    state-NNNN.pickle       The remaining widget state. The last one is current.
+    tables-NNNN.json        The saved tables, along with each state.
+    figures/NNNN.png        The image of each figure, stored uncompressed.
+    figures/NNNN.pickle     The title, caption, parameter values and colors of
+                            each figure.
+
+Figure images are read one at a time, when displayed, by mapping the file into
+memory. Saving a session whose design space and earlier figures are already in
+the file only appends the new figures and the new state to it; the earlier
+states are dropped once more than MAX_STATES have accumulated.
+'''
+
+import os
+import json
+import mmap
+import struct
+import tempfile
+import zipfile
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+FORMAT_NAME = 'dsipy'
+FORMAT_VERSION = 1
+
+# The number of states kept in a file before it is compacted.
+MAX_STATES = 4
+
+
+class SessionImage(object):
+    ''' The image of a figure stored in a session file, read when needed. '''
+
+    def __init__(self, path, index):
+        setattr(self, 'path', path)
+        setattr(self, 'index', index)
+
+    def read(self):
+        return SessionFile(self.path).figure_bytes(self.index)
+
+
+def image_bytes(image_data):
+    ''' The PNG data of a figure, reading it from its session file if needed. '''
+    if isinstance(image_data, SessionImage) is True:
+        return image_data.read()
+    return image_data
+
+
+class SessionFile(object):
+    ''' A session of the interactive input saved as a zip archive. '''
+
+    def __init__(self, path):
+        setattr(self, 'path', os.path.abspath(path))
+
+    @staticmethod
+    def is_session_file(path):
+        ''' True if path is a session file, False if it is missing or a
+            pickled session of the earlier format.
+        '''
+        if os.path.isfile(path) is False or zipfile.is_zipfile(path) is False:
+            return False
+        with zipfile.ZipFile(path, 'r') as archive:
+            return 'manifest.json' in archive.namelist()
+
+    def _names(self, archive, prefix, suffix):
+        return sorted([i for i in archive.namelist() if i.startswith(prefix) and i.endswith(suffix)])
+
+    def _check_manifest(self, archive):
+        manifest = json.loads(archive.read('manifest.json').decode('utf-8'))
+        if manifest.get('format') != FORMAT_NAME:
+            raise ValueError(self.path + ' is not a design space session file')
+        if manifest.get('version', 0) > FORMAT_VERSION:
+            raise ValueError(self.path + ' was saved by a newer version of the design space toolbox')
+
+    @property
+    def number_of_figures(self):
+        with zipfile.ZipFile(self.path, 'r') as archive:
+            return len(self._names(archive, 'figures/', '.png'))
+
+    @property
+    def has_design_space(self):
+        with zipfile.ZipFile(self.path, 'r') as archive:
+            return 'designspace.pickle' in archive.namelist()
+
+    def load(self):
+        ''' The saved widget state, with the design space, the tables and the
+            figures. Figure images are returned as SessionImage objects.
+        '''
+        with zipfile.ZipFile(self.path, 'r') as archive:
+            self._check_manifest(archive)
+            states = self._names(archive, 'state-', '.pickle')
+            saved = pickle.loads(archive.read(states[-1]))
+            tables = self._names(archive, 'tables-', '.json')
+            saved['table_data'] = json.loads(archive.read(tables[-1]).decode('utf-8'))
+            if 'designspace.pickle' in archive.namelist():
+                saved['ds'] = pickle.loads(archive.read('designspace.pickle'))
+            saved['figure_data'] = self._figures(archive)
+        return saved
+
+    def _figures(self, archive):
+        figures = list()
+        for index, name in enumerate(self._names(archive, 'figures/', '.pickle')):
+            figures.append(tuple([SessionImage(self.path, index)] + list(pickle.loads(archive.read(name)))))
+        return figures
+
+    def figure_bytes(self, index):
+        ''' The PNG data of a figure, read directly from its place in the
+            file.
+        '''
+        name = 'figures/%04d.png' % index
+        with open(self.path, 'rb') as f:
+            with zipfile.ZipFile(f, 'r') as archive:
+                info = archive.getinfo(name)
+                if info.compress_type != zipfile.ZIP_STORED or info.file_size == 0:
+                    return archive.read(name)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                header = mapped[info.header_offset:info.header_offset+30]
+                name_length, extra_length = struct.unpack('<HH', header[26:30])
+                start = info.header_offset + 30 + name_length + extra_length
+                return mapped[start:start+info.file_size]
+            finally:
+                mapped.close()
+
+    def _write_figures(self, archive, figures, first):
+        for index, figure in enumerate(figures):
+            index += first
+            archive.writestr('figures/%04d.png' % index,
+                             image_bytes(figure[0]),
+                             compress_type=zipfile.ZIP_STORED)
+            archive.writestr('figures/%04d.pickle' % index,
+                             pickle.dumps(tuple(figure[1:]), 2),
+                             compress_type=zipfile.ZIP_DEFLATED)
+
+    def _write_state(self, archive, saved, tables, index):
+        self._write_state_data(archive, pickle.dumps(saved, 2), json.dumps(tables), index)
+
+    def _write_state_data(self, archive, state, tables, index):
+        archive.writestr('state-%04d.pickle' % index,
+                         state,
+                         compress_type=zipfile.ZIP_DEFLATED)
+        archive.writestr('tables-%04d.json' % index,
+                         tables,
+                         compress_type=zipfile.ZIP_DEFLATED)
+
+    def _add_state(self, archive, state, tables):
+        # A state identical to the current one is not added again. Returns
+        # the number of states in the file.
+        states = self._names(archive, 'state-', '.pickle')
+        if len(states) > 0:
+            current = archive.read(states[-1])
+            current_tables = archive.read(self._names(archive, 'tables-', '.json')[-1])
+            if current == state and current_tables.decode('utf-8') == tables:
+                return len(states)
+        self._write_state_data(archive, state, tables, len(states))
+        return len(states) + 1
+
+    def compact(self):
+        ''' Rewrites the file with its current state only, copying the
+            design space and the figures as they are stored.
+        '''
+        directory = os.path.dirname(self.path)
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(handle)
+        try:
+            with zipfile.ZipFile(self.path, 'r') as source:
+                self._check_manifest(source)
+                state = self._names(source, 'state-', '.pickle')[-1]
+                tables = self._names(source, 'tables-', '.json')[-1]
+                with zipfile.ZipFile(temporary, 'w') as archive:
+                    for info in source.infolist():
+                        if info.filename.startswith(('state-', 'tables-')) is True:
+                            continue
+                        archive.writestr(info, source.read(info.filename),
+                                         compress_type=info.compress_type)
+                    self._write_state_data(archive, source.read(state),
+                                           source.read(tables).decode('utf-8'), 0)
+        except:
+            os.remove(temporary)
+            raise
+        os.remove(self.path)
+        os.rename(temporary, self.path)
+
+    def write(self, saved, tables, figures, ds=None):
+        ''' Writes a new session file, replacing any file at its path.
+
+        Args:
+            saved (dict): The widget state, without design space, tables and
+                figures.
+            tables (list): The saved tables.
+            figures (list): The saved figures, as tuples starting with their
+                image.
+
+        Kwargs:
+            ds (DesignSpace): The design space, if it is saved.
+
+        Returns:
+            The figures, with their images read from the new file.
+        '''
+        directory = os.path.dirname(self.path)
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(handle)
+        try:
+            with zipfile.ZipFile(temporary, 'w') as archive:
+                archive.writestr('manifest.json',
+                                 json.dumps(dict(format=FORMAT_NAME, version=FORMAT_VERSION)))
+                if ds is not None:
+                    archive.writestr('designspace.pickle',
+                                     pickle.dumps(ds, 2),
+                                     compress_type=zipfile.ZIP_DEFLATED)
+                self._write_figures(archive, figures, 0)
+                self._write_state(archive, saved, tables, 0)
+        except:
+            os.remove(temporary)
+            raise
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(temporary, self.path)
+        with zipfile.ZipFile(self.path, 'r') as archive:
+            return self._figures(archive)
+
+    def append(self, saved, tables, figures):
+        ''' Adds the figures beyond those already in the file, and the new
+            widget state unless it is unchanged. The file is compacted once it
+            holds more than MAX_STATES states.
+
+        Returns:
+            The figures, with their images read from the file.
+        '''
+        with zipfile.ZipFile(self.path, 'a') as archive:
+            self._check_manifest(archive)
+            first = len(self._names(archive, 'figures/', '.png'))
+            self._write_figures(archive, figures[first:], first)
+            states = self._add_state(archive, pickle.dumps(saved, 2), json.dumps(tables))
+        if states > MAX_STATES:
+            self.compact()
+        with zipfile.ZipFile(self.path, 'r') as archive:
+            return self._figures(archive)
+
+    def tables(self):
+        ''' The saved tables of the current state. '''
+        with zipfile.ZipFile(self.path, 'r') as archive:
+            self._check_manifest(archive)
+            tables = self._names(archive, 'tables-', '.json')
+            return json.loads(archive.read(tables[-1]).decode('utf-8'))
+
+    def replace_tables(self, tables):
+        ''' Adds a new state with the given tables and the widget state of the
+            current one. The file is compacted once it holds more than
+            MAX_STATES states.
+        '''
+        with zipfile.ZipFile(self.path, 'a') as archive:
+            self._check_manifest(archive)
+            state = archive.read(self._names(archive, 'state-', '.pickle')[-1])
+            states = self._add_state(archive, state, json.dumps(tables))
+        if states > MAX_STATES:
+            self.compact()
+
+    def remove_figures(self, indices):
+        ''' Rewrites the file without the figures at indices, keeping its
+            current state.
+
+        Returns:
+            The remaining figures, with their images read from the new file.
+        '''
+        saved = self.load()
+        ds = saved.pop('ds', None)
+        tables = saved.pop('table_data')
+        figures = [figure for index, figure in enumerate(saved.pop('figure_data')) if index not in indices]
+        return self.write(saved, tables, figures, ds=ds)
@@ -33,6 +33,7 @@ else:
 
     
 from IPython.display import clear_output, display
+from session_file import SessionFile
 
 
 class DisplayTables(object):
@@ -103,11 +104,16 @@ class DisplayTables(object):
             file_name = controller.name + ".dsipy"
         else:
             file_name = controller.name + '-V' + str(version) + ".dsipy"
-        f = open(file_name, "r")
-        saved_data = pickle.load(f)
-        f.close()
-
-        tables = saved_data.saved["table_data"]
+        if SessionFile.is_session_file(file_name) is True:
+            session = SessionFile(file_name)
+            saved_data = None
+            tables = session.tables()
+        else:
+            session = None
+            f = open(file_name, "r")
+            saved_data = pickle.load(f)
+            f.close()
+            tables = saved_data.saved["table_data"]
 
         # Extract Single Figures
         string = b.indValue.value
@@ -146,13 +152,16 @@ class DisplayTables(object):
                 count += 1
         tables = tables_updated_nr
 
-        saved_data.saved["table_data"] = tables
         controller.table_data = tables
         # controller.figure_data = Figures
 
-        f = open(file_name, "w")
-        pickle.dump(saved_data, f)
-        f.close()
+        if session is not None:
+            session.replace_tables(tables)
+        else:
+            saved_data.saved["table_data"] = tables
+            f = open(file_name, "w")
+            pickle.dump(saved_data, f)
+            f.close()
         sucessMessage = Latex()
         sucessMessage.value = "Tables were deleted and file was updated!"
         self.delete_menu.children = [sucessMessage, self.delete_tables_button]
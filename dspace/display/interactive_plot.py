@@ -45,9 +45,13 @@ if StrictVersion(IPython.__version__) < StrictVersion('4.0.0'):
     from IPython.html.widgets import ImageWidget as Image
     VBox = Box
     HBox = Box
+    slider_options = dict()
 else:
     from ipywidgets import *
     Popup = HBox
+    # Redraw once a slider is released, rather than for every position it
+    # passes through while dragged.
+    slider_options = dict(continuous_update=False)
     
 from IPython.display import clear_output, display
 import cStringIO
@@ -88,7 +92,8 @@ def colorbar_tabs(colors):
     return html_str
 
 def make_2D_slice(ds=None, p_vals=None, x_variable=None, y_variable=None,
-                  range_x=None, range_y=None, intersections=None, image_widget=None, highlight='', **kwargs):
+                  range_x=None, range_y=None, intersections=None, image_widget=None, highlight='',
+                  engine=None, **kwargs):
     colors = None
     image_widget_colorbar =[]
     for i in kwargs:
@@ -109,11 +114,11 @@ def make_2D_slice(ds=None, p_vals=None, x_variable=None, y_variable=None,
     if image_widget.description == 'Figure_No_Colorbar':
         colors = ds.draw_2D_slice(ax, p_vals, str(x_variable), str(y_variable),
                                  x_range, y_range,
-                         intersections=intersections, colorbar=False)
+                         intersections=intersections, colorbar=False, engine=engine)
     else:
         ds.draw_2D_slice(ax, p_vals, str(x_variable), str(y_variable),
                          x_range, y_range,
-                         intersections=intersections)
+                         intersections=intersections, engine=engine)
 
 
     highlight = str(highlight)
@@ -158,7 +163,10 @@ def draw_2D_slice_notebook(self, p_vals, x_variable, y_variable, range_x, range_
     # image_container.set_title(1, 'Colorbar')
     # image_container.selected_index = 0
 
+    engine = dspace.plotutils.designspace_plot.SliceEngine(self, str(x_variable), str(y_variable),
+                                                           range_x, range_y)
     plot_widget = interactive(make_2D_slice, ds=fixed(self), 
+                              engine=fixed(engine),
                               p_vals=fixed(p_vals),
                               x_variable=fixed(x_variable),
                               y_variable=fixed(y_variable), 
@@ -174,14 +182,15 @@ def draw_2D_slice_notebook(self, p_vals, x_variable, y_variable, range_x, range_
                               **{i:FloatSlider(min=log10(slider_ranges[i][0]),
                                                max=log10(slider_ranges[i][1]),
                                                step=log10(slider_ranges[i][1]/slider_ranges[i][0])/20,
-                                               value=log10(slider_ranges[i][0]*slider_ranges[i][1])/2 if log10(p_vals[i])==0 else log10(p_vals[i]))   #value=log10(p_vals[i]))
+                                               value=log10(slider_ranges[i][0]*slider_ranges[i][1])/2 if log10(p_vals[i])==0 else log10(p_vals[i]),
+                                               **slider_options)   #value=log10(p_vals[i]))
                               for i in slider_ranges}
                               )
 
     make_2D_slice(ds=self, p_vals=p_vals,
                   x_variable=x_variable, y_variable=y_variable,
                   range_x=range_x, range_y=range_y, 
-                  image_widget=image_container, #intersections=range(1,100) # intersections=range(1, 100),  for single and triple [1, 3]
+                  image_widget=image_container, engine=engine, #intersections=range(1,100) # intersections=range(1, 100),  for single and triple [1, 3]
                   highlight='', **kwargs)
     return plot_widget
     
@@ -1,6 +1,136 @@
 from dspace.SWIG.dspace_interface import *
 from dspace.variables import VariablePool
 
+import re
+import numpy as np
+
+_token_pattern = re.compile(r'''\s*(?:
+                            (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|
+                            (?P<name>[A-Za-z_$][A-Za-z0-9_$]*)|
+                            (?P<operator>[-+*/^(),])
+                            )''', re.VERBOSE)
+
+_compiled_functions = dict()
+
+def _tokenize(string):
+    ''' Splits the string form of an expression into (kind, token) pairs, where
+        kind is 'number', 'name' or 'operator'.
+    '''
+    tokens = list()
+    position = 0
+    string = string.strip()
+    while position < len(string):
+        match = _token_pattern.match(string, position)
+        if match is None or match.end() == position:
+            raise ValueError('Cannot tokenize expression: ' + string)
+        position = match.end()
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+    return tokens
+
+def _power_law_terms(expression):
+    ''' Parses an expression into power-law terms.
+
+    Returns:
+        A list of (coefficient, exponents) tuples, where exponents is a
+        dictionary mapping variable names to their exponent in the term, or
+        None if the expression is not a sum of power-law terms.
+    '''
+    try:
+        tokens = _tokenize(str(expression))
+    except ValueError:
+        return None
+    terms = list()
+    position = 0
+
+    def number_at(position):
+        # Returns a signed number, optionally in parenthesis, and the next position.
+        closing = False
+        if position < len(tokens) and tokens[position][1] == '(':
+            closing = True
+            position += 1
+        sign = 1.
+        while position < len(tokens) and tokens[position][1] in ('+', '-'):
+            if tokens[position][1] == '-':
+                sign = -sign
+            position += 1
+        if position >= len(tokens) or tokens[position][0] != 'number':
+            return None, position
+        value = sign*float(tokens[position][1])
+        position += 1
+        if closing is True:
+            if position >= len(tokens) or tokens[position][1] != ')':
+                return None, position
+            position += 1
+        return value, position
+
+    while position < len(tokens):
+        coefficient = 1.
+        while position < len(tokens) and tokens[position][1] in ('+', '-'):
+            if tokens[position][1] == '-':
+                coefficient = -coefficient
+            position += 1
+        exponents = dict()
+        divide = False
+        while True:
+            if position >= len(tokens):
+                return None
+            kind, token = tokens[position]
+            name = None
+            if kind == 'name':
+                if position+1 < len(tokens) and tokens[position+1][1] == '(':
+                    return None
+                name = token
+                position += 1
+            else:
+                value, position = number_at(position)
+                if value is None:
+                    return None
+            exponent = 1.
+            if position < len(tokens) and tokens[position][1] == '^':
+                exponent, position = number_at(position+1)
+                if exponent is None:
+                    return None
+            if divide is True:
+                exponent = -exponent
+            if name is None:
+                coefficient *= value**exponent
+            else:
+                exponents[name] = exponents.get(name, 0.) + exponent
+            if position < len(tokens) and tokens[position][1] in ('*', '/'):
+                divide = tokens[position][1] == '/'
+                position += 1
+                continue
+            break
+        if position < len(tokens) and tokens[position][1] not in ('+', '-'):
+            return None
+        terms.append((coefficient, exponents))
+    return terms
+
+def _numpy_functions():
+    ''' Numpy equivalents of the mathematical functions of DSExpression. The
+        base of 'log' is taken from the C library itself the first time it is
+        needed.
+    '''
+    if len(_compiled_functions) > 0:
+        return _compiled_functions
+    log_base = Expression('log(x)').eval_with_values(x=100.)
+    if abs(log_base - 2.) < 1e-12:
+        log = np.log10
+    else:
+        log = np.log
+    _compiled_functions.update(log=log,
+                               ln=np.log,
+                               log10=np.log10,
+                               exp=np.exp,
+                               sqrt=np.sqrt,
+                               abs=np.abs,
+                               sin=np.sin,
+                               cos=np.cos,
+                               tan=np.tan,
+                               real=np.real,
+                               imag=np.imag)
+    return _compiled_functions
+
 class Expression(object):
     
     def __init__(self, string_repr):
@@ -67,6 +197,65 @@ class Expression(object):
         return DSExpressionEvaluateWithVariablePool(self._swigwrapper,
                                                     p_vals._swigwrapper)
     
+    def compile(self, variables=None):
+        ''' Compiles the expression into a numpy-vectorized function.
+
+        The expression tree is translated once into a Python function of the
+        values of its variables, which can then be called with scalars or
+        arrays without building VariablePools or calling into C.
+
+        Kwargs:
+            variables (list): The names of the arguments of the compiled
+                function, in order. Defaults to the variables of the
+                expression.
+
+        Returns:
+            A function accepting one value or array per variable, in the order
+            given, and returning the value of the expression broadcast over
+            its arguments.
+        '''
+        if variables is None:
+            variables = self.variables
+        variables = list(variables)
+        string = str(self)
+        if '=' in string or '<' in string or '>' in string:
+            raise ValueError('Only expressions, not equations or conditions, can be compiled')
+        functions = _numpy_functions()
+        arguments = dict()
+        for index, name in enumerate(variables):
+            arguments[name] = '_x' + str(index)
+        tokens = _tokenize(string)
+        source = list()
+        for index, (kind, token) in enumerate(tokens):
+            if kind == 'number':
+                source.append(repr(float(token)))
+            elif kind == 'operator':
+                source.append('**' if token == '^' else token)
+            elif index+1 < len(tokens) and tokens[index+1][1] == '(':
+                if token not in functions:
+                    raise NameError(str(token) + ' is not a supported function')
+                source.append('_functions[' + repr(token) + ']')
+            else:
+                if token not in arguments:
+                    raise NameError(str(token) + ' is not a variable of the compiled function')
+                source.append(arguments[token])
+        argument_names = [arguments[name] for name in variables]
+        namespace = dict(_functions=functions)
+        code = 'def _compiled(' + ', '.join(argument_names) + '):\n'
+        code += '    return ' + ' '.join(source) + '\n'
+        exec(code, namespace)
+        compiled = namespace['_compiled']
+        def evaluate(*values):
+            if len(values) != len(variables):
+                raise TypeError('Compiled expression takes ' + str(len(variables)) + ' values')
+            values = [np.asarray(value, dtype=float) for value in values]
+            result = np.asarray(compiled(*values), dtype=float)
+            if all([value.shape == result.shape for value in values]) is False:
+                result = np.broadcast_arrays(result, *values)[0]
+            return np.array(result, dtype=float)
+        evaluate.variables = variables
+        return evaluate
+
     @property
     def lhs(self):
         expr = None
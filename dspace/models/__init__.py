@@ -0,0 +1,13 @@
+import sys
+import importlib
+
+# Submodules that are not imported by dspace, such as fullsystem, are imported
+# when first accessed as attributes of dspace.models.
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        try:
+            return importlib.import_module('dspace.models.' + name)
+        except ImportError as error:
+            if getattr(error, 'name', None) != 'dspace.models.' + name:
+                raise
+        raise AttributeError("module 'dspace.models' has no attribute '" + name + "'")
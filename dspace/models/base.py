@@ -4,6 +4,7 @@
 
 
 '''
+import sys
 import string
 
 SWIG_REQUIREMENTS = ['DSSSystemNumberOfEquations',
@@ -145,6 +146,14 @@ class Model(object):
         else:
             self._latex.update(equations._latex)
 
+    def __getattr__(self, name):
+        ''' Loads the plotting methods added by dspace.plotutils the first
+            time one of them is used.
+        '''
+        if name.startswith(('draw_', '_draw_')) and 'dspace.plotutils' not in sys.modules:
+            import dspace.plotutils
+            return getattr(self, name)
+        raise AttributeError("'" + type(self).__name__ + "' object has no attribute '" + name + "'")
 
     @property
     def name(self):
@@ -0,0 +1,249 @@
+''' Caches of design spaces and of their cases.
+
+Design spaces are stored as the encoded bytes of the C object, keyed by a
+hash of everything that determines its construction. Entries are evicted in
+least recently used order once the cache exceeds its size limit, and entries
+written by a different version of the design space toolbox are ignored.
+'''
+
+import os
+import json
+import hashlib
+import pickle
+import tempfile
+import weakref
+from collections import OrderedDict
+
+from dspace.SWIG.dspace_interface import DSDesignSpaceToolboxVersionString
+
+
+class DesignSpaceCache(object):
+    ''' A content-addressed, size-bounded cache of design spaces in a local
+        directory.
+    '''
+
+    def __init__(self, directory=None, max_size=512*1024**2):
+        ''' Init method for the design space cache.
+
+        Kwargs:
+            directory (str): The cache directory. Defaults to the
+                DSPACE_CACHE_DIR environment variable, or to 'dspace' in the
+                user cache directory.
+            max_size (int): The maximum size of the cache, in bytes.
+        '''
+        if directory is None:
+            directory = os.environ.get('DSPACE_CACHE_DIR')
+        if directory is None:
+            base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+            directory = os.path.join(base, 'dspace')
+        setattr(self, 'directory', directory)
+        setattr(self, 'max_size', max_size)
+        setattr(self, 'version', DSDesignSpaceToolboxVersionString())
+
+    def key(self, **components):
+        ''' A hash of the components that determine a design space and of the
+            toolbox version.
+        '''
+        components['__version__'] = self.version
+        string = json.dumps(components, sort_keys=True)
+        return hashlib.sha256(string.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.ds')
+
+    def get(self, key):
+        ''' Returns the encoded design space stored under key, or None. '''
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                version, encoded = pickle.load(f)
+        except (IOError, OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None
+        if version != self.version:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return encoded
+
+    def put(self, key, encoded):
+        ''' Stores an encoded design space under key and evicts the least
+            recently used entries if the cache exceeds its maximum size.
+        '''
+        try:
+            if os.path.isdir(self.directory) is False:
+                os.makedirs(self.directory)
+            handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as f:
+                pickle.dump((self.version, encoded), f, protocol=2)
+            path = self._path(key)
+            self._remove(path)
+            os.rename(temporary, path)
+        except (IOError, OSError):
+            return
+        self._evict()
+
+    def _entries(self):
+        entries = list()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if name.endswith('.ds') is False:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        size = sum([entry[1] for entry in entries])
+        for mtime, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            self._remove(path)
+            size -= entry_size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        ''' Removes every design space from the cache. '''
+        for mtime, size, path in self._entries():
+            self._remove(path)
+
+    @property
+    def size(self):
+        return sum([entry[1] for entry in self._entries()])
+
+
+class CaseCache(object):
+    ''' An in-memory cache of Case objects, keyed by case identifier and
+        constraints.
+
+    The most recently used cases are kept alive, up to max_size of them. Older
+    cases remain available for as long as they are referenced elsewhere.
+    '''
+
+    def __init__(self, max_size=256):
+        setattr(self, 'max_size', max_size)
+        setattr(self, '_recent', OrderedDict())
+        setattr(self, '_alive', weakref.WeakValueDictionary())
+
+    @staticmethod
+    def key(identifier, constraints=None):
+        if constraints is not None:
+            constraints = tuple(str(i) for i in constraints)
+        return (str(identifier), constraints)
+
+    def get(self, key):
+        case = self._recent.pop(key, None)
+        if case is None:
+            case = self._alive.get(key)
+        if case is not None:
+            self._store(key, case)
+        return case
+
+    def put(self, key, case):
+        self._alive[key] = case
+        self._store(key, case)
+
+    def _store(self, key, case):
+        self._recent[key] = case
+        while len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
+
+    def invalidate(self, identifiers=None):
+        ''' Removes cases from the cache.
+
+        Kwargs:
+            identifiers (list): The case identifiers to remove. All cases are
+                removed if None.
+        '''
+        if identifiers is None:
+            self._recent.clear()
+            self._alive.clear()
+            return
+        if isinstance(identifiers, (int, str)):
+            identifiers = [identifiers]
+        identifiers = set(str(i) for i in identifiers)
+        for key in list(self._recent.keys()):
+            if key[0] in identifiers:
+                del self._recent[key]
+        for key in list(self._alive.keys()):
+            if key[0] in identifiers:
+                self._alive.pop(key, None)
+
+    def __len__(self):
+        return len(self._alive)
+
+
+class ValueCache(object):
+    ''' An in-memory cache of values keyed by tuples whose first entry is a
+        (case identifier, constraints) key, as used by DesignSpace.case_table.
+
+    The most recently used values are kept, up to max_size of them.
+    '''
+
+    def __init__(self, max_size=100000):
+        setattr(self, 'max_size', max_size)
+        setattr(self, '_values', OrderedDict())
+
+    def get(self, key, default=None):
+        if key not in self._values:
+            return default
+        value = self._values.pop(key)
+        self._values[key] = value
+        return value
+
+    def put(self, key, value):
+        self._values.pop(key, None)
+        self._values[key] = value
+        while len(self._values) > self.max_size:
+            self._values.popitem(last=False)
+
+    def invalidate(self, identifiers=None):
+        ''' Removes the values of cases from the cache.
+
+        Kwargs:
+            identifiers (list): The case identifiers whose values are removed.
+                All values are removed if None.
+        '''
+        if identifiers is None:
+            self._values.clear()
+            return
+        if isinstance(identifiers, (int, str)):
+            identifiers = [identifiers]
+        identifiers = set(str(i) for i in identifiers)
+        for key in list(self._values.keys()):
+            if str(key[0][0]) in identifiers:
+                del self._values[key]
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+
+_default_cache = None
+
+def default_cache():
+    ''' The design space cache used when DesignSpace is called with
+        cache=True.
+    '''
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DesignSpaceCache()
+    return _default_cache
@@ -13,10 +13,101 @@ from dspace.models.ssystem import SSystem
 from dspace.expressions import Expression
 import numpy as np
 import itertools
+import copy
+from collections import OrderedDict
+import functools
 from math import *
 import random
 
 
+def _frozen(value):
+    ''' A hashable equivalent of an argument, used to key memoized results.
+        Raises TypeError if the value cannot be made hashable.
+    '''
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _frozen(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return (value.shape, tuple(value.ravel().tolist()))
+    hash(value)
+    return value
+
+def _memoized(method):
+    ''' Decorator that memoizes a Case method on its bound arguments. Cached
+        results are copied on the way out, so callers are free to modify them.
+    '''
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            key = (method.__name__, _frozen(args), _frozen(kwargs))
+        except TypeError:
+            return method(self, *args, **kwargs)
+        memo = self.__dict__.setdefault('_memo', dict())
+        if key not in memo:
+            memo[key] = method(self, *args, **kwargs)
+        return _memo_copy(memo[key])
+    return wrapper
+
+def _memo_copy(value):
+    if isinstance(value, VariablePool):
+        return value.copy()
+    return copy.deepcopy(value)
+
+def _linear_inequalities(inequalities, names):
+    ''' Matrix form (A, b) of inequalities that are affine in the logarithm of
+        the variables, such that A.dot(y) < b for log10 values y ordered as
+        names. The inequalities are evaluated at the origin of log space and
+        one unit along each axis.
+    '''
+    n = len(names)
+    points = 10.**np.vstack([np.zeros(n), np.eye(n)])
+    A = np.zeros((len(inequalities), n))
+    b = np.zeros(len(inequalities))
+    for i in range(len(inequalities)):
+        inequality = inequalities[i]
+        if '<' in str(inequality):
+            low, high = inequality.lhs, inequality.rhs
+        else:
+            low, high = inequality.rhs, inequality.lhs
+        slack = _evaluate_at_points(high, names, points) - _evaluate_at_points(low, names, points)
+        A[i] = slack[0] - slack[1:]
+        b[i] = slack[0]
+    return A, b
+
+def _evaluate_at_points(expression, names, points):
+    try:
+        function = expression.compile(names)
+        return function(*[points[:, j] for j in range(len(names))])
+    except (NameError, ValueError):
+        values = list()
+        for point in points:
+            values.append(expression.eval_with_values(p_vals=VariablePool(names=OrderedDict(zip(names, point)))))
+        return np.array(values)
+
+def _halton(number, dimension):
+    ''' The first points of the Halton sequence in the unit hypercube,
+        excluding the origin.
+    '''
+    primes = list()
+    candidate = 2
+    while len(primes) < dimension:
+        if all([candidate % prime != 0 for prime in primes]):
+            primes.append(candidate)
+        candidate += 1
+    points = np.empty((number, dimension))
+    for j, base in enumerate(primes):
+        indices = np.arange(1, number+1)
+        values = np.zeros(number)
+        fraction = 1./base
+        while np.any(indices > 0):
+            values += fraction*(indices % base)
+            indices //= base
+            fraction /= base
+        points[:, j] = values
+    return points
+
+
 class Case(Model):
     
     def __init__(self, model, swigwrapper, name=None, constraints=None, latex_symbols=None, **kwargs):
@@ -40,6 +131,7 @@ class Case(Model):
                 constraints = [constraints]
             if len(constraints) > 0:
                 DSCaseAddConstraints(self._swigwrapper, constraints, len(constraints))
+        setattr(self, '_constraints', constraints)
             
     def __del__(self):
         ''' 
@@ -59,6 +151,7 @@ class Case(Model):
     def __getstate__(self):
         odict = self.__dict__.copy()
         odict['_swigwrapper'] = DSSWIGDSCaseEncodedBytes(self._swigwrapper)
+        odict.pop('_memo', None)
         del odict['_ssystem']
         del odict['_independent_variables']
         return odict
@@ -70,6 +163,7 @@ class Case(Model):
                
     def set_swigwrapper(self, case_swigwrapper):
         self._swigwrapper = case_swigwrapper
+        self.clear_memo()
         Xd = VariablePool()
         Xd.set_swigwrapper(DSVariablePoolCopy(DSSSystemXd(DSCaseSSystem(case_swigwrapper))))
         for i in VariablePool():
@@ -93,6 +187,12 @@ class Case(Model):
                                 swigwrapper=DSCaseSSystem(case_swigwrapper),
                                 latex_symbols=self._latex)
 
+    def clear_memo(self):
+        ''' Discards the memoized results of valid_interior_parameter_set,
+            bounding_box, volume and condition_matrices.
+        '''
+        self.__dict__['_memo'] = dict()
+
     @property
     def dependent_variables(self):
         return self._dependent_variables.keys()
@@ -171,6 +271,7 @@ class Case(Model):
 
         return pvals
     
+    @_memoized
     def valid_interior_parameter_set(self, p_bounds=None, distance=50, **kwargs):
 
         pvals = self.valid_parameter_set(p_bounds=p_bounds, **kwargs)
@@ -287,6 +388,7 @@ class Case(Model):
         pstate.set_swigwrapper(variablepool)
         return pstate
 
+    @_memoized
     def volume(self, ignore_unbounded=True, log_coordinate=False, shared_boundaries=False, method='Tolerances',
                **kwargs):
 
@@ -570,6 +672,68 @@ class Case(Model):
             #do something
         return DSCaseConditionsAreValid(self._swigwrapper)
  
+    @_memoized
+    def condition_matrices(self, state_space=False):
+        ''' The boundaries of the case as linear inequalities in log space.
+
+        A point whose log10 values are y, ordered as the independent
+        variables, lies in the case if A.dot(y) < b.
+
+        Kwargs:
+            state_space (bool): If True, the dominance conditions are used
+                instead, over the dependent followed by the independent
+                variables.
+
+        Returns:
+            The tuple (A, b) of arrays, or None if the case has no boundaries,
+            as when its S-system has no steady state.
+        '''
+        if state_space is True:
+            inequalities = self.conditions_log
+            names = self.dependent_variables + self.independent_variables
+        else:
+            inequalities = self.boundaries_log
+            names = self.independent_variables
+        if inequalities is None:
+            return None
+        return _linear_inequalities(inequalities, names)
+
+    def contains(self, log_points, strict=True, state_space=False):
+        ''' Tests many points for membership in the case at once.
+
+        Args:
+            log_points (array): The log10 values of the points, one point per
+                row, ordered as the independent variables, or as the dependent
+                followed by the independent variables if state_space is True.
+
+        Kwargs:
+            strict (bool): If False, points on a boundary are included.
+            state_space (bool): If True, the dominance conditions are tested.
+
+        Returns:
+            A boolean array with one entry per point.
+        '''
+        log_points = np.atleast_2d(np.asarray(log_points, dtype=float))
+        matrices = self.condition_matrices(state_space=state_space)
+        if matrices is None:
+            names = self.independent_variables
+            if state_space is True:
+                names = self.dependent_variables + names
+            point = VariablePool(names=names)
+            valid = list()
+            for values in log_points:
+                point.set_values(10.**values)
+                if state_space is True:
+                    valid.append(self.is_consistent(point))
+                else:
+                    valid.append(self.is_valid(p_bounds=point, strict=strict))
+            return np.array(valid, dtype=bool)
+        A, b = matrices
+        slack = b - log_points.dot(A.T)
+        if strict is True:
+            return np.all(slack > 0, axis=1)
+        return np.all(slack >= 0, axis=1)
+
     def is_valid(self, p_bounds=None, strict=True):
         
         if p_bounds is not None:
@@ -606,6 +770,7 @@ class Case(Model):
             #do something
         return DSCaseIsValidInStateSpace(self._swigwrapper)
     
+    @_memoized
     def bounding_box(self, p_bounds=None, log_out=False):
         lower = VariablePool(names=self.independent_variables)
         upper = VariablePool(names=self.independent_variables)
@@ -941,26 +1106,46 @@ class Case(Model):
         neighbors_list = [str(DSUIntegerVectorValueAtIndex(neighbors_vector, i)) for i in range(DSUIntegerVectorDimension(neighbors_vector))]
         return neighbors_list
 
-    def sample_valid_points(self, p_bounds=None, nr_points=10):
+    def sample_valid_points(self, p_bounds=None, nr_points=10, max_samples=10000):
+        ''' Points of the case spread over its bounding box.
+
+        The bounding box is sampled with a Halton sequence of nr_points to the
+        power of the number of sampled variables points, up to max_samples,
+        and the points lying in the case are kept.
+
+        Kwargs:
+            p_bounds (dict): Parameter ranges, or fixed values, limiting the
+                bounding box.
+            nr_points (int): The number of points per sampled variable.
+            max_samples (int): The maximum number of points sampled.
+
+        Returns:
+            A list of VariablePools, one per valid point.
+        '''
         # 1. Generate a list containing bounding box in each dimension.
         box = self.bounding_box(p_bounds=p_bounds, log_out=True)
         variables = self.independent_variables
+        sampled = [key for key in variables if key in box]
+        if len(sampled) == 0 or nr_points < 1:
+            return []
+
+        # 2. Spread quasi-random points over the box; variables fixed by p_bounds keep their value.
+        number = int(min(float(nr_points)**len(sampled), max_samples))
+        unit = _halton(number, len(sampled))
+        points = np.empty((number, len(variables)))
+        for index, key in enumerate(variables):
+            if key in box:
+                lower, upper = box[key]
+                points[:, index] = lower + (upper-lower)*unit[:, sampled.index(key)]
+            else:
+                points[:, index] = np.log10(p_bounds[key])
 
-        # 2. generate a list of coordinates for each dimension to sample the space
-        coordinates_seed = []
-        for key in variables:
-            coordinates_seed.append(np.linspace(box[key][0], box[key][1], nr_points))
-
-        # 3. Use the itertools.product function to generate list of points
-        points = itertools.product(*coordinates_seed)
-
+        # 3. Check for validity of all points at once.
         valid_points = []
-        # 4. Check for validity
-        for point in points:
-            validity, p = self.generate_pool_validity(point)
-            if validity is True:
-                valid_points.append(p)
-
+        for point in points[self.contains(points, strict=True)]:
+            pvals = VariablePool(names=variables)
+            pvals.set_values(10.**point)
+            valid_points.append(pvals)
         return valid_points
 
     def generate_pool_validity(self, point):
@@ -978,11 +1163,17 @@ class Case(Model):
                                         nr_points=0,
                                         average_method='Average'):
 
+        if nr_points < 1:
+            raise ValueError('nr_points must be positive for the Grid method')
+
         # 1Get the bounding box and sample nr_points. Let us create a function for that. Do this for both case1
         # and case2.
         valid_p1 = self.sample_valid_points(p_bounds=p_bounds, nr_points=nr_points)
         valid_p2 = case2.sample_valid_points(p_bounds=p_bounds, nr_points=nr_points)
 
+        if len(valid_p1) == 0 or len(valid_p2) == 0:
+            raise ValueError('No valid points could be sampled for the Grid method')
+
         #  For each point in valid_p1, calculate mutation rate for valid_p2.
         mutation_rate = 0
         total_points = 0
@@ -1026,6 +1217,21 @@ class Case(Model):
         print("The mutation rate is: ", mutation_rate)
         return mutation_rate
 
+    def operating_point(self, method='Tolerances', p_bounds=None):
+        ''' A representative parameter set of the case, calculated with one of
+            the methods used for mutation rates: 'Tolerances', 'Bounding Box',
+            'Vertex Enumeration' or 'Geometric Mean T. & BB.'.
+        '''
+        if method == 'Tolerances':
+            return self.valid_interior_parameter_set(p_bounds=p_bounds)
+        if method == 'Bounding Box':
+            return self.valid_interior_parameter_bounding_box(p_bounds=p_bounds)
+        if method == 'Vertex Enumeration':
+            return self.valid_interior_parameter_set_vertex_enumeration(p_bounds=p_bounds)
+        if method == 'Geometric Mean T. & BB.':
+            return self.valid_interior_parameter_geometric_mean_t_bb(p_bounds=p_bounds)
+        raise ValueError('Unknown operating point method: ' + str(method))
+
     def mutation_rate_to_phenotype(self, case2, identity,
                                    lamb=1.0,
                                    delta=1.5,
@@ -1037,25 +1243,15 @@ class Case(Model):
         if identity is None:
             raise ValueError("Please set the identity of each parameter in the Edit Parameters tab")
 
-        if method == 'Tolerances':
-            p1 = self.valid_interior_parameter_set(p_bounds=p_bounds)
-            p2 = case2.valid_interior_parameter_set(p_bounds=p_bounds)
-        elif method == 'Bounding Box':
-            p1 = self.valid_interior_parameter_bounding_box(p_bounds=p_bounds)
-            p2 = case2.valid_interior_parameter_bounding_box(p_bounds=p_bounds)
-        elif method == 'Vertex Enumeration':
-            p1 = self.valid_interior_parameter_set_vertex_enumeration(p_bounds=p_bounds)
-            p2 = case2.valid_interior_parameter_set_vertex_enumeration(p_bounds=p_bounds)
-        elif method == 'Geometric Mean T. & BB.':
-            p1 = self.valid_interior_parameter_geometric_mean_t_bb(p_bounds=p_bounds)
-            p2 = case2.valid_interior_parameter_geometric_mean_t_bb(p_bounds=p_bounds)
-        elif method == 'Grid':
+        if method == 'Grid':
             return self.mutation_rate_to_phenotype_grid(case2, identity,
                                                         lamb=lamb,
                                                         delta=delta,
                                                         p_bounds=p_bounds,
                                                         nr_points=nr_points,
                                                         average_method=average_method)
+        p1 = self.operating_point(method=method, p_bounds=p_bounds)
+        p2 = case2.operating_point(method=method, p_bounds=p_bounds)
 
         mutation = DSPopDynamicsMutationRateForTransition(p1._swigwrapper,
                                                           p2._swigwrapper,
@@ -90,6 +90,7 @@ class CyclicalCase(Case):
     def __getstate__(self):
         odict = self.__dict__.copy()
         odict['_swigwrapper'] = DSSWIGDSCyclicalCaseEncodedBytes(self._swigwrapper)
+        odict.pop('_memo', None)
         del odict['_ssystem']
         del odict['_independent_variables']
         del odict['_dependent_variables']
@@ -221,6 +222,7 @@ class CyclicalCase(Case):
 
     def set_swigwrapper(self, swigwrapper):
         self._swigwrapper = swigwrapper
+        self.clear_memo()
         ## ds_swigwrapper = DSCyclicalCaseInternalDesignSpace(swigwrapper)
         
         Xd = VariablePool()
@@ -300,6 +302,13 @@ class CyclicalCase(Case):
         cases.sort()
         return cases
     
+    def condition_matrices(self, state_space=False):
+        ''' A cyclical case is the union of its subcases, which is not
+            described by a single set of linear inequalities, so points are
+            tested one by one by Case.contains.
+        '''
+        return None
+
     def is_valid(self, p_bounds=None, strict=True):
         valid_subcases = self.valid_subcases(p_bounds=p_bounds)
         if len(valid_subcases) > 0:
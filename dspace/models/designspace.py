@@ -3,6 +3,7 @@
 
 '''
 import itertools
+import multiprocessing
 import sys
 
 from dspace.SWIG.dspace_interface import *
@@ -10,9 +11,11 @@ from dspace.variables import VariablePool
 from dspace.models.base import Equations,Model
 from dspace.models.gma import GMASystem
 from dspace.models.ssystem import SSystem
-from dspace.models.case import Case, CaseIntersection, CaseColocalization
+from dspace.models.case import Case, CaseIntersection, CaseColocalization, _frozen
 from dspace.models.cyclicalcase import CyclicalCase
+from dspace.models.cache import DesignSpaceCache, CaseCache, ValueCache, default_cache
 from dspace.expressions import Expression
+from dspace.parallel import Executor, worker_design_space
 import time
 import numpy as np
 from functools import cmp_to_key
@@ -33,6 +36,26 @@ def sort_cases(x, y):
     return 0
 
 
+def _signature_list(signature):
+    ''' Parses a signature string, with indices above 9 in parenthesis, into
+        a list of integers.
+    '''
+    siglist = []
+    i = 0
+    while i < len(signature):
+        if signature[i] == '(':
+            start = i + 1
+            while signature[i] != ')':
+                i += 1
+            siglist.append(int(signature[start:i]))
+        else:
+            siglist.append(int(signature[i]))
+        i += 1
+    return siglist
+
+def _signature_string(signature):
+    return ''.join([str(i) if i < 10 else '(' + str(i) + ')' for i in signature])
+
 class DesignSpace(GMASystem):
     
     def __init__(self, equations,
@@ -50,6 +73,7 @@ class DesignSpace(GMASystem):
                  skip_overlapping_codominant_phenotypes=True,
                  consider_mass_balances=False,
                  codominance_adjust_boundaries=False,
+                 cache=True,
                  **kwargs):
         ''' Initializes a new object with the input parameters for a routine
             analysis.
@@ -67,16 +91,57 @@ class DesignSpace(GMASystem):
             resolve_cycles (bool): A flag indicating if cycles should be
                automatically resolved. Setting this to true adds significant
                overhead._valid_cases_expand_cyclesDSDesignSpaceCalculateAllValidCases
+
+            cache (bool or DesignSpaceCache): If True, the design space is
+               loaded from, or stored in, the default on-disk cache. A
+               DesignSpaceCache object can be passed to use a different cache
+               directory or size limit.
         '''
 
         if parameter_dict is not None:
             equations = equations.replace_symbols(parameter_dict)
+        if cache is True:
+            cache = default_cache()
+        elif isinstance(cache, DesignSpaceCache) is False:
+            cache = None
+        cache_key = None
+        encoded = None
+        if cache is not None:
+            if Xi is not None:
+                cache_Xi = [str(i) for i in Xi]
+            elif match_Xi is not None:
+                cache_Xi = list(match_Xi.independent_variables)
+            else:
+                cache_Xi = None
+            if constraints is not None and isinstance(constraints, list) is False:
+                cache_constraints = [constraints]
+            else:
+                cache_constraints = constraints
+            cache_key = cache.key(equations=equations.system,
+                                  auxiliary_variables=equations.auxiliary_variables,
+                                  Xi=cache_Xi,
+                                  constraints=cache_constraints,
+                                  resolve_cycles=bool(resolve_cycles),
+                                  resolve_instability=bool(resolve_instability),
+                                  resolve_conservations=bool(resolve_conservations),
+                                  number_conservations=number_conservations,
+                                  resolve_codominance=bool(resolve_codominance),
+                                  adjust_codominant_stoichiometry=bool(adjust_codominant_stoichiometry),
+                                  skip_overlapping_codominant_phenotypes=bool(skip_overlapping_codominant_phenotypes),
+                                  consider_mass_balances=bool(consider_mass_balances),
+                                  codominance_adjust_boundaries=bool(codominance_adjust_boundaries))
+            encoded = cache.get(cache_key)
         super(DesignSpace, self).__init__(equations,
                                           Xi=Xi,
                                           match_Xi=match_Xi,
-                                          latex_symbols=latex_symbols, **kwargs)
+                                          latex_symbols=latex_symbols,
+                                          encoded=encoded,
+                                          **kwargs)
 
         setattr(self, '_resolve_cycles', False)
+        if encoded is not None:
+            setattr(self, '_resolve_cycles', resolve_cycles == True)
+            return
         if constraints is not None:
             if isinstance(constraints, list) is False:
                 constraints = [constraints]
@@ -100,8 +165,13 @@ class DesignSpace(GMASystem):
         if resolve_cycles == True:
             setattr(self, '_resolve_cycles', True)
             DSDesignSpaceCalculateCyclicalCases(self._swigwrapper)
+        if cache is not None:
+            cache.put(cache_key, DSSWIGDSDesignSpaceEncodedBytes(self._swigwrapper))
         
     def __del__(self):
+        executor = self.__dict__.get('_executor')
+        if executor is not None:
+            executor.terminate()
         if self._swigwrapper is not None:
             DSDesignSpaceFree(self._swigwrapper)
 
@@ -112,6 +182,9 @@ class DesignSpace(GMASystem):
         odict = self.__dict__.copy()
         odict['_swigwrapper'] = DSSWIGDSDesignSpaceEncodedBytes(self._swigwrapper)
         del odict['_independent_variables']
+        del odict['_case_cache']
+        del odict['_case_table_cache']
+        odict.pop('_executor', None)
         return odict
 
     def __setstate__(self, state):
@@ -149,20 +222,9 @@ class DesignSpace(GMASystem):
         return [self(str(index)+subcase, constraints=constraints)]
 
     def case_number_for_signature(self, signature):
-        siglist = []
-        i = 0
         if signature == 'Negativevaluefound!':
             return None
-
-        while i < len(signature):
-            if signature[i] == '(':
-                start = i + 1
-                while signature[i] != ')':
-                    i += 1
-                siglist.append(int(signature[start:i]))
-            else:
-                siglist.append(int(signature[i]))
-            i += 1
+        siglist = _signature_list(signature)
         index = DSCaseNumberForSignature(siglist, DSDesignSpaceGMASystem(self._swigwrapper))
         return index
     
@@ -184,24 +246,12 @@ class DesignSpace(GMASystem):
                 if index[0] == ':':
                     cases += self._case_with_signature(index[1:], constraints)
                     continue
-                case_swig = DSDesignSpaceCaseWithCaseIdentifier(self._swigwrapper, index)
-                if case_swig is None:
-                    raise ValueError('Case "' + index + '" does not exist')
-                name = self.name + ': Case ' + index
-                case = Case(self,
-                            case_swig,
-                            name,
-                            constraints=constraints)
-                eq=Equations(case.equations.system,
-                              case.auxiliary_variables)
-                cyclical_swig = DSDesignSpaceCyclicalCaseWithCaseIdentifier(self._swigwrapper, index)
-                if cyclical_swig is not None:
-                    cyclical = CyclicalCase(eq, cyclical_swig,
-                                            name=case.name + ' (cyclical)',
-                                            latex_symbols=self._latex)
-                    cases.append(cyclical)
-                else:
-                    cases.append(case)
+                key = CaseCache.key(index, constraints)
+                case = self._case_cache.get(key)
+                if case is None:
+                    case = self._new_case(index, constraints)
+                    self._case_cache.put(key, case)
+                cases.append(case)
             else:
                 raise TypeError('input argument must be a case identifier or case signature')
         if len(cases) == 1:
@@ -209,11 +259,102 @@ class DesignSpace(GMASystem):
                 cases = cases[0]
         return cases
             
+    def _new_case(self, index, constraints):
+        case_swig = DSDesignSpaceCaseWithCaseIdentifier(self._swigwrapper, index)
+        if case_swig is None:
+            raise ValueError('Case "' + index + '" does not exist')
+        name = self.name + ': Case ' + index
+        case = Case(self,
+                    case_swig,
+                    name,
+                    constraints=constraints)
+        eq=Equations(case.equations.system,
+                      case.auxiliary_variables)
+        cyclical_swig = DSDesignSpaceCyclicalCaseWithCaseIdentifier(self._swigwrapper, index)
+        if cyclical_swig is not None:
+            case = CyclicalCase(eq, cyclical_swig,
+                                name=case.name + ' (cyclical)',
+                                latex_symbols=self._latex)
+        return case
+
+    def invalidate_cases(self, identifiers=None):
+        ''' Discards cached Case objects, and their case table values, so that
+            the next call to the design space builds them anew.
+
+        Kwargs:
+            identifiers (list): The case identifiers to discard. Every cached
+                case is discarded if None.
+        '''
+        self._case_cache.invalidate(identifiers)
+        self._case_table_cache.invalidate(identifiers)
+
+    def iter_cases(self, ids=None, valid_only=False, chunk_size=1000, by_signature=False, constraints=None):
+        ''' Iterates over cases of the design space, building each case only
+            when it is reached.
+
+        Cases already held by the design space are reused, but new cases are
+        not kept by it, so their memory is released as soon as the caller
+        drops them.
+
+        Kwargs:
+            ids (iterable): Case identifiers, or signatures if by_signature is
+                True. Defaults to every case number of the design space.
+            valid_only (bool): If True, only valid cases are yielded.
+                When ids is None, the cases are found by the C library one
+                chunk at a time, unless the design space resolves cycles,
+                instability or codominance.
+            chunk_size (int): The number of case numbers checked together
+                when ids is None and only valid cases are yielded.
+            by_signature (bool): If True, ids are case signatures.
+            constraints (list): Constraints added to each case.
+
+        Yields:
+            Case objects, in the order of ids.
+        '''
+        if constraints is not None:
+            if isinstance(constraints, list) is False:
+                constraints = [constraints]
+        if ids is None and valid_only is True and self._resolve_cycles is False:
+            if DSDesignSpaceUnstable(self._swigwrapper) is False and DSDesignSpaceResolveCoDominance(self._swigwrapper) is False:
+                # Constraints only remove valid regions, so cases valid with
+                # constraints are among those valid without them.
+                ids = self._iter_valid_case_numbers(chunk_size)
+                valid_only = constraints is not None
+        if ids is None:
+            ids = range(1, self.number_of_cases+1)
+        elif isinstance(ids, (int, str)) is True:
+            ids = [ids]
+        for index in ids:
+            if by_signature is True:
+                cases = self._case_with_signature(str(index), constraints)
+            else:
+                index = str(index)
+                case = self._case_cache.get(CaseCache.key(index, constraints))
+                if case is None:
+                    case = self._new_case(index, constraints)
+                cases = [case]
+            for case in cases:
+                if valid_only is True and case.is_valid() is False:
+                    continue
+                yield case
+
+    def _iter_valid_case_numbers(self, chunk_size):
+        number_of_cases = self.number_of_cases
+        for first in range(1, number_of_cases+1, chunk_size):
+            last = min(first+chunk_size, number_of_cases+1)
+            for identifier in self._valid_cases_in_range(first, last, None, None, True):
+                yield identifier
+
     def _parse_equations(self, 
                          Xi=None,
                          match_Xi=None, 
+                         encoded=None,
                          **kwargs):
         auxiliary_variables = self.auxiliary_variables
+        if encoded is not None:
+            self.set_swigwrapper(DSSWIGDSDesignSpaceDecodeFromByteArray(encoded))
+            self._load_gma_equations()
+            return
         if Xi is not None:
             Xi = [i for i in Xi]
         elif match_Xi is not None:
@@ -233,23 +374,13 @@ class DesignSpace(GMASystem):
                                                               len(Xi),
                                                               )
         self.set_swigwrapper(swigwrapper)
-        gma = DSDesignSpaceGMASystem(self._swigwrapper)
-        eqs = DSGMASystemEquations(gma)
-        equation_list = list()
-        for i in range(0, DSGMASystemNumberOfEquations(gma)):
-            expr = DSExpressionAtIndexOfExpressionArray(eqs, i)
-            equation_list.append(DSExpressionAsString(expr))
-            DSExpressionFree(expr)
-        DSSecureFree(eqs)
-        Xda = VariablePool()
-        Xda.set_swigwrapper(DSVariablePoolCopy(DSGMASystemXd_a(gma)))
-        equations = Equations(equation_list, 
-                              auxiliary_variables=Xda.keys(), 
-                              latex_symbols=self._latex)
-        self._equations = equations
+        self._load_gma_equations()
 
     def update_latex_symbols(self, symbols):
         self._latex.update(symbols)
+        self._load_gma_equations()
+
+    def _load_gma_equations(self):
         gma = DSDesignSpaceGMASystem(self._swigwrapper)
         eqs = DSGMASystemEquations(gma)
         equation_list = list()
@@ -267,6 +398,8 @@ class DesignSpace(GMASystem):
                 
     def set_swigwrapper(self, ds_swigwrapper):
         self._swigwrapper = ds_swigwrapper
+        self._case_cache = CaseCache()
+        self._case_table_cache = ValueCache()
         
         Xd = VariablePool()
         Xd.set_swigwrapper(DSGMASystemXd(DSDesignSpaceGMASystem(ds_swigwrapper)))
@@ -336,21 +469,7 @@ class DesignSpace(GMASystem):
         return DSDesignSpaceFoutAtIndex(self._swigwrapper, i)
 
     def _valid_cases_bounded(self, p_bounds, strict):
-        lower = VariablePool(names=self.independent_variables)
-        upper = VariablePool(names=self.independent_variables)
-        for i in lower:
-            lower[i] = 1E-20
-            upper[i] = 1E20
-        for (key,value) in p_bounds.items():
-            try:
-                min_value,max_value = value
-            except TypeError:
-                min_value = value
-                max_value = value
-            if min_value > max_value:
-                raise ValueError('parameter slice bounds are inverted: min is larger than max')
-            lower[key] = min_value
-            upper[key] = max_value
+        lower, upper = self._slice_bounds(p_bounds)
         if strict is True:
             valid_cases = DSDesignSpaceCalculateAllValidCasesForSlice(self._swigwrapper,
                                                                       lower._swigwrapper,
@@ -432,11 +551,104 @@ class DesignSpace(GMASystem):
             DSSecureFree(all_subcases)
         return cases
 
-    def valid_cases(self, p_bounds=None, expand_cycles=True, strict=True):
+    def _slice_bounds(self, p_bounds):
+        lower = VariablePool(names=self.independent_variables)
+        upper = VariablePool(names=self.independent_variables)
+        for i in lower:
+            lower[i] = 1E-20
+            upper[i] = 1E20
+        for (key,value) in p_bounds.items():
+            try:
+                min_value,max_value = value
+            except TypeError:
+                min_value = value
+                max_value = value
+            if min_value > max_value:
+                raise ValueError('parameter slice bounds are inverted: min is larger than max')
+            lower[key] = min_value
+            upper[key] = max_value
+        return lower, upper
+
+    def _valid_cases_in_range(self, first, last, lower, upper, strict):
+        cases = list()
+        for case_number in range(first, last):
+            case_swigwrapper = DSDesignSpaceCaseWithCaseNumber(self._swigwrapper, case_number)
+            if case_swigwrapper is None:
+                continue
+            if lower is None:
+                valid = DSCaseIsValid(case_swigwrapper, strict)
+            else:
+                valid = DSCaseIsValidAtSlice(case_swigwrapper,
+                                             lower._swigwrapper,
+                                             upper._swigwrapper,
+                                             strict)
+            if valid is True:
+                cases.append(DSCaseIdentifier(case_swigwrapper))
+            DSCaseFree(case_swigwrapper)
+        return cases
+
+    def _valid_cases_parallel(self, p_bounds, strict, workers):
+        if p_bounds is None:
+            # DSDesignSpaceCalculateAllValidCases only checks cases strictly.
+            strict = True
+        number_of_cases = self.number_of_cases
+        shards = min(number_of_cases, workers*8)
+        edges = np.linspace(1, number_of_cases+1, shards+1).astype(int)
+        ranges = [(edges[i], edges[i+1]) for i in range(shards) if edges[i] < edges[i+1]]
+        cases = list()
+        for shard in self.executor(workers).imap(_valid_cases_worker,
+                                                 [(first, last, p_bounds, strict) for first, last in ranges]):
+            cases += shard
+        return cases
+
+    def executor(self, workers=None):
+        ''' The persistent pool of worker processes of the design space.
+
+        The workers receive a snapshot of the design space once, when the
+        pool starts, and are reused by every method that takes a number of
+        workers; changes made to the design space afterwards are not seen by
+        them. A single pool is kept, with the largest number of workers
+        requested so far, and each call runs on at most the number of workers
+        it asks for. The pool is stopped when the design space is deleted.
+
+        Kwargs:
+            workers (int): The number of worker processes. Defaults to the
+                number of processors.
+
+        Returns:
+            A dspace.parallel.Executor.
+        '''
+        current = self.__dict__.get('_executor')
+        if current is None:
+            current = Executor(self, workers=workers)
+            setattr(self, '_executor', current)
+        return current.limit(workers)
+
+    def valid_cases(self, p_bounds=None, expand_cycles=True, strict=True, workers=1):
+        ''' The identifiers of the valid cases of the design space, sorted.
+
+        Kwargs:
+            p_bounds (dict): Parameter ranges, or fixed values, of the slice
+                in which the cases must be valid.
+            expand_cycles (bool): If True, and cycles are resolved, cyclical
+                cases are replaced by their valid subcases.
+            strict (bool): If False, cases valid only on the boundary of the
+                slice are included. Without p_bounds, cases are always checked
+                strictly, as by the C library.
+            workers (int): The number of processes over which the case
+                numbers are sharded. Cases are checked one by one by each
+                process, so this pays off only for very large design spaces.
+                Design spaces resolving instability or codominance, and those
+                resolving cycles when expand_cycles is True, are always
+                enumerated in a single process.
+        '''
         if self._resolve_cycles is False:
             expand_cycles = False
         if expand_cycles is True:
             return self._valid_cases_expand_cycles(p_bounds, strict=strict)
+        if workers is not None and workers > 1:
+            if DSDesignSpaceUnstable(self._swigwrapper) is False and DSDesignSpaceResolveCoDominance(self._swigwrapper) is False:
+                return self._valid_cases_parallel(p_bounds, strict, workers)
         if p_bounds is not None:
             return self._valid_cases_bounded(p_bounds, strict)
         all_cases = DSDesignSpaceCalculateAllValidCases(self._swigwrapper)
@@ -471,55 +683,166 @@ class DesignSpace(GMASystem):
             case_numbers = self._cyclical_case_as_subcases(i, case_numbers)
         return case_numbers
         
-    def valid_intersecting_cases(self, intersects, case_numbers, p_bounds=None, strict=True):
+    def _log_bounding_boxes(self, cases, p_bounds, dimensions=None):
+        ''' Log-space bounding boxes of cases within p_bounds, as two n x d
+            arrays of lower and upper bounds, with dimensions sorted by name
+            unless given. Dimensions a case does not bound are left infinite.
+        '''
+        boxes = list()
+        for case in cases:
+            try:
+                boxes.append(case.bounding_box(p_bounds=p_bounds, log_out=True))
+            except Exception:
+                boxes.append(dict())
+        if dimensions is None:
+            dimensions = sorted(set(key for box in boxes for key in box))
+        lower = np.full((len(cases), len(dimensions)), -np.inf)
+        upper = np.full((len(cases), len(dimensions)), np.inf)
+        for i, box in enumerate(boxes):
+            for j, key in enumerate(dimensions):
+                if key in box and len(box[key]) == 2:
+                    lower[i, j] = min(box[key])
+                    upper[i, j] = max(box[key])
+        return lower, upper
+
+    def locate_cases(self, log_points, case_numbers=None, p_bounds=None, strict=True):
+        ''' The cases in which each of many points lies.
+
+        Points are sorted along each parameter once. The candidate points of a
+        case are then read off the sorted order along the parameter its
+        bounding box limits the most, screened against the rest of the box,
+        and tested against the boundaries of the case with a single matrix
+        product.
+
+        Args:
+            log_points (array): The log10 parameter values of the points, one
+                point per row, ordered as the independent variables.
+
+        Kwargs:
+            case_numbers (list): The cases considered. Defaults to the valid
+                cases within p_bounds.
+            p_bounds (dict): Parameter ranges used to find the valid cases
+                and bounding boxes.
+            strict (bool): If False, points on a boundary belong to the case.
+
+        Returns:
+            A tuple (cases, indptr, indices) in compressed sparse row form:
+            the cases of point i are cases[j] for j in
+            indices[indptr[i]:indptr[i+1]].
+        '''
+        log_points = np.atleast_2d(np.asarray(log_points, dtype=float))
+        variables = self.independent_variables
+        if log_points.shape[1] != len(variables):
+            raise ValueError('Points must have one column per independent variable')
+        if case_numbers is None:
+            case_numbers = self.valid_cases(p_bounds=p_bounds)
+        case_numbers = [str(i) for i in case_numbers]
+        cases = self(case_numbers)
+        number_of_points = log_points.shape[0]
+        lower, upper = self._log_bounding_boxes(cases, p_bounds, dimensions=variables)
+        if p_bounds is None:
+            # Ranges reaching the default limits of the bounding box are unbounded.
+            lower[lower <= -20.] = -np.inf
+            upper[upper >= 20.] = np.inf
+        order = np.argsort(log_points, axis=0, kind='mergesort')
+        sorted_points = np.sort(log_points, axis=0)
+        point_indices = list()
+        case_indices = list()
+        for i, case in enumerate(cases):
+            lo = np.array([np.searchsorted(sorted_points[:, j], lower[i, j], side='left')
+                           for j in range(len(variables))])
+            hi = np.array([np.searchsorted(sorted_points[:, j], upper[i, j], side='right')
+                           for j in range(len(variables))])
+            if len(variables) > 0:
+                axis = int(np.argmin(hi - lo))
+                candidates = order[lo[axis]:hi[axis], axis]
+            else:
+                candidates = np.arange(number_of_points)
+            if len(candidates) == 0:
+                continue
+            inside = np.all((log_points[candidates] >= lower[i]) & (log_points[candidates] <= upper[i]), axis=1)
+            candidates = candidates[inside]
+            if len(candidates) == 0:
+                continue
+            candidates = candidates[case.contains(log_points[candidates], strict=strict)]
+            point_indices.append(candidates)
+            case_indices.append(np.full(len(candidates), i, dtype=int))
+        if len(point_indices) > 0:
+            point_indices = np.concatenate(point_indices)
+            case_indices = np.concatenate(case_indices)
+        else:
+            point_indices = np.array([], dtype=int)
+            case_indices = np.array([], dtype=int)
+        sort = np.lexsort((case_indices, point_indices))
+        indices = case_indices[sort]
+        indptr = np.zeros(number_of_points+1, dtype=int)
+        indptr[1:] = np.cumsum(np.bincount(point_indices, minlength=number_of_points))
+        return case_numbers, indptr, indices
+
+    def valid_intersecting_cases(self, intersects, case_numbers, p_bounds=None, strict=True, workers=1):
+        ''' The sets of cases that intersect within p_bounds.
+
+        Cases whose log-space bounding boxes do not overlap cannot intersect,
+        so candidate sets are first screened on the boxes of their members
+        and only the remaining ones are checked with a linear program.
+
+        Args:
+            intersects (list): The numbers of cases per intersection to
+                report.
+            case_numbers (list): The identifiers of the candidate cases.
+
+        Kwargs:
+            p_bounds (dict): The parameter ranges of the slice.
+            strict (bool): Validity criterion for single cases.
+            workers (int): The number of processes checking the feasibility
+                of candidate intersections.
+        '''
         if isinstance(intersects, list) is False:
             intersects = [intersects]
         if len(case_numbers) == 0:
             return None
         intersections = list()        
-        Cases = self(case_numbers)
-        ## for i in xrange(len(Cases)):
-        ##     case = Cases[i]
-        ##     case_num = case.case_number
-        ##     case_numbers = self._cyclical_case_as_subcases(case_num, case_numbers)
-        valid_cases=set(range(len(case_numbers)))
-        if p_bounds is not None:
-            lower = VariablePool(names=self.independent_variables)
-            upper = VariablePool(names=self.independent_variables)
-            for key in lower:
-                lower[key] = 1e-20
-                upper[key] = 1e20
-                for (key,value) in p_bounds.items():
-                    try:
-                        min_value,max_value = value
-                    except TypeError:
-                        min_value = value
-                        max_value = value
-                    if min_value > max_value:
-                        raise ValueError('parameter slice bounds are inverted: min is larger than max')
-                        lower[key] = min_value
-                        upper[key] = max_value
+        Cases = self(list(case_numbers))
         if 1 in intersects:
-            [intersections.append(i) for i in case_numbers if self(i).is_valid(p_bounds=p_bounds, strict=strict) is True]
-        sets = [set([i]) for i in valid_cases]
+            intersections += [case_numbers[i] for i in range(len(case_numbers))
+                              if Cases[i].is_valid(p_bounds=p_bounds, strict=strict) is True]
+        if max(intersects) < 2:
+            return intersections
+        lower, upper = self._log_bounding_boxes(Cases, p_bounds)
+        tolerance = 1e-9
+        overlaps = np.all((lower[:, None, :] <= upper[None, :, :] + tolerance) &
+                          (lower[None, :, :] <= upper[:, None, :] + tolerance), axis=2)
+        pool = None
+        if workers is not None and workers > 1:
+            pool = self.executor(workers)
+        sets = [frozenset([i]) for i in range(len(case_numbers))]
         for i in range(2, max(intersects)+1):
             sets_to_check = sets
-            sets = []
-            identifiers = range(0, len(sets_to_check))
-            comb = itertools.combinations(identifiers, 2)
-            for j in comb:
-                current_set = set()
-                for k in j:
-                    current_set = current_set.union(sets_to_check[k])
-                if len(current_set) != i:
+            candidates = list()
+            seen = set()
+            for j in itertools.combinations(range(len(sets_to_check)), 2):
+                current_set = sets_to_check[j[0]] | sets_to_check[j[1]]
+                if len(current_set) != i or current_set in seen:
+                    continue
+                seen.add(current_set)
+                members = sorted(current_set)
+                if bool(overlaps[np.ix_(members, members)].all()) is False:
                     continue
-                if current_set in sets:
+                if bool(np.any(lower[members].max(axis=0) > upper[members].min(axis=0) + tolerance)) is True:
                     continue
-                case_int = CaseIntersection([self(case_numbers[k]) for k in current_set])                
-                if case_int.is_valid(p_bounds=p_bounds) is True:
-                    if i in intersects:
-                        intersections.append([case_numbers[k] for k in current_set])
-                    sets.append(current_set)
+                candidates.append(current_set)
+            if pool is None:
+                valid = [CaseIntersection([Cases[k] for k in current_set]).is_valid(p_bounds=p_bounds)
+                         for current_set in candidates]
+            else:
+                valid = pool.map(_intersection_worker,
+                                 [([case_numbers[k] for k in current_set], p_bounds)
+                                  for current_set in candidates])
+            sets = [current_set for current_set, is_valid in zip(candidates, valid) if is_valid is True]
+            if i in intersects:
+                intersections += [[case_numbers[k] for k in current_set] for current_set in sets]
+            if len(sets) == 0:
+                break
         return intersections
     
     def co_localize_cases(self, case_numbers, slice_parameters, 
@@ -536,61 +859,254 @@ class DesignSpace(GMASystem):
         return co_localized
         
         
-    def maximum_co_localized_cases(self, case_numbers, slice_variables, p_bounds=None):
-        new = False        
+    def maximum_co_localized_cases(self, case_numbers, slice_variables, p_bounds=None,
+                                   maximal=False, workers=1):
+        ''' The largest sets of cases that can be co-localized by varying the
+            slice variables independently for each case.
+
+        Sets are grown level by level, Apriori style: a set of k cases is only
+        checked if every one of its subsets of k-1 cases was found to be
+        co-localized, since co-localization of a set implies that of its
+        subsets.
+
+        Args:
+            case_numbers (list): The identifiers of the candidate cases.
+            slice_variables (list): The parameters allowed to differ between
+                the cases of a set.
+
+        Kwargs:
+            p_bounds (dict): Parameter ranges within which the cases must be
+                co-localized. The range of a slice variable applies to each
+                of its copies.
+            maximal (bool): If True, every co-localized set that is not
+                contained in a larger one is returned, rather than only the
+                sets of the largest size.
+            workers (int): The number of processes checking the feasibility
+                of candidate sets.
+        '''
         if len(case_numbers) == 0:
             return None
-        intersections = list()        
-        Cases = self(case_numbers)
+        if isinstance(slice_variables, list) is False:
+            slice_variables = [slice_variables]
+        case_numbers = list(case_numbers)
+        Cases = self(list(case_numbers))
         for i in range(len(Cases)):
             case = Cases[i]
             case_num = case.case_number
             case_numbers = self._cyclical_case_as_subcases(case_num, case_numbers)
-        valid_cases=range(len(case_numbers))
-        if p_bounds is not None:
-            lower = VariablePool(names=self.independent_variables)
-            upper = VariablePool(names=self.independent_variables)
-            for key in lower:
-                lower[key] = 1e-20
-                upper[key] = 1e20
-                for (key,value) in p_bounds.items():
-                    try:
-                        min_value,max_value = value
-                    except TypeError:
-                        min_value = value
-                        max_value = value
-                    if min_value > max_value:
-                        raise ValueError('parameter slice bounds are inverted: min is larger than max')
-                        lower[key] = min_value
-                        upper[key] = max_value
-        ## [intersections.append(i) for i in case_numbers if self(i).is_valid()is True]
-        sets = [set([i]) for i in valid_cases]
-        for i in range(2, len(case_numbers)+1):
-            new = True
-            sets_to_check = sets
-            sets = []
-            identifiers = range(0, len(sets_to_check))
-            comb = itertools.combinations(identifiers, 2)
-            for j in comb:
-                current_set = set()
-                for k in j:
-                    current_set = current_set.union(sets_to_check[k])
-                if len(current_set) != i:
+        feasible = dict()
+        levels = [[(i,) for i in range(len(case_numbers))]]
+        pool = None
+        if workers is not None and workers > 1:
+            pool = self.executor(workers)
+        while len(levels[-1]) > 0 and len(levels[-1][0]) < len(case_numbers):
+            previous = levels[-1]
+            previous_set = set(previous)
+            candidates = list()
+            for a, b in itertools.combinations(previous, 2):
+                # Joining sets that share all but their last member
+                # generates each candidate exactly once.
+                if a[:-1] != b[:-1]:
                     continue
-                if current_set in sets:
+                candidate = a + (b[-1],)
+                subsets = itertools.combinations(candidate, len(candidate)-1)
+                if all(subset in previous_set for subset in subsets) is False:
                     continue
-                case_int = CaseColocalization([self(case_numbers[k]) for k in current_set], slice_variables) 
-                pvals=case_int.valid_parameter_set()
-                if pvals > 0:
-                    if new is True:
-                        intersections = []
-                    new = False
-                    intersections.append([case_numbers[k] for k in current_set])
-                    sets.append(current_set)
-        return intersections
+                candidates.append(candidate)
+            arguments = [([case_numbers[k] for k in candidate], slice_variables, p_bounds)
+                         for candidate in candidates]
+            if pool is None:
+                results = [_co_localized(self(i), slice_variables, p_bounds) for i, _, _ in arguments]
+            else:
+                results = pool.map(_colocalization_worker, arguments)
+            for candidate, result in zip(candidates, results):
+                feasible[candidate] = result
+            levels.append([candidate for candidate in candidates if feasible[candidate] is True])
+        co_localized = [level for level in levels[1:] if len(level) > 0]
+        if len(co_localized) == 0:
+            return []
+        if maximal is False:
+            return [[case_numbers[k] for k in candidate] for candidate in co_localized[-1]]
+        maximal_sets = list()
+        for level in reversed(co_localized):
+            for candidate in level:
+                members = set(candidate)
+                if any(members < set(larger) for larger in maximal_sets):
+                    continue
+                maximal_sets.append(candidate)
+        return [[case_numbers[k] for k in candidate] for candidate in maximal_sets]
     
-    def intersecting_cases(self, intersects, case_numbers, p_bounds=None, strict=True):
-         valid_ints = self.valid_intersecting_cases(intersects, case_numbers, p_bounds=p_bounds, strict=strict)
+    def mutation_rate_matrix(self, method='Tolerances', lamb=1.0, delta=1.5, identity=None,
+                             p_bounds=None, case_numbers=None, volume_method='Tolerances',
+                             normalize=True, nr_points=10, workers=1):
+        ''' Mutation rates between every pair of cases.
+
+        The operating point and the volume of each case are calculated once,
+        and the rate of each transition is then evaluated between operating
+        points.
+
+        Kwargs:
+            method (str): The method used to calculate operating points, as in
+                Case.operating_point, or 'Grid' to average over sampled points.
+            lamb (float): The lambda parameter of the mutation rate.
+            delta (float): The delta parameter of the mutation rate.
+            identity (VariablePool): The identity of each parameter.
+            p_bounds (dict): The parameter ranges for operating points and
+                volumes.
+            case_numbers (list): The cases to include. Defaults to the valid
+                cases.
+            volume_method (str): The method passed to Case.volume.
+            normalize (bool): If True, each row of rates is divided by the
+                sum of the rates from its case weighted by the volume of the
+                destination case.
+            nr_points (int): The number of points sampled from each case by
+                the 'Grid' method.
+            workers (int): The number of processes of the executor used to
+                calculate volumes, operating points and grid rates.
+
+        Returns:
+            A tuple (rates, case_numbers, volumes), where rates[i, j] is the
+            rate from case_numbers[i] to case_numbers[j] and volumes[i] is the
+            volume of case_numbers[i].
+        '''
+        if identity is None:
+            raise ValueError("Please set the identity of each parameter in the Edit Parameters tab")
+        if method == 'Grid' and nr_points < 1:
+            raise ValueError('nr_points must be positive for the Grid method')
+        if case_numbers is None:
+            case_numbers = self.valid_cases()
+        case_numbers = [str(i) for i in case_numbers]
+        n = len(case_numbers)
+        cases = [self(i) for i in case_numbers]
+        parallel = workers is not None and workers > 1 and n > 1
+        operating_point_method = method if method != 'Grid' else None
+        if parallel is True:
+            data = self.executor(workers).map_cases(_mutation_rate_case_data, case_numbers,
+                                                    args=(volume_method, operating_point_method, p_bounds))
+        else:
+            data = [_mutation_rate_case_data(case, volume_method, operating_point_method, p_bounds)
+                    for case in cases]
+        volumes = np.array([volume for volume, point in data], dtype=float)
+        rates = np.empty((n, n))
+        if method == 'Grid':
+            if parallel is True:
+                rows = self.executor(workers).map_cases(_mutation_rate_row, case_numbers,
+                                                        args=(case_numbers, identity, lamb, delta, p_bounds, nr_points))
+            else:
+                rows = [_mutation_rate_row(case, cases, identity, lamb, delta, p_bounds, nr_points)
+                        for case in cases]
+            for i in range(n):
+                rates[i, :] = rows[i]
+        else:
+            points = [point for volume, point in data]
+            for i in range(n):
+                for j in range(n):
+                    rates[i, j] = DSPopDynamicsMutationRateForTransition(points[i]._swigwrapper,
+                                                                         points[j]._swigwrapper,
+                                                                         lamb,
+                                                                         delta,
+                                                                         identity._swigwrapper)
+        if normalize is True and n > 0:
+            rates = rates/rates.dot(volumes)[:, None]
+        return rates, case_numbers, volumes
+
+    def case_table(self, cases, columns, p_bounds=None, constraints=None, workers=1):
+        ''' A table of properties of cases.
+
+        Each column is described by a dictionary whose 'column' entry names
+        the property, with the options of that property as other entries:
+
+            'Case Number', 'Signature', 'Validity', 'Is a Blowup' and
+            'Is False Blowing' take no options.
+            'Eigenvalues' takes 'root_method' ('Routh Array' or 'Numpy
+            Functions') and 'complex_conjugates'.
+            'Volume' and 'Normalized Volume' take 'method',
+            'ignore_unbounded', 'log_coordinate', 'lower_bound',
+            'upper_bound', 'max_vertices' and 'limit_vertices'. Normalized
+            volumes are divided by the total over the table, unless
+            'normalize' is False.
+            'Dimension' takes 'lower_bound' and 'upper_bound'.
+            'Log-Gain' takes 'dependent' and 'independent'.
+
+        An optional 'name' entry sets the header of the column. Values are
+        memoized per case, column and p_bounds, up to a bounded number of the
+        most recently used ones, so that tables sharing columns, or rebuilt
+        after a change of columns, only compute what is new. Invalid
+        cases show '-', or '*' if cyclical.
+
+        Args:
+            cases (list): Case identifiers or Case objects.
+            columns (list): The column descriptions.
+
+        Kwargs:
+            p_bounds (dict): Parameter ranges used for operating points, and
+                for volumes whose bounds are not given.
+            constraints (list): Constraints added to cases given by
+                identifier.
+            workers (int): The number of processes computing values.
+
+        Returns:
+            A pandas DataFrame indexed by case number.
+        '''
+        import pandas as pd
+        if isinstance(columns, dict) is True:
+            columns = [columns]
+        if constraints is not None and isinstance(constraints, list) is False:
+            constraints = [constraints]
+        cases = [case if isinstance(case, Case) else self(str(case), constraints=constraints)
+                 for case in cases]
+        frozen_bounds = _frozen(p_bounds)
+        specifications = [_frozen(dict((key, value) for key, value in column.items() if key != 'name'))
+                          for column in columns]
+        keys = list()
+        missing = dict()
+        # Values are gathered here, as the bounded cache may evict some of
+        # them while the table is built.
+        found = dict()
+        for case in cases:
+            case_constraints = getattr(case, '_constraints', None)
+            case_key = (case.case_number, _frozen(case_constraints))
+            keys.append(case_key)
+            for index, specification in enumerate(specifications):
+                key = (case_key, specification, frozen_bounds)
+                if key in self._case_table_cache:
+                    found[key] = self._case_table_cache.get(key)
+                    continue
+                missing.setdefault(case_key, (case, list()))[1].append(index)
+        tasks = list(missing.values())
+        if workers is not None and workers > 1 and len(tasks) > 1:
+            results = self.executor(workers).map_cases(_case_table_values,
+                                                       [case for case, indices in tasks],
+                                                       args=(p_bounds,),
+                                                       case_args=[([columns[i] for i in indices],)
+                                                                  for case, indices in tasks])
+        else:
+            results = [[_case_table_value(case, columns[i], p_bounds) for i in indices]
+                       for case, indices in tasks]
+        for (case, indices), values in zip(tasks, results):
+            case_key = (case.case_number, _frozen(getattr(case, '_constraints', None)))
+            for index, value in zip(indices, values):
+                key = (case_key, specifications[index], frozen_bounds)
+                self._case_table_cache.put(key, value)
+                found[key] = value
+        names = [_case_table_column_name(column) for column in columns]
+        data = [[found[(case_key, specification, frozen_bounds)]
+                 for specification in specifications] for case_key in keys]
+        table = pd.DataFrame(data, columns=names, index=[case_key[0] for case_key in keys])
+        table.index.name = 'Case Number'
+        for index, column in enumerate(columns):
+            if column['column'] != 'Normalized Volume' or column.get('normalize', True) is False:
+                continue
+            values = pd.to_numeric(table.iloc[:, index], errors='coerce')
+            total = values.sum()
+            if total == 0:
+                total = 1.
+            table.iloc[:, index] = (values/total).where(values.notnull(), table.iloc[:, index])
+        return table
+
+    def intersecting_cases(self, intersects, case_numbers, p_bounds=None, strict=True, workers=1):
+         valid_ints = self.valid_intersecting_cases(intersects, case_numbers, p_bounds=p_bounds, strict=strict,
+                                                    workers=workers)
          if valid_ints is None:
              return None
          case_ints = [CaseIntersection(self(i)) for i in valid_ints]
@@ -702,13 +1218,154 @@ class DesignSpace(GMASystem):
                 keys_dic = results_dic.keys()
 
         # 2. Get first element of key and loop over its contents to update the dictionary of dependent variables.
+        keys_dic = [str(element) for element in keys_dic]
+        trajectories = np.array([np.asarray(results_dic[element], dtype=float)[:n] for element in keys_dic])
         for ndx in range(n):
-            n_dic = {element: results_dic[element][ndx] for element in keys_dic}
-            xd.update(n_dic)
+            xd.set_values(trajectories[:, ndx], names=keys_dic)
             dom_sig.append(DSDesignSpaceDominantSignature(self._swigwrapper, xi._swigwrapper, xd._swigwrapper))
 
         return dom_sig
 
+    def _dominance_terms(self):
+        ''' Matrix form of the power-law terms of the GMA system, used to
+            find dominant terms. The terms are read from the GMA system of the
+            C library, in the order used by its signatures. Returns None if
+            the system has conservations or resolves codominance, whose
+            dominant signatures are only found by the C library.
+        '''
+        if '_dominance_model' in self.__dict__:
+            return self._dominance_model
+        self._dominance_model = None
+        if self.number_conservations != 0:
+            return None
+        if DSDesignSpaceResolveCoDominance(self._swigwrapper) is True:
+            return None
+        gma = DSDesignSpaceGMASystem(self._swigwrapper)
+        number_of_equations = DSGMASystemNumberOfEquations(gma)
+        signature = self._signature
+        if 2*number_of_equations != len(signature):
+            return None
+        Xd = VariablePool()
+        Xd.set_swigwrapper(DSGMASystemXd(gma))
+        xd_names = Xd.keys()
+        Xd.set_swigwrapper(None)
+        Xi = VariablePool()
+        Xi.set_swigwrapper(DSGMASystemXi(gma))
+        xi_names = Xi.keys()
+        Xi.set_swigwrapper(None)
+        names = list(xd_names) + list(xi_names)
+        coefficients = [DSGMASystemAlpha(gma), DSGMASystemBeta(gma)]
+        dependent = [DSGMASystemGd(gma), DSGMASystemHd(gma)]
+        independent = [DSGMASystemGi(gma), DSGMASystemHi(gma)]
+        number_of_terms = sum(signature)
+        log_coefficients = np.zeros(number_of_terms)
+        exponents = np.zeros((number_of_terms, len(names)))
+        slices = list()
+        k = 0
+        for index in range(number_of_equations):
+            for side in range(2):
+                terms = signature[2*index+side]
+                Kd = DSMatrixArrayMatrix(dependent[side], index)
+                if len(xi_names) > 0:
+                    Ki = DSMatrixArrayMatrix(independent[side], index)
+                else:
+                    Ki = [[] for term in range(terms)]
+                if len(Kd) < terms or len(Ki) < terms:
+                    return None
+                slices.append((k, k+terms))
+                for term in range(terms):
+                    coefficient = coefficients[side][index][term]
+                    if coefficient == 0:
+                        return None
+                    log_coefficients[k] = np.log10(abs(coefficient))
+                    exponents[k, :len(xd_names)] = Kd[term][:len(xd_names)]
+                    exponents[k, len(xd_names):] = Ki[term][:len(xi_names)]
+                    k += 1
+        self._dominance_model = dict(names=names,
+                                     dependent=list(xd_names),
+                                     log_coefficients=log_coefficients,
+                                     exponents=exponents,
+                                     slices=slices)
+        return self._dominance_model
+
+    def dominant_signatures(self, xi, results_dic, n=None):
+        ''' Vectorized dominant signature at each point of a trajectory.
+
+        The log magnitude of every term of the GMA system is computed at all
+        points as a single matrix product of the term exponents with the log
+        values of the variables, and the dominant term of each side of each
+        equation is its argmax. The terms are those of the GMA system of the C
+        library. Systems with conservations or resolving codominance are
+        evaluated point by point by the C library instead.
+
+        Args:
+            xi (dict): Values of the independent variables.
+            results_dic (dict): Arrays with the values of the dependent
+                variables at each point.
+
+        Kwargs:
+            n (int): Number of points. Defaults to the length of the arrays.
+
+        Returns:
+            A tuple (signatures, case_numbers) of integer arrays. The n x 2m
+            array signatures holds the index of the dominant positive and
+            negative term of each equation, and case_numbers holds the number
+            of the corresponding case. Points with negative values have a
+            signature of zeros and a case number of 0.
+        '''
+        dependent = [key for key in results_dic]
+        if n is None:
+            n = len(results_dic[dependent[0]])
+        model = self._dominance_terms()
+        if model is None or any([name not in results_dic for name in model['dependent']]):
+            return self._dominant_signatures_from_c(xi, results_dic, n)
+        values = np.ones((n, len(model['names'])))
+        for column, name in enumerate(model['names']):
+            if name in results_dic:
+                values[:, column] = np.asarray(results_dic[name], dtype=float)[:n]
+            else:
+                values[:, column] = xi[name]
+        valid = np.all(values >= 0, axis=1)
+        for name in dependent:
+            valid &= np.asarray(results_dic[name], dtype=float)[:n] >= 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_values = np.where(values > 0, np.log10(np.abs(values)), -1e300)
+        magnitudes = log_values.dot(model['exponents'].T) + model['log_coefficients']
+        signatures = np.zeros((n, len(model['slices'])), dtype=int)
+        for side, (start, stop) in enumerate(model['slices']):
+            signatures[:, side] = np.argmax(magnitudes[:, start:stop], axis=1) + 1
+        signatures[valid == False, :] = 0
+        return signatures, self._case_numbers_for_signatures(signatures)
+
+    def _dominant_signatures_from_c(self, xi, results_dic, n):
+        results_dic = dict(results_dic)
+        strings = self.dominant_signature(xi, results_dic, n)
+        gma = DSDesignSpaceGMASystem(self._swigwrapper)
+        signatures = np.zeros((n, 2*DSGMASystemNumberOfEquations(gma)), dtype=int)
+        for index, signature in enumerate(strings):
+            signature = signature.strip().replace(' ', '')
+            if signature == 'Negativevaluefound!':
+                continue
+            signatures[index, :] = _signature_list(signature)
+        return signatures, self._case_numbers_for_signatures(signatures)
+
+    def _case_numbers_for_signatures(self, signatures):
+        # Each distinct signature is mapped to its case number only once.
+        case_numbers = np.zeros(len(signatures), dtype=int)
+        if len(signatures) == 0:
+            return case_numbers
+        unique, inverse = np.unique(signatures, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        gma = DSDesignSpaceGMASystem(self._swigwrapper)
+        length = 2*DSGMASystemNumberOfEquations(gma)
+        for index, signature in enumerate(unique):
+            if signature[0] == 0 or len(signature) != length:
+                continue
+            case_number = DSCaseNumberForSignature([int(i) for i in signature], gma)
+            # Signatures that match no case have a case number of 0.
+            case_numbers[inverse == index] = case_number if case_number is not None else 0
+        return case_numbers
+
     def stoichiometric_connectivity_matrices(self):
 
         eqs = self._equations
@@ -929,3 +1586,122 @@ class DesignSpace(GMASystem):
                             metabolic_pools_variable_pool.update({var: metabolic_pools_rxns[rxns_i]})
 
 
+def _case_table_column_name(column):
+    if 'name' in column:
+        return column['name']
+    if column['column'] == 'Log-Gain':
+        return 'L(' + str(column['dependent']) + ',' + str(column['independent']) + ')'
+    return column['column']
+
+def _case_table_bounds(case, column):
+    lower = VariablePool(names=case.independent_variables)
+    upper = VariablePool(names=case.independent_variables)
+    for key in lower:
+        lower[key] = column.get('lower_bound', 1e-20)
+        upper[key] = column.get('upper_bound', 1e20)
+    return lower, upper
+
+def _case_table_value(case, column, p_bounds):
+    # The value of a column of DesignSpace.case_table for a single case.
+    kind = column['column']
+    if kind == 'Case Number':
+        return case.case_number
+    if kind == 'Signature':
+        return case.signature
+    cyclical = case.is_cyclical is True
+    if cyclical is True:
+        case = case.original_case
+    if case.is_valid() is False:
+        return '*' if cyclical is True else '-'
+    if kind == 'Validity':
+        return '+'
+    if kind == 'Is a Blowup':
+        return '-' if case.is_unstable is False else '+'
+    if kind == 'Is False Blowing':
+        return '-' if case.is_false_blowing is False else '+'
+    if kind == 'Eigenvalues':
+        pvals = case.valid_interior_parameter_set(p_bounds=p_bounds)
+        if column.get('root_method', 'Routh Array') == 'Routh Array':
+            return case.positive_roots(pvals)
+        if column.get('complex_conjugates', False) is True:
+            return '+' if case.has_complex_conjugates(pvals) is True else '-'
+        return case.positive_roots_numpy(pvals)
+    if kind == 'Volume' and column.get('method', 'Tolerances') == 'Vertex Enumeration':
+        lower, upper = _case_table_bounds(case, column)
+        value, vertices = case.volume_lrs(lower, upper,
+                                          int(column.get('max_vertices', 0)),
+                                          column.get('limit_vertices', False))
+        return value if vertices != 0 else 0
+    if kind in ['Volume', 'Normalized Volume']:
+        options = dict(ignore_unbounded=column.get('ignore_unbounded', True),
+                       log_coordinate=column.get('log_coordinate', False),
+                       method=column.get('method', 'Tolerances'),
+                       maxVertices=column.get('max_vertices', 0),
+                       limitVertices=column.get('limit_vertices', False))
+        if 'lower_bound' in column or 'upper_bound' in column or p_bounds is None:
+            return case.volume(lowerBounds=column.get('lower_bound', 1e-20),
+                               upperBounds=column.get('upper_bound', 1e20),
+                               **options)
+        return case.volume(p_bounds=p_bounds, **options)
+    if kind == 'Dimension':
+        lower, upper = _case_table_bounds(case, column)
+        return case.dimension(lower, upper)
+    if kind == 'Log-Gain':
+        return case.ssystem.log_gain(str(column['dependent']), str(column['independent']))
+    raise ValueError('Unknown case table column: ' + str(kind))
+
+def _case_table_values(case, columns, p_bounds):
+    return [_case_table_value(case, column, p_bounds) for column in columns]
+
+def _mutation_rate_case_data(case, volume_method, operating_point_method, p_bounds):
+    # The volume of a case and its operating point, if a method is given.
+    volume = case.volume(ignore_unbounded=False,
+                         log_coordinate=True,
+                         shared_boundaries=False,
+                         method=volume_method,
+                         p_bounds=p_bounds,
+                         maxVertices=0,
+                         limitVertices=False)
+    point = None
+    if operating_point_method is not None:
+        point = case.operating_point(method=operating_point_method, p_bounds=p_bounds)
+    return volume, point
+
+def _mutation_rate_row(case, destinations, identity, lamb, delta, p_bounds, nr_points):
+    # The rates from a case to each destination, averaged over sampled points.
+    if len(destinations) > 0 and isinstance(destinations[0], Case) is False:
+        destinations = [worker_design_space()(i) for i in destinations]
+    return [case.mutation_rate_to_phenotype(destination, identity,
+                                            lamb=lamb,
+                                            delta=delta,
+                                            method='Grid',
+                                            p_bounds=p_bounds,
+                                            nr_points=nr_points) for destination in destinations]
+
+def _co_localized(cases, slice_variables, p_bounds):
+    # The range of a slice variable applies to the copy made for each case.
+    if p_bounds is not None:
+        p_bounds = dict(p_bounds)
+        for variable in slice_variables:
+            if variable not in p_bounds:
+                continue
+            for index in range(len(cases)):
+                p_bounds['$' + variable + '_' + str(index)] = p_bounds[variable]
+    pvals = CaseColocalization(cases, slice_variables).valid_parameter_set(p_bounds=p_bounds)
+    return len(pvals) > 0
+
+def _colocalization_worker(arguments):
+    case_numbers, slice_variables, p_bounds = arguments
+    return _co_localized(worker_design_space()(case_numbers), slice_variables, p_bounds)
+
+def _intersection_worker(arguments):
+    case_numbers, p_bounds = arguments
+    return CaseIntersection(worker_design_space()(case_numbers)).is_valid(p_bounds=p_bounds)
+
+def _valid_cases_worker(arguments):
+    first, last, p_bounds, strict = arguments
+    ds = worker_design_space()
+    lower = upper = None
+    if p_bounds is not None:
+        lower, upper = ds._slice_bounds(p_bounds)
+    return ds._valid_cases_in_range(first, last, lower, upper, strict)
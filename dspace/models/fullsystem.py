@@ -8,19 +8,72 @@ from dspace.models.gma import GMASystem
 from dspace.models.ssystem import SSystem
 from dspace.models.case import Case, CaseIntersection, CaseColocalization
 from dspace.models.cyclicalcase import CyclicalCase
-from dspace.expressions import Expression
-from dspace.models.designspace import DesignSpace
+from dspace.expressions import Expression, _power_law_terms
+from dspace.models.designspace import DesignSpace, _signature_string
+from dspace.parallel import worker_full_system
 import numpy as np
-from scipy.integrate import odeint
 import time
 import numpy as np
 from functools import cmp_to_key
 import difflib
-from IPython.utils import io
-with io.capture_output() as capture:
-    from assimulo.solvers import IDA
-    from assimulo.solvers import Radau5DAE
-    from assimulo.problem import Implicit_Problem
+
+# scipy, IPython and assimulo are imported on first use, so that importing
+# dspace does not load them.
+_assimulo = dict()
+
+def odeint(*args, **kwargs):
+    ''' scipy.integrate.odeint, imported when first called. '''
+    from scipy.integrate import odeint as scipy_odeint
+    return scipy_odeint(*args, **kwargs)
+
+def _assimulo_solvers():
+    ''' The IDA and Radau5DAE solvers and the Implicit_Problem class of
+        assimulo, imported without printing its messages.
+    '''
+    if len(_assimulo) == 0:
+        from IPython.utils import io
+        with io.capture_output() as capture:
+            from assimulo.solvers import IDA
+            from assimulo.solvers import Radau5DAE
+            from assimulo.problem import Implicit_Problem
+        _assimulo.update(IDA=IDA, Radau5DAE=Radau5DAE, Implicit_Problem=Implicit_Problem)
+    return _assimulo
+
+def _power_law_model(expressions, variables):
+    ''' Builds the matrix form of a system of power-law expressions.
+
+    Each expression i is the sum over terms k of S[i,k]*c[k]*prod(X^G[k,:]),
+    where X are the values of the variables and c[k] is the numeric
+    coefficient of the term times its remaining factors, which are fixed
+    parameters.
+
+    Returns:
+        A dictionary with the matrices S and G, the numeric coefficients and
+        the parameter exponents of each term, or None if any expression is not
+        of power-law form.
+    '''
+    rows = list()
+    for index, expression in enumerate(expressions):
+        terms = _power_law_terms(expression)
+        if terms is None:
+            return None
+        rows += [(index, term) for term in terms]
+    S = np.zeros((len(expressions), len(rows)))
+    G = np.zeros((len(rows), len(variables)))
+    coefficients = np.zeros(len(rows))
+    parameter_exponents = list()
+    for k, (index, (coefficient, exponents)) in enumerate(rows):
+        S[index, k] = 1.
+        coefficients[k] = coefficient
+        parameters = dict()
+        for name, exponent in exponents.items():
+            if name in variables:
+                G[k, variables.index(name)] = exponent
+            else:
+                parameters[name] = exponent
+        parameter_exponents.append(parameters)
+    return dict(S=S, G=G, coefficients=coefficients,
+                parameter_exponents=parameter_exponents)
 
 class FullSystem(object):
 
@@ -30,6 +83,8 @@ class FullSystem(object):
 
         self.coef_dic = {}
         self.conservations_dictionary = None
+        self.compiled_rhs = True
+        self._rhs_model = None
 
         # 1. Get the auxiliary, independent and dependent variables
         auxiliary = ds.auxiliary_variables
@@ -84,6 +139,8 @@ class FullSystem(object):
             depend_expression = self.integrate_conserved_relationships(depend_expression)
             self.dae_equations = depend_expression + self.conservations
         self.ode_equations = depend_expression
+        self.ode_variables = [str(element.lhs).replace('.', '') for element in depend_expression]
+        self.ode_lhs = [str(element.lhs) for element in depend_expression]
 
     def integrate_conserved_relationships(self, depend_expression):
 
@@ -251,7 +308,29 @@ class FullSystem(object):
 
     def titrations_case(self, pvals, to, tf, nt, variable, initial_concentrations=None, default_xo=0.001,
                         titration_range_min=10**-3, titration_range_max=10**3, variable_steps=100,
-                        solver='ODEINT'):
+                        solver='ODEINT', workers=1, steady_state_tolerance=None):
+        ''' Steady states along a titration of one independent variable.
+
+        Each point of the titration is integrated from the steady state of the
+        previous point. With workers > 1, the titration range is split into
+        one contiguous chunk per worker, and each chunk runs its own
+        continuation in a separate process, starting from the initial
+        concentrations.
+
+        Kwargs:
+            solver (str): 'ODEINT' for systems without conservations, or a
+                DAE solver, 'IDA' or 'RADAU5', for systems with conservations.
+            workers (int): Number of processes used for the titration.
+            steady_state_tolerance (float): If given, each integration stops
+                as soon as the largest relative rate of change, |dX/dt|/X, is
+                below this value, instead of running until tf.
+
+        Returns:
+            A tuple (titration_values, results_dic), where results_dic maps
+            each variable to an array with its value at each titration point.
+        '''
+        if self.ds.number_conservations != 0 and solver == 'ODEINT':
+            raise ValueError('Systems with conservations must be titrated with a DAE solver (IDA or RADAU5)')
 
         # create parameters pool & make it available for all methods.
         parameters = dspace.VariablePool(names=self.dependent_no_aux + self.ds.independent_variables)
@@ -262,15 +341,13 @@ class FullSystem(object):
         if initial_concentrations is None:
             initial_concentrations = dict((i, default_xo) for i in self.dependent_no_aux)
 
-        yinit = np.array([])
+        yinit = np.array([initial_concentrations[var] for var in self.ode_variables], dtype=float)
         yinit_conserved = np.array([])
-
-        for element in self.ode_equations:
-            yinit = np.append(yinit, initial_concentrations[str(element.lhs).replace('.', '')])
-
+        variables = list(self.ode_variables)
         if self.ds.number_conservations != 0:
-            for element in self.conservations_variable_list:
-                yinit_conserved = np.append(yinit_conserved, initial_concentrations[element])
+            yinit_conserved = np.array([initial_concentrations[var] for var in self.conservations_variable_list],
+                                       dtype=float)
+            variables += list(self.conservations_variable_list)
 
         # Generate vector containing values for the selected variable on the x-axis.
         target_x_parameter = np.linspace(np.log10(titration_range_min),
@@ -279,91 +356,221 @@ class FullSystem(object):
 
         target_x_parameter = 10 ** target_x_parameter
 
-        # Actualize parameters
-        self.parameters.update({variable: target_x_parameter[0]})
-
-        # Generate first steady state point
-        y = self.solve_ode(yinit, yinit_conserved, t)
+        # Integrate each chunk of the titration range, seeding each point with the previous steady state.
+        pvals = dict(self.parameters)
+        if workers is None or workers <= 1:
+            steady_states = self._titration_chunk(pvals, variable, target_x_parameter,
+                                                  yinit, yinit_conserved, t, steady_state_tolerance,
+                                                  solver)
+        else:
+            chunks = [chunk for chunk in np.array_split(target_x_parameter, workers) if len(chunk) > 0]
+            results = self.ds.executor(workers).map(_titration_worker,
+                                                    [(self.compiled_rhs, pvals, variable, chunk, yinit,
+                                                      yinit_conserved, t, steady_state_tolerance, solver)
+                                                     for chunk in chunks])
+            steady_states = np.concatenate(results, axis=0)
+            self.parameters = dspace.VariablePool(names=self.dependent_no_aux + self.ds.independent_variables)
+            self.parameters.update(pvals)
+            self.parameters.update({variable: target_x_parameter[-1]})
 
         # parse solution.
         # create a dictionary with data.
         results_dic = {}
-        for counter, element in enumerate(self.ode_equations):
-            v = str(element.lhs).replace('.', '')
-            results_dic.update({v: [y[v][-1]]})
-
-        if solver != 'ODEINT' and self.ds.number_conservations != 0:
-            for counter2, element in enumerate(self.conservations_variable_list):
-                # results_dic.update({element: [y[-1, counter + counter2 + 1]]})
-                results_dic.update({element: [y[element][-1]]})
-
-        # loop over other elements of target_x_parameter
-        for w in target_x_parameter[1:]:
-            self.parameters.update({variable: w})
-            # initial concentrations correspond to last steady state point in results_dic.
-            # Remember that the order of the dictionary does not correspond to the order with wich the elements were stored.
-            yinit = np.array([])
-            yinit_conserved = np.array([])
-
-            for element in self.ode_equations:
-                yinit = np.append(yinit, results_dic[str(element.lhs).replace('.', '')][-1])
-
-            if solver != 'ODEINT' and self.ds.number_conservations != 0:
-                for element in self.conservations_variable_list:
-                    yinit_conserved = np.append(yinit_conserved, results_dic[element][-1])
-
-            # Generate next steady state point
-            y = self.solve_ode(yinit, yinit_conserved, t)
-
-            # parse and append
-            for counter, element in enumerate(self.ode_equations):
-                # results_dic[str(element.lhs).replace('.', '')].append(y[-1, counter])
-                v = str(element.lhs).replace('.', '')
-                results_dic[v].append(y[v][-1])
-            if solver != 'ODEINT' and self.ds.number_conservations != 0:
-                for counter2, element in enumerate(self.conservations_variable_list):
-                    # results_dic[element].append(y[-1, counter + counter2 + 1])
-                    results_dic[element].append(y[element][-1])
-
-        if self.conservations_dictionary is not None and solver == 'ODEINT':
-            self.complement_results_dic(results_dic)
+        for counter, var in enumerate(variables):
+            results_dic.update({var: steady_states[:, counter]})
 
         # complement dictionary with auxiliary variables
         self.complement_results_dic_with_aux_variables(results_dic, len(target_x_parameter), self.parameters)
 
         return target_x_parameter, results_dic
 
+    def _titration_chunk(self, pvals, variable, values, yinit, yinit_conserved, t, steady_state_tolerance=None,
+                         solver='ODEINT'):
+        ''' Continuation of the steady state over values of variable, starting
+            from yinit and yinit_conserved. Returns an array with one row of
+            steady state values per titration value, with the conserved
+            variables after the ODE variables.
+        '''
+        parameters = dspace.VariablePool(names=self.dependent_no_aux + self.ds.independent_variables)
+        parameters.update(pvals)
+        self.parameters = parameters
+        steady_states = np.empty((len(values), len(yinit) + len(yinit_conserved)))
+        y0 = np.array(yinit, dtype=float)
+        y0_conserved = np.array(yinit_conserved, dtype=float)
+        for index, value in enumerate(values):
+            self.parameters.update({variable: value})
+            y0, y0_conserved = self._integrate_to_steady_state(y0, y0_conserved, t, steady_state_tolerance,
+                                                               solver)
+            steady_states[index, :] = np.append(y0, y0_conserved)
+        return steady_states
+
+    def _final_state(self, y):
+        # The last ODE and conserved values of a solution of solve_ode, which
+        # DAE solvers may return as an array.
+        n = len(self.ode_variables)
+        if isinstance(y, dict) is False:
+            y = np.asarray(y)
+            return np.array(y[-1, :n], dtype=float), np.array(y[-1, n:], dtype=float)
+        conserved = list()
+        if self.ds.number_conservations != 0:
+            conserved = [y[var][-1] for var in self.conservations_variable_list]
+        return np.array([y[var][-1] for var in self.ode_variables]), np.array(conserved, dtype=float)
+
+    def _integrate_to_steady_state(self, yinit, yinit_conserved, t, steady_state_tolerance=None, solver='ODEINT'):
+        ''' Integrates from yinit over the time vector t and returns the final
+            ODE and conserved values. If steady_state_tolerance is given, the
+            time vector is integrated in segments and the integration stops at
+            the first segment ending at a steady state.
+        '''
+        if steady_state_tolerance is None:
+            return self._final_state(self.solve_ode(yinit, yinit_conserved, t, solver=solver))
+        edges = np.unique(np.linspace(0, len(t) - 1, min(10, len(t) - 1) + 1).astype(int))
+        y0 = np.array(yinit, dtype=float)
+        y0_conserved = np.array(yinit_conserved, dtype=float)
+        for start, stop in zip(edges[:-1], edges[1:]):
+            y = self.solve_ode(y0, y0_conserved, t[start:stop + 1], solver=solver)
+            y0, y0_conserved = self._final_state(y)
+            if self.steady_state_residual(y0, t[stop]) <= steady_state_tolerance:
+                break
+        return y0, y0_conserved
+
+    def trajectories(self, pvals, time, initial_states, initial_conserved=None, solver='ODEINT', workers=1):
+        ''' Integrates the full system from many initial conditions.
+
+        With the ODEINT solver, all initial conditions are integrated together
+        as one stacked ODE system, using the compiled right hand side. DAE
+        solvers integrate each initial condition separately, in a pool of
+        worker processes if workers > 1.
+
+        Args:
+            pvals (dict): Values of the independent variables.
+            time (ndarray): Time points of the trajectories.
+            initial_states (ndarray): m x n array of initial values, columns
+                ordered as ode_variables.
+
+        Kwargs:
+            initial_conserved (ndarray): m x c array with the initial values
+                of the conserved variables, required by DAE solvers.
+            solver (str): 'ODEINT', 'IDA' or 'RADAU5'.
+            workers (int): Number of processes used by DAE solvers.
+
+        Returns:
+            A list with one results dictionary per initial condition, mapping
+            each variable to its trajectory.
+        '''
+        parameters = dspace.VariablePool(names=self.dependent_no_aux + self.ds.independent_variables)
+        parameters.update(pvals)
+        self.parameters = parameters
+        time = np.asarray(time, dtype=float)
+        initial_states = np.atleast_2d(np.asarray(initial_states, dtype=float))
+        m, n = initial_states.shape
+        n_conservations = self.ds.number_conservations
+        if initial_conserved is None:
+            initial_conserved = np.zeros((m, 0))
+        initial_conserved = np.atleast_2d(np.asarray(initial_conserved, dtype=float))
+
+        model = False
+        if self.compiled_rhs is True:
+            model = self._bind_rhs()
+        results = list()
+        if solver == 'ODEINT' and model is not False:
+            # The stacked system is block diagonal, which odeint exploits through its banded Jacobian.
+            stacked_fun = lambda y, t: self._compiled_rates(y.reshape(m, n)).ravel()
+            y = odeint(stacked_fun, initial_states.ravel(), time, ml=n-1, mu=n-1)
+            y = y.reshape(len(time), m, n)
+            for index in range(m):
+                results.append(dict((var, np.array(y[:, index, counter]))
+                                    for counter, var in enumerate(self.ode_variables)))
+        elif solver == 'ODEINT' and n_conservations == 0:
+            for index in range(m):
+                results.append(self.solve_ode(initial_states[index], [], time))
+        elif solver == 'ODEINT':
+            for index in range(m):
+                y = odeint(self.construct_fun, initial_states[index], time)
+                results_dic = dict((var, y[:, counter]) for counter, var in enumerate(self.ode_variables))
+                self.complement_results_dic(results_dic)
+                results.append(results_dic)
+        elif workers is not None and workers > 1:
+            results = self.ds.executor(workers).map(_trajectory_worker,
+                                                    [(self.compiled_rhs, dict(self.parameters), initial_states[index],
+                                                      initial_conserved[index], time, solver)
+                                                     for index in range(m)])
+        else:
+            for index in range(m):
+                results.append(self.solve_ode(initial_states[index], initial_conserved[index], time, solver=solver))
+
+        for results_dic in results:
+            # Conserved variables of ODE systems follow from their conservation relationships.
+            if solver == 'ODEINT' and n_conservations != 0 and model is not False:
+                values = list(model['values'])
+                for index, var in enumerate(model['states']):
+                    values[index] = results_dic[var]
+                for index, function in enumerate(model['conservations']):
+                    var = model['conserved'][index]
+                    values[n + index] = function(*values) / self.coef_dic[var]
+                    results_dic[var] = np.zeros(len(time)) + values[n + index]
+            self.complement_results_dic_with_aux_variables(results_dic, len(time), pvals)
+        return results
+
+    def dynamic_phenotypes(self, results_dic, n, pvals):
+        ''' Dominant signature and case number at each of the n points of a
+            trajectory.
+        '''
+        signatures, case_numbers = self.ds.dominant_signatures(pvals, results_dic, n)
+        strings = list()
+        cases = list()
+        for signature, case_number in zip(signatures, case_numbers):
+            if case_number == 0:
+                strings.append('Negativevaluefound!')
+                cases.append(None)
+            else:
+                strings.append(_signature_string(signature))
+                cases.append(int(case_number))
+        return strings, cases
+
+    def steady_state_residual(self, y, t=0.):
+        ''' Largest relative rate of change, |dX/dt|/X, of the states y. '''
+        if self.compiled_rhs is True and self._rhs_model not in (None, False):
+            rates = self.construct_fun_compiled(y, t)
+        else:
+            rates = self.construct_fun(y, t)
+        return np.max(np.abs(rates) / np.maximum(np.abs(y), np.finfo(float).tiny))
+
     def complement_results_dic_with_aux_variables(self, results_dic, n, pvals):
 
         # This function should add vectors for auxiliary variables (algebraic constraints) to the results_dictionary.
         # Expressions defining these variables are defined in self.aux_dic
         aux_dic = self.aux_dic
-        # 1. update results_dic with keys of aux_dic:
-        keys_aux_dic = aux_dic.keys()
-        keys_dep_var = results_dic.keys()
-        results_dic.update({key: [] for key in keys_aux_dic})
-        p_values = pvals.copy()
-
-        # 2. loop over vectors, update dictionary, compute value of auxiliary variables and update corresponding vectors
-        for ndx in range(n):
-            # update parameter dictionary with values for dependent variables
-            p_values.update({key: results_dic[key][ndx] for key in keys_dep_var})
-            # compute value of auxiliary variables and update corresponding vectors
-            for element in keys_aux_dic:
-                results_dic[element].append(Expression(aux_dic[element]).eval_with_values(p_vals=p_values))
-        # 3. Transform list into np.arrays for auxiliary variables. This is done for data consistency.
-        for element in keys_aux_dic:
-            results_dic[element] = np.array(results_dic[element])
+        keys_dep_var = list(results_dic.keys())
+        for element in aux_dic:
+            expression = Expression(aux_dic[element])
+            names = expression.variables
+            try:
+                function = expression.compile(names)
+            except (NameError, ValueError):
+                function = None
+            # 1. Evaluate the compiled expression over the whole vectors of dependent variables.
+            if function is not None:
+                values = [results_dic[name] if name in keys_dep_var else pvals[name] for name in names]
+                results_dic[element] = np.zeros(n) + function(*values)
+                continue
+            # 2. Otherwise, evaluate the expression point by point.
+            p_values = pvals.copy()
+            vector = np.empty(n)
+            for ndx in range(n):
+                p_values.update({key: results_dic[key][ndx] for key in keys_dep_var})
+                vector[ndx] = expression.eval_with_values(p_vals=p_values)
+            results_dic[element] = vector
 
     def complement_results_dic(self, results_dic):
 
         conservation_dic = self.conservations_dictionary
-        nr_rows = len(results_dic[results_dic.keys()[0]])
+        nr_rows = len(results_dic[list(results_dic.keys())[0]])
         nr_colums = len(conservation_dic.keys())
         new_results = np.zeros([nr_rows, nr_colums])
         parameters_dic = self.parameters.copy()
 
-        for row, _ in enumerate(results_dic[results_dic.keys()[0]]):
+        for row in range(nr_rows):
             #update dictionary of parameters
             sub_dic = dict((var, results_dic[var][row]) for var in results_dic.keys())
             parameters_dic.update(sub_dic)
@@ -376,6 +583,135 @@ class FullSystem(object):
         for col, key in enumerate(conservation_dic.keys()):
             results_dic.update({key: new_results[:,col]})
 
+    def _compile_rhs(self):
+        ''' Builds, once per FullSystem, the compiled form of the right hand
+            side of the ODE and DAE systems.
+
+        The equations are compiled into numpy functions of the states, the
+        conserved variables and the parameters. If the equations are sums of
+        power-law terms, they are also stored in matrix form, which is used to
+        evaluate the right hand side and its analytic Jacobian.
+        '''
+        if self._rhs_model is not None:
+            return self._rhs_model
+        states = list(self.ode_variables)
+        conserved = []
+        if self.ds.number_conservations != 0:
+            conserved = list(self.conservations_variable_list)
+        ode = [element.rhs for element in self.ode_equations]
+        conservations = [self.conservations_dictionary[var].rhs for var in conserved]
+        algebraic = [self.conservations_equal_zero_dictionary[var].rhs for var in conserved]
+        arguments = states + conserved
+        for expression in ode + conservations + algebraic:
+            for name in expression.variables:
+                if name not in arguments:
+                    arguments.append(name)
+        try:
+            model = dict(states=states,
+                         conserved=conserved,
+                         arguments=arguments,
+                         ode=[expression.compile(arguments) for expression in ode],
+                         conservations=[expression.compile(arguments) for expression in conservations],
+                         algebraic=[expression.compile(arguments) for expression in algebraic])
+        except (NameError, ValueError):
+            self._rhs_model = False
+            return self._rhs_model
+        if len(conserved) == 0:
+            model['power_law'] = _power_law_model(ode, states)
+        else:
+            model['power_law'] = _power_law_model(ode + algebraic, states + conserved)
+        self._rhs_model = model
+        return self._rhs_model
+
+    def _bind_rhs(self):
+        ''' Fixes the parameter values of the compiled right hand side to the
+            current values in self.parameters.
+        '''
+        model = self._compile_rhs()
+        if model is False:
+            return False
+        n = len(model['states']) + len(model['conserved'])
+        values = np.zeros(len(model['arguments']))
+        for index, name in enumerate(model['arguments'][n:]):
+            values[n + index] = self.parameters[name]
+        model['values'] = values
+        power_law = model['power_law']
+        if power_law is not None:
+            coefficients = np.array(power_law['coefficients'])
+            for k, exponents in enumerate(power_law['parameter_exponents']):
+                for name, exponent in exponents.items():
+                    coefficients[k] *= self.parameters[name]**exponent
+            power_law['bound_coefficients'] = coefficients
+        return model
+
+    def _power_law_rhs(self, y):
+        power_law = self._rhs_model['power_law']
+        terms = power_law['bound_coefficients']*np.prod(y**power_law['G'], axis=1)
+        return power_law['S'].dot(terms)
+
+    def _power_law_jacobian(self, y):
+        power_law = self._rhs_model['power_law']
+        G = power_law['G']
+        factors = y**G
+        with np.errstate(divide='ignore', invalid='ignore'):
+            derivatives = np.where(G != 0, G*y**(G - 1), 0.)
+        d_terms = np.zeros(G.shape)
+        for j in range(len(y)):
+            others = factors.copy()
+            others[:, j] = 1.
+            d_terms[:, j] = derivatives[:, j]*np.prod(others, axis=1)
+        d_terms *= power_law['bound_coefficients'][:, None]
+        return power_law['S'].dot(d_terms)
+
+    def _compiled_rates(self, Y):
+        ''' Rates of change of the states for each row of the m x n array Y,
+            using the bound compiled right hand side of the ODE system.
+        '''
+        model = self._rhs_model
+        if model['power_law'] is not None and len(model['conserved']) == 0:
+            power_law = model['power_law']
+            terms = power_law['bound_coefficients']*np.prod(Y[:, None, :]**power_law['G'][None, :, :], axis=2)
+            return terms.dot(power_law['S'].T)
+        values = list(model['values'])
+        n = len(model['states'])
+        for index in range(n):
+            values[index] = Y[:, index]
+        for index, function in enumerate(model['conservations']):
+            var = model['conserved'][index]
+            values[n + index] = function(*values) / self.coef_dic[var]
+        rates = np.empty(Y.shape)
+        for index, function in enumerate(model['ode']):
+            rates[:, index] = function(*values)
+        return rates
+
+    def construct_fun_compiled(self, y, t):
+
+        model = self._rhs_model
+        if model['power_law'] is not None and len(model['conserved']) == 0:
+            return self._power_law_rhs(y)
+        return self._compiled_rates(np.atleast_2d(y))[0]
+
+    def construct_jacobian_compiled(self, y, t):
+
+        return self._power_law_jacobian(y)
+
+    def construct_fun_DAE_compiled(self, t, y0, yd0):
+
+        model = self._rhs_model
+        if model['power_law'] is not None:
+            return self._power_law_rhs(y0) - yd0
+        values = model['values']
+        n = len(model['states']) + len(model['conserved'])
+        values[:n] = y0
+        y_out = np.empty(n)
+        for index, function in enumerate(model['ode'] + model['algebraic']):
+            y_out[index] = function(*values)
+        return y_out - yd0
+
+    def construct_jacobian_DAE_compiled(self, c, t, y0, yd0):
+
+        return self._power_law_jacobian(y0) - c*np.eye(len(y0))
+
     def solve_ode(self, yinit, yinit_conserved, time, solver='ODEINT'):
 
         ode = self.ode_equations
@@ -384,14 +720,24 @@ class FullSystem(object):
             conservations = self.conservations_equal_zero_dictionary
             conservations_list = self.conservations_variable_list
 
+        # Use the compiled right hand side, unless it is disabled or the equations cannot be compiled.
+        model = False
+        if self.compiled_rhs is True:
+            model = self._bind_rhs()
+
         # Standard ODE, no conservations.
         if n_conservations == 0:
             # rtol = 1e-10  #defaults are 1.49012e-8
             # atol = 1e-10  #defaults are 1.49012e-8
-            y = odeint(self.construct_fun, yinit, time)
+            if model is False:
+                y = odeint(self.construct_fun, yinit, time)
+            elif model['power_law'] is not None:
+                y = odeint(self.construct_fun_compiled, yinit, time,
+                           Dfun=self.construct_jacobian_compiled)
+            else:
+                y = odeint(self.construct_fun_compiled, yinit, time)
             results_dic = {}
-            for counter, element in enumerate(self.ode_equations):
-                var = str(element.lhs).replace('.', '')
+            for counter, var in enumerate(self.ode_variables):
                 results_dic.update({var: y[:, counter]})
             return results_dic
 
@@ -405,7 +751,14 @@ class FullSystem(object):
             yd0 = self.calculate_yd0_from_y0(yinit, yinit_conserved)
 
             # 2. create implicit problem
-            imp_mod = Implicit_Problem(self.construct_fun_DAE, y0, yd0)
+            solvers = _assimulo_solvers()
+            Implicit_Problem = solvers['Implicit_Problem']
+            if model is False:
+                imp_mod = Implicit_Problem(self.construct_fun_DAE, y0, yd0)
+            else:
+                imp_mod = Implicit_Problem(self.construct_fun_DAE_compiled, y0, yd0)
+                if model['power_law'] is not None:
+                    imp_mod.jac = self.construct_jacobian_DAE_compiled
 
             # 3. set the algebraic components
             v = np.zeros(len(ode) + n_conservations) + 1
@@ -414,13 +767,15 @@ class FullSystem(object):
 
             if solver == 'IDA':
                 # Create an Assimulo implicit solver (IDA)
-                imp_sim = IDA(imp_mod)  # Create a IDA solver
+                imp_sim = solvers['IDA'](imp_mod)  # Create a IDA solver
+                if model is not False and model['power_law'] is not None:
+                    imp_sim.usejac = True
 
                 # Let Sundials find consistent initial conditions by use of 'IDA_YA_YDP_INIT'
                 imp_sim.make_consistent('IDA_YA_YDP_INIT')
 
             elif solver == 'RADAU5':
-                imp_sim = Radau5DAE(imp_mod)
+                imp_sim = solvers['Radau5DAE'](imp_mod)
 
             # Sets the paramters
             imp_sim.atol = 1e-6  # Default 1e-6
@@ -431,17 +786,16 @@ class FullSystem(object):
 
             # Simulate
             t, y, yd = imp_sim.simulate(time[-1], len(time)-1)
-            if self.type.value == 'Titrations':
+            if getattr(self, 'type', None) is not None and self.type.value == 'Titrations':
                 return y
 
             # pack results in a dictionary. First get vectors for ode_variables
             results_dic = {}
-            for counter, element in enumerate(self.ode_equations):
-                var = str(element.lhs).replace('.', '')
+            for counter, var in enumerate(self.ode_variables):
                 results_dic.update({var: y[:, counter]})
             # now get vectors for algebraic constraints
             for counter2, element in enumerate(conservations_list):
-                n = counter + counter2 + 1
+                n = len(self.ode_variables) + counter2
                 results_dic.update({element: y[:, n]})
             # if len(self.advanced_time_courses.ss_functions.members) > 0:
             #     self.calculate_ss_function(results_dic)
@@ -450,19 +804,18 @@ class FullSystem(object):
     def construct_fun(self, y, t):
 
         # initialize the output array
-        y_out = np.array([])
+        y_out = np.empty(len(self.ode_equations))
 
         # Parameter values of this object are actualized to reflect parameter values of the main toolbox.
-        for counter, element in enumerate(self.ode_equations):
-            self.parameters[str(element.lhs).replace('.', '')] = y[counter]
+        self.parameters.set_values(y[:len(self.ode_variables)], names=self.ode_variables)
 
         # if conserved relationships are present, update the dictionary self.parameters with the respective values.
         if self.conservations_dictionary is not None:
             for conserved_var, expression in self.conservations_dictionary.items():
                 self.parameters[conserved_var] = expression.rhs.eval_with_values(p_vals=self.parameters) / self.coef_dic[conserved_var]
 
-        for element in self.ode_equations:
-            y_out = np.append(y_out, element.rhs.eval_with_values(p_vals=self.parameters))
+        for counter, element in enumerate(self.ode_equations):
+            y_out[counter] = element.rhs.eval_with_values(p_vals=self.parameters)
 
         return y_out
 
@@ -474,8 +827,8 @@ class FullSystem(object):
         par = self.parameters
 
         # update dictionary of parameter values to consider initial conditions for Xd_t pools
-        for indx, element in enumerate(self.ode_equations):
-            par[str(element.lhs).replace('.', '')] = yinit[indx]
+        for indx, var in enumerate(self.ode_variables):
+            par[var] = yinit[indx]
 
         # update dictionary of parameter values to consider intial conditions for Xd_a_c pools
         for indx, element in enumerate(self.conservations_variable_list):
@@ -493,27 +846,42 @@ class FullSystem(object):
 
     def construct_fun_DAE(self, t, y0, yd0):
 
-        y_out = np.array([])
+        n = len(self.ode_equations)
+        y_out = np.empty(n + len(self.conservations_variable_list))
 
         # update dictionary of parameter values to consider initial conditions for Xd_t pools
-        for indx, element in enumerate(self.ode_equations):
-            self.parameters[str(element.lhs).replace('.', '')] = y0[indx]
-            self.parameters[str(element.lhs)] = yd0[indx]
+        self.parameters.set_values(y0[:n], names=self.ode_variables)
+        self.parameters.set_values(yd0[:n], names=self.ode_lhs)
 
         # update dictionary of parameter values to consider intial conditions for Xd_a_c pools
-        for indx2, element in enumerate(self.conservations_variable_list):
-            self.parameters[element] = y0[indx + indx2 + 1]
+        self.parameters.set_values(y0[n:n+len(self.conservations_variable_list)],
+                                   names=self.conservations_variable_list)
 
         # start building the y_out vector
-        for element in self.ode_equations:
-            y_out = np.append(y_out, element.rhs.eval_with_values(p_vals=self.parameters))
+        for indx, element in enumerate(self.ode_equations):
+            y_out[indx] = element.rhs.eval_with_values(p_vals=self.parameters)
 
-        for variable in self.conservations_variable_list:
+        for indx2, variable in enumerate(self.conservations_variable_list):
             eq = self.conservations_equal_zero_dictionary[variable]
-            y_out = np.append(y_out,
-                              eq.rhs.eval_with_values(p_vals=self.parameters))
+            y_out[n + indx2] = eq.rhs.eval_with_values(p_vals=self.parameters)
 
         y_out = y_out - yd0
 
         return y_out
 
+# Each worker process builds its own FullSystem, since expressions cannot be
+# pickled; see dspace.parallel.worker_full_system.
+
+def _titration_worker(arguments):
+    system = worker_full_system()
+    system.compiled_rhs = arguments[0]
+    return system._titration_chunk(*arguments[1:])
+
+def _trajectory_worker(arguments):
+    compiled_rhs, pvals, yinit, yinit_conserved, time, solver = arguments
+    system = worker_full_system()
+    system.compiled_rhs = compiled_rhs
+    system.parameters = dspace.VariablePool(names=system.dependent_no_aux +
+                                                  system.ds.independent_variables)
+    system.parameters.update(pvals)
+    return system.solve_ode(yinit, yinit_conserved, time, solver=solver)
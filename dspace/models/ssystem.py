@@ -11,7 +11,110 @@ from dspace.expressions import Expression
 
 import numpy as np
 import time
-        
+
+
+class SteadyStateFunctionPlan(object):
+    ''' A function of the steady state of an S-System, prepared for repeated
+        evaluation.
+
+    The variables of the function are inspected once, so that only the
+    concentrations, fluxes and log gains it references are computed at each
+    point. Log gains do not depend on the parameters and are taken from the
+    per-system cache of the S-System.
+    '''
+
+    def __init__(self, ssystem, function):
+        if isinstance(function, Expression):
+            expr = function
+        else:
+            expr = Expression(function)
+        setattr(self, '_ssystem', ssystem)
+        setattr(self, 'expression', expr)
+        names = expr.variables
+        setattr(self, 'variables', names)
+        independent = ssystem.independent_variables
+        dependent = ssystem.dependent_variables
+        gains = dict()
+        for i in ssystem.dependent_variables_no_algebraic:
+            for j in independent:
+                gains['$L_'+i+'_'+j] = (i, j)
+        setattr(self, 'parameters', [i for i in names if i in independent])
+        setattr(self, 'concentrations', [i for i in names if i in dependent])
+        setattr(self, 'fluxes', [i for i in names if i[:2] == 'V_' and i[2:] in dependent])
+        setattr(self, 'log_gains', dict((i, gains[i]) for i in names if i in gains))
+        try:
+            compiled = expr.compile(names)
+        except (NameError, ValueError):
+            compiled = None
+        setattr(self, '_compiled', compiled)
+
+    def __call__(self, parameter_values):
+        ''' Evaluates the function at a single set of parameter values. '''
+        ssystem = self._ssystem
+        if DSSSystemAdjustCodominantStoichiometry(ssystem._swigwrapper) is True:
+            DSSSystemAdjustStoichiometryOfCodominantCase(ssystem._swigwrapper)
+        p_vals = parameter_values.copy()
+        if len(self.concentrations) > 0:
+            p_vals.update(ssystem.steady_state(parameter_values, log_out=False))
+        if len(self.fluxes) > 0:
+            p_vals.update(ssystem.steady_state_flux(parameter_values, log_out=False))
+        for name, (i, j) in self.log_gains.items():
+            p_vals[name] = ssystem._cached_log_gain(i, j)
+        return self.expression.eval_with_values(p_vals=p_vals)
+
+    def batch(self, log_parameters):
+        ''' Evaluates the function at many parameter sets.
+
+        Args:
+            log_parameters (ndarray): N x p log10 values, columns in
+                independent-variable order.
+
+        Returns:
+            An array with N function values.
+        '''
+        ssystem = self._ssystem
+        log_parameters = np.atleast_2d(np.asarray(log_parameters, dtype=float))
+        independent = ssystem.independent_variables
+        matrices = ssystem._log_linear_matrices()
+        if matrices is None:
+            params = VariablePool(names=independent)
+            values = list()
+            for point in log_parameters:
+                for index, key in enumerate(independent):
+                    params[key] = 10**point[index]
+                values.append(self(params))
+            return np.array(values, dtype=float)
+        dependent = ssystem.dependent_variables
+        columns = dict()
+        for key in self.parameters:
+            columns[key] = 10**log_parameters[:, independent.index(key)]
+        if len(self.concentrations) > 0 or len(self.fluxes) > 0:
+            yi = log_parameters
+            yd = (matrices['b'] - yi.dot(matrices['Ai'].T)).dot(matrices['M'].T)
+            for key in self.concentrations:
+                columns[key] = 10**yd[:, dependent.index(key)]
+            for key in self.fluxes:
+                index = dependent.index(key[2:])
+                log_flux = (matrices['log_alpha'][index] + yd.dot(matrices['Gd'][index]) +
+                            yi.dot(matrices['Gi'][index]))
+                columns[key] = 10**log_flux
+        for name, (i, j) in self.log_gains.items():
+            columns[name] = np.repeat(ssystem._cached_log_gain(i, j), len(log_parameters))
+        names = self.variables
+        for name in names:
+            if name not in columns:
+                raise NameError(str(name) + ' is not defined at steady state')
+        if self._compiled is not None:
+            return self._compiled(*[columns[name] for name in names])
+        params = VariablePool(names=names)
+        values = np.empty(len(log_parameters))
+        for n in range(len(log_parameters)):
+            for name in names:
+                params[name] = columns[name][n]
+            values[n] = self.expression.eval_with_values(p_vals=params)
+        return values
+
+
 class SSystem(GMASystem):
 
     def __del__(self):
@@ -20,6 +123,9 @@ class SSystem(GMASystem):
     
     def set_swigwrapper(self, ssys_swigwrapper):
         self._swigwrapper = ssys_swigwrapper
+        self._log_linear_solution = None
+        self._log_gains = dict()
+        self._function_plans = dict()
         if self._swigwrapper is None:
             return
         Xd = VariablePool()
@@ -171,6 +277,18 @@ class SSystem(GMASystem):
         else:
             return DSuSSystemLogarithmicGain(self._swigwrapper, dependent, independent)
     
+    def _cached_log_gain(self, dependent, independent):
+        key = (dependent, independent)
+        if key not in self._log_gains:
+            matrices = self._log_linear_matrices()
+            if matrices is not None:
+                i = self.dependent_variables.index(dependent)
+                j = self.independent_variables.index(independent)
+                self._log_gains[key] = -matrices['M'][i].dot(matrices['Ai'][:, j])
+            else:
+                self._log_gains[key] = self.log_gain(dependent, independent)
+        return self._log_gains[key]
+
     def remove_algebraic_constraints(self):
         return SSystem(self._equations,
                        name=self.name + '(ODE only)',
@@ -274,21 +392,54 @@ class SSystem(GMASystem):
 
         return steady_states
     
+    def steady_state_function_plan(self, function):
+        ''' A SteadyStateFunctionPlan for function, built once per S-System
+            and function.
+        '''
+        key = str(function)
+        if key not in self._function_plans:
+            self._function_plans[key] = SteadyStateFunctionPlan(self, function)
+        return self._function_plans[key]
+
     def steady_state_function(self, function, parameter_values):
-        if isinstance(function, Expression):
-            expr = function
-        else:
-            expr = Expression(function)
-        if DSSSystemAdjustCodominantStoichiometry(self._swigwrapper) is True:
-            DSSSystemAdjustStoichiometryOfCodominantCase(self._swigwrapper)
-        p_vals = parameter_values.copy()
-        p_vals.update(self.steady_state(parameter_values, log_out=False))
-        p_vals.update(self.steady_state_flux(parameter_values, log_out=False))
-        for i in self.dependent_variables_no_algebraic:
-            for j in self.independent_variables:
-                p_vals['$L_'+i+'_'+j] = self.log_gain(i,j)
-        value = expr.eval_with_values(p_vals=p_vals)
-        return value
+        return self.steady_state_function_plan(function)(parameter_values)
+
+    def steady_state_batch(self, log_parameters):
+        ''' Log steady state and log fluxes at many parameter sets.
+
+        The log steady state of an S-System is linear in the log parameters,
+        so all parameter sets are solved with a single matrix product.
+
+        Args:
+            log_parameters (ndarray): N x p log10 values, columns in
+                independent-variable order.
+
+        Returns:
+            A tuple (log_concentrations, log_fluxes) of N x n arrays, columns in
+            dependent-variable order, or None if the S-System has no
+            closed-form steady state.
+        '''
+        matrices = self._log_linear_matrices()
+        if matrices is None:
+            return None
+        yi = np.atleast_2d(np.asarray(log_parameters, dtype=float))
+        yd = (matrices['b'] - yi.dot(matrices['Ai'].T)).dot(matrices['M'].T)
+        log_flux = matrices['log_alpha'] + yd.dot(matrices['Gd'].T) + yi.dot(matrices['Gi'].T)
+        return yd, log_flux
+
+    def steady_state_function_batch(self, function, log_parameters):
+        ''' Evaluates a function of the steady state at many parameter sets.
+
+        Args:
+            function (str or Expression): Function of the parameters, steady
+                state concentrations, fluxes ('V_X') and log gains ('$L_X_p').
+            log_parameters (ndarray): N x p log10 values, columns in
+                independent-variable order.
+
+        Returns:
+            An array with N function values.
+        '''
+        return self.steady_state_function_plan(function).batch(log_parameters)
 
     def positive_roots(self, parameter_values, show_marginal=True):
         
@@ -316,6 +467,164 @@ class SSystem(GMASystem):
         num_pos = len([x for x in eigen_values.real if x > 0])
         return num_pos
 
+    def _log_linear_matrices(self):
+        ''' Returns the matrices of the log-linear steady state solution as
+            numpy arrays, extracted once from the C S-System.
+
+        The steady state satisfies Ad*yd + Ai*yi = b, with b = log(beta/alpha),
+        and is therefore yd = M*(b - Ai*yi), where M is the inverse of Ad.
+        Returns None if the S-System has no solution or is unstable.
+        '''
+        if self._log_linear_solution is not None:
+            return self._log_linear_solution
+        if DSSSystemIsUnstable(self._swigwrapper) is True:
+            return None
+        if DSSSystemHasSolution(self._swigwrapper) is False:
+            return None
+        if DSSSystemAdjustCodominantStoichiometry(self._swigwrapper) is True:
+            DSSSystemAdjustStoichiometryOfCodominantCase(self._swigwrapper)
+        n = len(self.dependent_variables)
+        p = len(self.independent_variables)
+        alpha = np.log10(np.array(self.alpha, dtype=float)).reshape(n)
+        beta = np.log10(np.array(self.beta, dtype=float)).reshape(n)
+        if p > 0:
+            Ai = np.array(self.Ai, dtype=float).reshape(n, p)
+            Gi = np.array(self.Gi, dtype=float).reshape(n, p)
+        else:
+            Ai = np.zeros((n, 0))
+            Gi = np.zeros((n, 0))
+        self._log_linear_solution = dict(M=np.array(self.m, dtype=float).reshape(n, n),
+                                         Ad=np.array(self.Ad, dtype=float).reshape(n, n),
+                                         Ai=Ai,
+                                         Gd=np.array(self.Gd, dtype=float).reshape(n, n),
+                                         Gi=Gi,
+                                         b=beta-alpha,
+                                         log_alpha=alpha)
+        return self._log_linear_solution
+
+    def _routh_first_columns(self, log_parameters, tolerance=1e-8):
+        ''' The first column of the Routh array of the characteristic
+            polynomial of the Jacobian at many parameter sets.
+
+        The characteristic polynomials are found for all parameter sets at
+        once by the Faddeev-LeVerrier recursion, and the Routh arrays are
+        built row by row over all of them.
+
+        Returns:
+            A tuple (first_columns, uncertain), where first_columns is an
+            N x (n+1) array and uncertain flags the parameter sets whose array
+            has a pivot that is zero within the relative tolerance, or that
+            are not finite, or None if the S-System has no closed-form steady
+            state.
+        '''
+        if DSVariablePoolNumberOfVariables(DSSSystemXd_a(self._swigwrapper)) > 0:
+            raise TypeError('S-System must be reduced to ODE-only system')
+        solution = self.steady_state_batch(log_parameters)
+        if solution is None:
+            return None
+        yd, log_flux = solution
+        matrices = self._log_linear_matrices()
+        turnover = 10**(log_flux - yd)
+        jacobian = turnover[:, :, None] * matrices['Ad'][None, :, :]
+        number, n = jacobian.shape[:2]
+        identity = np.eye(n)
+        coefficients = np.zeros((number, n+1))
+        coefficients[:, 0] = 1.
+        M = np.zeros_like(jacobian)
+        for k in range(1, n+1):
+            M = np.matmul(jacobian, M) + coefficients[:, k-1, None, None]*identity
+            coefficients[:, k] = -np.einsum('kii->k', np.matmul(jacobian, M))/k
+        columns = n//2 + 2
+        routh = np.zeros((number, n+1, columns))
+        routh[:, 0, :len(range(0, n+1, 2))] = coefficients[:, 0::2]
+        routh[:, 1, :len(range(1, n+1, 2))] = coefficients[:, 1::2]
+        uncertain = np.any(np.isfinite(coefficients) == False, axis=1)
+        for i in range(1, n+1):
+            # Pivots are compared to the two rows they are computed from.
+            pivot = routh[:, i, 0]
+            scale = np.maximum(np.abs(routh[:, i, :]).max(axis=1),
+                               np.abs(routh[:, i-1, :]).max(axis=1))
+            small = np.abs(pivot) <= tolerance*np.maximum(scale, 1e-300)
+            uncertain |= small
+            if i == n:
+                continue
+            pivot = np.where(small, 1., pivot)
+            routh[:, i+1, :-1] = (pivot[:, None]*routh[:, i-1, 1:] -
+                                  routh[:, i-1, 0, None]*routh[:, i, 1:])/pivot[:, None]
+        return routh[:, :, 0], uncertain
+
+    def _parameter_pool(self, log_values):
+        pool = VariablePool(names=self.independent_variables)
+        for name, value in zip(self.independent_variables, log_values):
+            pool[name] = 10**value
+        return pool
+
+    def positive_roots_batch(self, log_parameters):
+        ''' Number of eigenvalues with positive real part at many parameter sets.
+
+        The roots are counted by the sign changes of the first column of the
+        Routh array, as the C library does. Parameter sets whose array has a
+        zero pivot, within a tolerance, are sent to the C library one by one,
+        so that their count and marginal flag are those of positive_roots.
+
+        Args:
+            log_parameters (ndarray): An N x p array of log10 parameter values,
+                with columns ordered as the independent variables.
+
+        Returns:
+            A tuple (roots, marginal) of length N arrays, or None if the
+            S-System has no closed-form steady state.
+        '''
+        log_parameters = np.atleast_2d(np.asarray(log_parameters, dtype=float))
+        routh = self._routh_first_columns(log_parameters)
+        if routh is None:
+            return None
+        first, uncertain = routh
+        signs = np.sign(first)
+        roots = (signs[:, 1:] != signs[:, :-1]).sum(axis=1)
+        marginal = np.zeros(len(first), dtype=int)
+        for index in np.flatnonzero(uncertain):
+            pool = self._parameter_pool(log_parameters[index])
+            roots[index], marginal[index] = DSSSystemPositiveRootsSWIG(self._swigwrapper,
+                                                                       pool._swigwrapper)
+        return roots, marginal > 0
+
+    def routh_index_batch(self, log_parameters):
+        ''' Routh index at many parameter sets.
+
+        The Routh index is a function of the signs of the first column of the
+        Routh array, so the C library is called once for each distinct sign
+        pattern, and once for each parameter set with a zero pivot.
+
+        Args:
+            log_parameters (ndarray): An N x p array of log10 parameter values,
+                with columns ordered as the independent variables.
+
+        Returns:
+            A length N array, or None if the S-System has no closed-form steady
+            state.
+        '''
+        log_parameters = np.atleast_2d(np.asarray(log_parameters, dtype=float))
+        routh = self._routh_first_columns(log_parameters)
+        if routh is None:
+            return None
+        first, uncertain = routh
+        signs = np.sign(first).astype(int)
+        index = np.zeros(len(first), dtype=int)
+        certain = np.flatnonzero(uncertain == False)
+        if len(certain) > 0:
+            patterns, representatives, inverse = np.unique(signs[certain], axis=0,
+                                                           return_index=True,
+                                                           return_inverse=True)
+            inverse = inverse.reshape(-1)
+            for k, representative in enumerate(representatives):
+                pool = self._parameter_pool(log_parameters[certain[representative]])
+                index[certain[inverse == k]] = DSSSystemRouthIndex(self._swigwrapper, pool._swigwrapper)
+        for row in np.flatnonzero(uncertain):
+            pool = self._parameter_pool(log_parameters[row])
+            index[row] = DSSSystemRouthIndex(self._swigwrapper, pool._swigwrapper)
+        return index
+
     def has_complex_conjugates(self, parameter_values):
         eigen_values = self.eigenvalues(parameter_values)
         has_conjugates = False
@@ -0,0 +1,328 @@
+''' A persistent pool of worker processes for a design space.
+
+An Executor starts its worker processes the first time a task is submitted,
+and keeps them until it is closed or its design space is deleted. Each worker
+receives a snapshot of the design space once, when it starts, so tasks only
+carry the identifiers of the cases they work on, which are retrieved from the
+worker's own copy of the design space. Arrays of a known shape, such as the
+grids of steady state functions, are written by the workers into a shared
+memory block instead of being pickled back.
+
+    executor = ds.executor(workers=4)
+    volumes = executor.map_cases(case_volume, ds.valid_cases())
+
+Task functions must be defined at module level, so that they can be pickled.
+The design space of a worker is available to them through
+worker_design_space.
+'''
+
+import weakref
+import multiprocessing
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+    from multiprocessing import resource_tracker
+except ImportError:
+    shared_memory = None
+    resource_tracker = None
+
+_worker_ds = None
+_worker_systems = dict()
+
+
+def _worker_initializer(state):
+    # Each worker process decodes its own copy of the design space once.
+    global _worker_ds
+    _worker_ds = pickle.loads(state)
+    _worker_systems.clear()
+
+
+def worker_design_space():
+    ''' The design space of the current worker process. '''
+    return _worker_ds
+
+
+def worker_full_system():
+    ''' The FullSystem of the design space of the current worker process,
+        built the first time it is used.
+    '''
+    if 'full_system' not in _worker_systems:
+        from dspace.models.fullsystem import FullSystem
+        _worker_systems['full_system'] = FullSystem(_worker_ds)
+    return _worker_systems['full_system']
+
+
+def _attach(name):
+    # The parent owns the block and unlinks it. Python < 3.13 registers every
+    # attached block with the resource tracker; a worker sharing the tracker
+    # of its parent registers the same name again, which is harmless, but a
+    # worker with a tracker of its own must unregister it, or that tracker
+    # reports it as leaked and unlinks it a second time.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    tracker = getattr(resource_tracker, '_resource_tracker', None)
+    inherited = getattr(tracker, '_fd', None) is not None
+    block = shared_memory.SharedMemory(name=name)
+    if inherited is False and getattr(shared_memory, '_USE_POSIX', False) is True:
+        resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def _case_identifier(case, constraints):
+    if isinstance(case, (int, str, np.integer)) is True:
+        return str(case), constraints
+    return case.case_number, getattr(case, '_constraints', None)
+
+
+def _case_task(arguments):
+    function, identifier, constraints, args, kwargs = arguments
+    case = _worker_ds(identifier, constraints=constraints)
+    return function(case, *args, **kwargs)
+
+
+def _array_task(arguments):
+    function, identifier, constraints, args, kwargs, buffer, shape, dtype, index = arguments
+    case = _worker_ds(identifier, constraints=constraints)
+    array, extra = function(case, *args, **kwargs)
+    if np.ma.isMaskedArray(array) is True:
+        array = np.ma.filled(array.astype(dtype), np.nan)
+    array = np.asarray(array, dtype=dtype)
+    if len(array.shape) != len(shape) or any([i > j for i, j in zip(array.shape, shape)]):
+        raise ValueError('Array of shape ' + str(array.shape) + ' does not fit in ' + str(shape))
+    if buffer is None:
+        return array, extra
+    shared = _attach(buffer)
+    try:
+        block = np.ndarray((index[1],) + tuple(shape), dtype=dtype, buffer=shared.buf)
+        region = tuple(slice(0, i) for i in array.shape)
+        block[(index[0],) + region] = array
+        del block
+    finally:
+        shared.close()
+    return array.shape, extra
+
+
+class Executor(object):
+    ''' A pool of worker processes that each hold a copy of a design space.
+
+    The workers hold a snapshot of the design space taken when the pool
+    starts; later changes to the design space are not seen by them. An
+    executor returned by limit shares the pool, and sends its tasks to at most
+    its own number of workers.
+    '''
+
+    def __init__(self, ds, workers=None):
+        ''' Init method for the executor.
+
+        Args:
+            ds (DesignSpace): The design space sent to each worker.
+
+        Kwargs:
+            workers (int): The number of worker processes. Defaults to the
+                number of processors.
+        '''
+        workers = _number_of_workers(workers)
+        # The design space is only referenced weakly, so that the executor it
+        # keeps does not form a reference cycle with it.
+        setattr(self, '_ds', weakref.ref(ds))
+        setattr(self, 'workers', workers)
+        setattr(self, '_shared', dict(pool=None, pool_size=0, size=workers))
+
+    @property
+    def ds(self):
+        return self._ds()
+
+    def limit(self, workers=None):
+        ''' An executor sharing the pool of this one, whose tasks run on at
+            most workers processes. The pool grows, and restarts, only when
+            more workers are requested than it has.
+        '''
+        workers = _number_of_workers(workers)
+        shared = self._shared
+        shared['size'] = max(shared['size'], workers)
+        limited = Executor.__new__(Executor)
+        setattr(limited, '_ds', self._ds)
+        setattr(limited, 'workers', workers)
+        setattr(limited, '_shared', shared)
+        return limited
+
+    @property
+    def pool(self):
+        ''' The multiprocessing pool, started when first used. '''
+        shared = self._shared
+        if shared['pool'] is not None and shared['pool_size'] < shared['size']:
+            self.close()
+        if shared['pool'] is None:
+            ds = self.ds
+            if ds is None:
+                raise ValueError('Design space of the executor no longer exists')
+            shared['pool'] = multiprocessing.Pool(shared['size'],
+                                                  initializer=_worker_initializer,
+                                                  initargs=(pickle.dumps(ds, 2),))
+            shared['pool_size'] = shared['size']
+        return shared['pool']
+
+    @property
+    def started(self):
+        return self._shared['pool'] is not None
+
+    def _chunksize(self, number_of_tasks, chunksize):
+        # Tasks sent in as many chunks as workers occupy at most that many
+        # processes of a larger pool.
+        if chunksize is not None:
+            return chunksize
+        if self.workers >= self._shared['size']:
+            return 1
+        return max(1, -(-number_of_tasks // self.workers))
+
+    def map(self, function, arguments, chunksize=None):
+        ''' Applies function to each item of arguments in the workers.
+
+        Returns:
+            A list with the result for each item, in order.
+        '''
+        arguments = list(arguments)
+        pool = self.pool
+        return pool.map(function, arguments, self._chunksize(len(arguments), chunksize))
+
+    def imap(self, function, arguments, chunksize=None):
+        ''' Like map, returning an iterator over the results in order. '''
+        arguments = list(arguments)
+        pool = self.pool
+        return pool.imap(function, arguments, self._chunksize(len(arguments), chunksize))
+
+    def _case_arguments(self, cases, constraints):
+        return [_case_identifier(case, constraints) for case in cases]
+
+    def map_cases(self, function, cases, args=(), kwargs=None, constraints=None,
+                  case_args=None, chunksize=None):
+        ''' Applies function(case, *args, **kwargs) to each case in the
+            workers.
+
+        Args:
+            function (function): A function defined at module level.
+            cases (list): Case objects or case identifiers. Case objects are
+                sent by their identifier and constraints.
+
+        Kwargs:
+            args (tuple): Positional arguments passed after the case.
+            kwargs (dict): Keyword arguments passed to function.
+            constraints (list): The constraints of cases given by identifier.
+            case_args (list): A tuple of positional arguments for each case,
+                passed between the case and args.
+            chunksize (int): The number of tasks sent to a worker at once.
+                Defaults to 1, or to a share of the tasks per worker when
+                the pool is larger than the executor.
+
+        Returns:
+            A list with the result for each case, in order.
+        '''
+        if kwargs is None:
+            kwargs = dict()
+        identifiers = self._case_arguments(cases, constraints)
+        if case_args is None:
+            case_args = [()]*len(identifiers)
+        if len(case_args) != len(identifiers):
+            raise ValueError('case_args must have one entry per case')
+        tasks = [(function, identifier, case_constraints, tuple(extra) + tuple(args), kwargs)
+                 for (identifier, case_constraints), extra in zip(identifiers, case_args)]
+        return self.map(_case_task, tasks, chunksize)
+
+    def map_case_arrays(self, function, cases, shape, args=(), kwargs=None,
+                        constraints=None, dtype=float, chunksize=None):
+        ''' Applies function(case, *args, **kwargs) to each case in the
+            workers, where function returns an array and any other result.
+
+        The arrays are written by the workers into a shared memory block with
+        room for an array of the given shape per case, and only the other
+        results are pickled. Arrays may be smaller than shape along any axis.
+        Masked arrays are written with their masked entries as NaN. Without
+        shared memory (Python < 3.8), the arrays are pickled instead.
+
+        Returns:
+            A list of (array, result) tuples, one for each case, in order.
+        '''
+        if kwargs is None:
+            kwargs = dict()
+        identifiers = self._case_arguments(cases, constraints)
+        shape = tuple(int(i) for i in shape)
+        dtype = np.dtype(dtype)
+        if shared_memory is None or len(identifiers) == 0:
+            tasks = [(function, identifier, case_constraints, tuple(args), kwargs, None, shape, dtype, None)
+                     for identifier, case_constraints in identifiers]
+            return self.map(_array_task, tasks, chunksize)
+        size = max(1, len(identifiers)*int(np.prod(shape))*dtype.itemsize)
+        buffer = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            tasks = [(function, identifier, case_constraints, tuple(args), kwargs,
+                      buffer.name, shape, dtype, (index, len(identifiers)))
+                     for index, (identifier, case_constraints) in enumerate(identifiers)]
+            results = self.map(_array_task, tasks, chunksize)
+            block = np.ndarray((len(identifiers),) + shape, dtype=dtype, buffer=buffer.buf)
+            data = np.array(block)
+            del block
+        finally:
+            buffer.close()
+            buffer.unlink()
+        arrays = list()
+        for index, (array_shape, extra) in enumerate(results):
+            region = tuple(slice(0, i) for i in array_shape)
+            arrays.append((data[(index,) + region], extra))
+        return arrays
+
+    def close(self):
+        ''' Stops the worker processes once their tasks are done. '''
+        shared = self._shared
+        if shared['pool'] is None:
+            return
+        pool = shared['pool']
+        shared['pool'] = None
+        pool.close()
+        pool.join()
+
+    def terminate(self):
+        ''' Stops the worker processes immediately. '''
+        shared = self._shared
+        if shared['pool'] is None:
+            return
+        pool = shared['pool']
+        shared['pool'] = None
+        pool.terminate()
+        pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+        return False
+
+    def __getstate__(self):
+        raise TypeError('Executor objects cannot be pickled')
+
+
+def _number_of_workers(workers):
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers < 1:
+        raise ValueError('Number of workers must be positive')
+    return workers
+
+
+def executor(ds, workers=None):
+    ''' The persistent executor of a design space, with the given number of
+        workers. See DesignSpace.executor.
+    '''
+    return ds.executor(workers=workers)
@@ -17,6 +17,42 @@ import dspace.models.case
 from dspace.plotutils.monkey_patching import monkeypatch_method
 from dspace.models.case import Case, CaseIntersection
 
+def _log_parameter_matrix(variables, p_vals, log_values):
+    ''' Builds an N x p matrix of log10 parameter values with columns ordered
+        as variables. The varied parameters are given by log_values, mapping
+        their names to arrays of N log10 values; the remaining parameters are
+        fixed at their values in p_vals.
+    '''
+    size = len(list(log_values.values())[0])
+    log_parameters = np.empty((size, len(variables)))
+    for index, key in enumerate(variables):
+        if key in log_values:
+            log_parameters[:, index] = log_values[key]
+        else:
+            log_parameters[:, index] = log10(p_vals[key])
+    return log_parameters
+
+def _ss_function_values(case, function, p_vals, x_variable, y_variable, x, y):
+    ''' Evaluates a steady state function of a case at the log10 points x, y
+        in a single batch.
+    '''
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    log_parameters = _log_parameter_matrix(case.independent_variables, p_vals,
+                                           {x_variable:x.ravel(),
+                                            y_variable:y.ravel()})
+    plan = case.ssystem.steady_state_function_plan(function)
+    return plan.batch(log_parameters).reshape(x.shape)
+
+def _update_clim(clim, values):
+    values = np.asarray(values, dtype=float)
+    values = values[np.isnan(values) == False]
+    if len(values) == 0:
+        return clim
+    if clim is None:
+        return [values.min(), values.max()]
+    return [min(clim[0], values.min()), max(clim[1], values.max())]
+
 def generate_plot_lattice_bounds(case, p_vals, x_variable, y_variable, range_x, range_y, resolution):
     
     V = case.vertices_2D_slice(p_vals, x_variable, y_variable, 
@@ -130,13 +166,16 @@ def interpolated_data(case, function, p_vals, x_variable, y_variable, points, x,
     for key in params:
         params[key] = p_vals[key]
     clim = None
+    plan = case.ssystem.steady_state_function_plan(function)
+    if alt_function is not None:
+        alt_plan = case.ssystem.steady_state_function_plan(alt_function)
     for (x_value,y_value) in points:
         params[x_variable] = 10**x_value
         params[y_variable] = 10**y_value
-        value = case.ssystem.steady_state_function(function, params)        
+        value = plan(params)
         f_val.append(value)
         if alt_function is not None:
-            alt_value = case.ssystem.steady_state_function(alt_function, params)
+            alt_value = alt_plan(params)
             alt_f_val.append(alt_value)
     V = zip(*points)
     X,Y = np.meshgrid(x, y)
@@ -157,28 +196,12 @@ def interpolated_data(case, function, p_vals, x_variable, y_variable, points, x,
 
 def sampled_data(case, function, p_vals, x_variable, y_variable, points, x, y, path, alt_function=None):
 
-    f_val = list()
-    alt_f_val = list()
-    params = VariablePool(p_vals)
-    V = zip(*points)    
     X,Y = np.meshgrid(x, y)
-    Z = mt.mlab.griddata(V[0], V[1], np.repeat(1, len(V[0])), X, Y)
+    Z = _ss_function_values(case, function, p_vals, x_variable, y_variable, X, Y)
     if alt_function is not None:
-        Z_alt = mt.mlab.griddata(V[0], V[1], np.repeat(1, len(V[0])), X, Y)
-    clim = None
-    for (i, yi) in enumerate(y):
-        params[y_variable] = 10**y[i]
-        for (j, xj) in enumerate(x):
-            params[x_variable] = 10**x[j]
-            Z[i,j] = case.ssystem.steady_state_function(function, params)
-            if alt_function is not None:
-                Z_alt[i,j] = case.ssystem.steady_state_function(alt_function, params)
-            if path.contains_point((xj, yi)) == 1:
-                if clim is None:
-                    clim = [Z[i,j], Z[i,j]]
-                else:
-                    clim[0] = min(clim[0], Z[i,j])
-                    clim[1] = max(clim[1], Z[i,j])
+        Z_alt = _ss_function_values(case, alt_function, p_vals, x_variable, y_variable, X, Y)
+    inside = path.contains_points(np.column_stack((X.ravel(), Y.ravel()))).reshape(X.shape)
+    clim = _update_clim(None, Z[inside])
     if alt_function is not None:
         Z = [Z, Z_alt]
     return X,Y,Z,clim
@@ -186,22 +209,11 @@ def sampled_data(case, function, p_vals, x_variable, y_variable, points, x, y, p
 def interpolated_data_new(case, function, p_vals, x_variable, y_variable,
                           range_x, range_y, x_indices, y_indices, path,
                           resolution, alt_function=None):
-    f_val = list()
-    alt_f_val = list()
-    params = VariablePool(names=case.independent_variables)
-    for key in params:
-        params[key] = p_vals[key]
-    clim = None
     points = path.vertices
-    for (x_value,y_value) in points:
-        params[x_variable] = 10**x_value
-        params[y_variable] = 10**y_value
-        value = case.ssystem.steady_state_function(function, params)        
-        f_val.append(value)
-        if alt_function is not None:
-            alt_value = case.ssystem.steady_state_function(alt_function, params)
-            alt_f_val.append(alt_value)
-    V = zip(*points)
+    V = list(zip(*points))
+    f_val = _ss_function_values(case, function, p_vals, x_variable, y_variable, V[0], V[1])
+    if alt_function is not None:
+        alt_f_val = _ss_function_values(case, alt_function, p_vals, x_variable, y_variable, V[0], V[1])
     delta_x = (range_x[1]-range_x[0])/resolution
     delta_y = (range_y[1]-range_y[0])/resolution
     x = np.linspace(range_x[0] + delta_x*x_indices[0], range_x[0] + delta_x * x_indices[1], 1+x_indices[1] - x_indices[0])
@@ -212,31 +224,19 @@ def interpolated_data_new(case, function, p_vals, x_variable, y_variable,
     Z = mt.mlab.griddata(V[0], V[1], f_val, X, Y, interp='linear')
     if alt_function is not None:
         Z_alt = mt.mlab.griddata(V[0], V[1], alt_f_val, X, Y, interp='linear')
-    for (i, yi) in enumerate(y):
-        for (j, xj) in enumerate(x):
-            if path.contains_point((xj, yi)) == False:
-                Z[i,j] = np.nan
-                continue
-            if clim is None:
-                clim = [Z[i,j], Z[i,j]]
-            else:
-                clim[0] = min(clim[0], Z[i,j])
-                clim[1] = max(clim[1], Z[i,j])
-    Z = np.ma.array(Z, mask=np.isnan(Z))
+    Z = np.ma.filled(np.ma.array(Z, dtype=float), np.nan)
+    inside = path.contains_points(np.column_stack((X.ravel(), Y.ravel()))).reshape(X.shape)
+    Z[inside == False] = np.nan
+    clim = _update_clim(None, Z[inside])
     interpolated_path = path.interpolated((len(path.vertices)-1)*resolution)
-    for (xj, yi) in interpolated_path.vertices:
-        j = np.argmin(abs(x-xj))
-        i = np.argmin(abs(y-yi))
-        params[x_variable] = 10**x[j]
-        params[y_variable] = 10**y[i]
-        Z[i,j] = case.ssystem.steady_state_function(function, params)
+    j = np.array([np.argmin(abs(x-xj)) for (xj, yi) in interpolated_path.vertices], dtype=int)
+    i = np.array([np.argmin(abs(y-yi)) for (xj, yi) in interpolated_path.vertices], dtype=int)
+    if len(i) > 0:
+        Z[i,j] = _ss_function_values(case, function, p_vals, x_variable, y_variable, x[j], y[i])
         if alt_function is not None:
-            Z_alt[i,j] = case.ssystem.steady_state_function(alt_function, params)
-        if clim is None:
-            clim = [Z[i,j], Z[i,j]]
-        else:
-            clim[0] = min(clim[0], Z[i,j])
-            clim[1] = max(clim[1], Z[i,j])
+            Z_alt[i,j] = _ss_function_values(case, alt_function, p_vals, x_variable, y_variable, x[j], y[i])
+        clim = _update_clim(clim, Z[i,j])
+    Z = np.ma.array(Z, mask=np.isnan(Z))
     if alt_function is not None:
         Z = [Z, Z_alt]
     return X,Y,Z,clim
@@ -260,6 +260,9 @@ def sample_data_new(case, function, p_vals, x_variable, y_variable,
     if alt_function is not None:
         Z = np.zeros((len(x), len(y))) #mt.mlab.griddata(x, y, np.repeat(0, len(x)), X, Y)
     clim = None
+    plan = case.ssystem.steady_state_function_plan(function)
+    if alt_function is not None:
+        alt_plan = case.ssystem.steady_state_function_plan(alt_function)
     for (i, yi) in enumerate(y):
         params[y_variable] = 10**yi
         for (j, xj) in enumerate(x):
@@ -267,9 +270,9 @@ def sample_data_new(case, function, p_vals, x_variable, y_variable,
                 Z[i,j] = np.nan
                 continue
             params[x_variable] = 10**xj
-            Z[i,j] = case.ssystem.steady_state_function(function, params)
+            Z[i,j] = plan(params)
             if alt_function is not None:
-                Z_alt[i,j] = case.ssystem.steady_state_function(alt_function, params)
+                Z_alt[i,j] = alt_plan(params)
             if clim is None:
                 clim = [Z[i,j], Z[i,j]]
             else:
@@ -283,9 +286,9 @@ def sample_data_new(case, function, p_vals, x_variable, y_variable,
         params[x_variable] = 10**x[j]
         params[y_variable] = 10**y[i]
         ## print xj, yi
-        Z[i,j] = case.ssystem.steady_state_function(function, params)
+        Z[i,j] = plan(params)
         if alt_function is not None:
-            Z_alt[i,j] = case.ssystem.steady_state_function(alt_function, params)
+            Z_alt[i,j] = alt_plan(params)
         if clim is None:
             clim = [Z[i,j], Z[i,j]]
         else:
@@ -629,10 +632,9 @@ def draw_1D_ss_function(self, ax, function, p_vals, slice_variable, range_slice,
     if len(V) == 1:
         return None
     X = np.linspace(V[0], V[1], resolution)
-    f_val = list()
-    for x in X:
-        params[slice_variable] = 10**x
-        f_val.append(self.ssystem.steady_state_function(function, params))
+    log_parameters = _log_parameter_matrix(self.independent_variables, params,
+                                           {slice_variable:X})
+    f_val = self.ssystem.steady_state_function_batch(function, log_parameters)
     pt = ax.plot(X, f_val, **kwargs)
     ax.set_xlim(np.log10(range_slice))
     return pt
@@ -10,6 +10,7 @@ import itertools
 import numpy as np
 from time import sleep
 import matplotlib as mt
+import matplotlib.backend_bases
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider
 from math import log10, floor, ceil
@@ -18,6 +19,7 @@ from dspace.SWIG.dspace_interface import *
 from dspace.variables import VariablePool
 from dspace.expressions import Expression
 from dspace.models.cyclicalcase import CyclicalCase
+from dspace.models.case import CaseIntersection
 import dspace.models.case
 import dspace.models.designspace
 
@@ -26,10 +28,10 @@ from dspace.models.designspace import DesignSpace
 
 import dspace.plotutils.case_plot
 from dspace.models.designspace import sort_cases
+from dspace.plotutils.case_plot import _log_parameter_matrix
 
 import io as StringIO
 from subprocess import call, Popen, PIPE
-from dspace.graphs.designspace_graph import GraphGenerator
 from functools import cmp_to_key
 
 
@@ -67,6 +69,188 @@ def key_sort_function(x, y):
    
  
 
+class SliceEngine(object):
+    ''' Incremental computation of the regions of a 2D slice of a design
+        space.
+
+    The region of a case only depends on the parameters that appear in its
+    boundaries. The engine records these parameters for each case, and caches
+    the validity and the polygons of cases and intersections keyed by the
+    values of those parameters alone. When a slider moves a single parameter,
+    only the cases whose boundaries involve it are recomputed.
+    '''
+
+    def __init__(self, ds, x_variable, y_variable, range_x, range_y,
+                 expand_cycles=True, incremental_limit=1000, max_entries=20000):
+        ''' Init method for the slice engine.
+
+        Args:
+            ds (DesignSpace): The design space being sliced.
+            x_variable (str): The parameter on the x-axis.
+            y_variable (str): The parameter on the y-axis.
+            range_x (list): The range of the x-axis.
+            range_y (list): The range of the y-axis.
+
+        Kwargs:
+            expand_cycles (bool): If True, valid subcases of cyclical cases
+                are drawn.
+            incremental_limit (int): The largest number of cases for which
+                validity is tracked case by case. Larger design spaces are
+                enumerated by the C library at each new parameter set.
+            max_entries (int): The number of cached entries above which the
+                caches are emptied.
+        '''
+        self.ds = ds
+        self.x_variable = x_variable
+        self.y_variable = y_variable
+        self.range_x = list(range_x)
+        self.range_y = list(range_y)
+        self.expand_cycles = expand_cycles
+        self.max_entries = max_entries
+        self.fixed = [i for i in ds.independent_variables if i not in (x_variable, y_variable)]
+        incremental = ds.number_of_cases <= incremental_limit
+        if ds._resolve_cycles is True:
+            incremental = False
+        if DSDesignSpaceUnstable(ds._swigwrapper) is True or DSDesignSpaceResolveCoDominance(ds._swigwrapper) is True:
+            incremental = False
+        self.incremental = incremental
+        self._all_cases = None
+        self._parameters = dict()
+        self._validity = dict()
+        self._polygons = dict()
+        self._valid_sets = dict()
+
+    def check_slice(self, x_variable, y_variable, range_x, range_y, expand_cycles):
+        ''' Checks that a slice is the one the engine was built for. '''
+        if (x_variable, y_variable) != (self.x_variable, self.y_variable):
+            raise ValueError('Slice engine was built for the variables ' +
+                             self.x_variable + ' and ' + self.y_variable)
+        if list(range_x) != self.range_x or list(range_y) != self.range_y:
+            raise ValueError('Slice engine was built for different ranges')
+        if expand_cycles != self.expand_cycles:
+            raise ValueError('Slice engine was built with expand_cycles=' + str(self.expand_cycles))
+
+    def _store(self, cache, key, value):
+        if len(cache) >= self.max_entries:
+            cache.clear()
+        cache[key] = value
+        return value
+
+    def p_bounds(self, p_vals):
+        p_bounds = dict(p_vals)
+        p_bounds[self.x_variable] = self.range_x
+        p_bounds[self.y_variable] = self.range_y
+        return p_bounds
+
+    def case_parameters(self, identifier):
+        ''' The fixed parameters on which the region of a case depends. '''
+        if identifier not in self._parameters:
+            case = self.ds(identifier)
+            boundaries = None
+            if isinstance(case, CyclicalCase) is False:
+                boundaries = case.boundaries_log
+            if boundaries is None:
+                parameters = list(self.fixed)
+            else:
+                names = set()
+                for i in range(len(boundaries)):
+                    names.update(boundaries[i].variables)
+                parameters = [i for i in self.fixed if i in names]
+            self._parameters[identifier] = parameters
+        return self._parameters[identifier]
+
+    def _key(self, identifiers, p_vals):
+        parameters = set()
+        for identifier in identifiers:
+            parameters.update(self.case_parameters(identifier))
+        return (tuple(identifiers), tuple((i, p_vals[i]) for i in sorted(parameters)))
+
+    def is_valid(self, identifiers, p_vals, strict=True):
+        ''' Validity of a case, or of the intersection of several cases, in
+            the slice.
+        '''
+        key = (strict, self._key(identifiers, p_vals))
+        if key in self._validity:
+            return self._validity[key]
+        region = CaseIntersection([self.ds(i) for i in identifiers])
+        valid = region.is_valid(p_bounds=self.p_bounds(p_vals), strict=strict)
+        return self._store(self._validity, key, valid)
+
+    def valid_cases(self, p_vals, strict=True):
+        ''' The identifiers of the cases valid in the slice, sorted. '''
+        if self.incremental is False:
+            key = (strict, tuple((i, p_vals[i]) for i in self.fixed))
+            if key not in self._valid_sets:
+                valid = self.ds.valid_cases(p_bounds=self.p_bounds(p_vals),
+                                            expand_cycles=self.expand_cycles,
+                                            strict=strict)
+                self._store(self._valid_sets, key, valid)
+            return list(self._valid_sets[key])
+        if self._all_cases is None:
+            # The first slice is enumerated by the C library in one pass.
+            self._all_cases = [str(i) for i in range(1, self.ds.number_of_cases+1)]
+            for bulk_strict in [True, False]:
+                valid = set(self.ds.valid_cases(p_bounds=self.p_bounds(p_vals),
+                                                expand_cycles=False,
+                                                strict=bulk_strict))
+                for identifier in self._all_cases:
+                    key = (bulk_strict, self._key([identifier], p_vals))
+                    self._validity[key] = identifier in valid
+        return [i for i in self._all_cases if self.is_valid([i], p_vals, strict=strict) is True]
+
+    def valid_intersecting_cases(self, intersects, case_numbers, p_vals, strict=True):
+        ''' Same as DesignSpace.valid_intersecting_cases, with the validity of
+            each case and intersection taken from the cache.
+        '''
+        if isinstance(intersects, list) is False:
+            intersects = [intersects]
+        if len(case_numbers) == 0:
+            return None
+        intersections = list()
+        if 1 in intersects:
+            intersections += [[i] for i in case_numbers if self.is_valid([i], p_vals, strict=strict) is True]
+        sets = [set([i]) for i in range(len(case_numbers))]
+        for i in range(2, max(intersects)+1):
+            sets_to_check = sets
+            sets = []
+            for j in itertools.combinations(range(len(sets_to_check)), 2):
+                current_set = set()
+                for k in j:
+                    current_set = current_set.union(sets_to_check[k])
+                if len(current_set) != i:
+                    continue
+                if current_set in sets:
+                    continue
+                identifiers = [case_numbers[k] for k in current_set]
+                if self.is_valid(identifiers, p_vals) is True:
+                    if i in intersects:
+                        intersections.append(identifiers)
+                    sets.append(current_set)
+        return intersections
+
+    def vertices(self, identifiers, p_vals):
+        ''' The log-coordinate vertices of the region of a case, or of the
+            intersection of several cases, in the slice.
+        '''
+        key = self._key(identifiers, p_vals)
+        if key in self._polygons:
+            return self._polygons[key]
+        region = CaseIntersection([self.ds(i) for i in identifiers])
+        pvals = VariablePool(names=self.ds.independent_variables)
+        pvals.update(p_vals)
+        V = region.vertices_2D_slice(pvals, self.x_variable, self.y_variable,
+                                     range_x=self.range_x, range_y=self.range_y,
+                                     log_out=True)
+        return self._store(self._polygons, key, V)
+
+    def draw(self, ax, identifiers, p_vals, **kwargs):
+        V = self.vertices(identifiers, p_vals)
+        if len(V) == 0:
+            return
+        V = list(zip(*V))
+        ax.fill(V[0], V[1], **kwargs)
+
+
 class SliderCallback(object):
     
     def __init__(self, ds, slider_dictionary, c_axs,  colordict, *args, **kwargs):
@@ -74,11 +258,33 @@ class SliderCallback(object):
         self.sliders = slider_dictionary
         self.c_axs = c_axs
         self.args = args
+        self.delay = kwargs.pop('delay', 150)
         self.kwargs = kwargs
+        self._timer = None
+        self._drawn = None
         kwargs['color_dict'] = colordict
         kwargs['colorbar'] = False
+        if 'engine' not in kwargs:
+            kwargs['engine'] = SliceEngine(ds, args[2], args[3], args[4], args[5],
+                                           expand_cycles=kwargs.get('expand_cycles', True))
         
     def __call__(self, val):
+        # Each tick restarts a single-shot timer, so that a slider being
+        # dragged is only redrawn once it rests, and stale positions are never
+        # drawn.
+        if self._timer is None and self.delay:
+            timer = self.args[0].figure.canvas.new_timer(interval=self.delay)
+            if type(timer) is not mt.backend_bases.TimerBase:
+                timer.single_shot = True
+                timer.add_callback(self.redraw)
+                self._timer = timer
+        if self._timer is None:
+            self.redraw()
+            return
+        self._timer.stop()
+        self._timer.start()
+
+    def redraw(self):
         ax = self.args[0]
         pvals = self.args[1]
         sliders = self.sliders
@@ -86,6 +292,10 @@ class SliderCallback(object):
         color_dict = self.kwargs['color_dict']
         for i in sliders:
             pvals[i] = 10**sliders[i].val
+        current = tuple((i, pvals[i]) for i in sorted(sliders))
+        if current == self._drawn:
+            return
+        self._drawn = current
         ax.clear()
         for i in self.c_axs:
             i.clear()
@@ -184,52 +394,63 @@ def draw_2D_log_gain_repertoire(self, ax, x_variable, y_variable, z_variable,
 
     
 
-@monkeypatch_method(dspace.models.designspace.DesignSpace)   
-def draw_2D_routh_index(self, ax, p_vals, x_variable, y_variable, range_x, range_y, color_dict=None,
-                           colorbar=True, resolution=100, cmap=mt.cm.Spectral_r):
-    
-    if color_dict is None:
-        color_dict = dict()
-    p_bounds = dict(p_vals)
-    p_bounds[x_variable] = range_x
-    p_bounds[y_variable] = range_y
-    valid_cases = self.valid_cases(p_bounds=p_bounds)
-    ssystems = list()
-    for case_number in valid_cases:
-        case = self(case_number)
-        V = case.vertices_2D_slice(p_vals, x_variable, y_variable, 
-                               range_x=[range_x[0]/2, range_x[1]*2], range_y=[range_y[0]/2, range_y[1]*2],
-                               log_out=True)
-        path=mt.path.Path(V, closed=False) 
-        ssystems.append((path, case.ssystem.remove_algebraic_constraints()))
-    x = np.linspace(log10(range_x[0]), log10(range_x[1]), resolution)
-    y = np.linspace(log10(range_y[0]), log10(range_y[1]), resolution)
-    X, Y = np.meshgrid(x, y)
-    Z=np.zeros((len(x), len(y)), dtype=np.int)
+def _grid_region_index(owners, codes, shape, labels, empty=-1, unique=False):
+    ''' Assigns a region index to each grid point from the codes of the systems
+        that contain it.
+
+    Region indices are numbered by first appearance in row-major order, which
+    reproduces the numbering of a point-by-point scan of the grid.
+
+    Args:
+        owners (ndarray): K x N boolean array, true where system k contains
+            grid point n.
+        codes (ndarray): K x N non-negative integer array with the value of
+            system k at grid point n.
+        shape (tuple): Shape of the output grid, with N elements.
+        labels (callable): Maps a code to its string label.
+
+    Kwargs:
+        empty (int): Index assigned to points outside every system.
+        unique (bool): If True, repeated codes are reported only once.
+
+    Returns:
+        A tuple (Z, values), with the grid of region indices and the dictionary
+        mapping region keys to indices.
+    '''
     values = dict()
-    params = VariablePool(p_vals)
-    Zj = set()
-    for i in range(len(y)):
-        yi = y[i]
-        params[y_variable] = 10**yi
-        for j in range(len(x)):
-            xj = x[j]
-            params[x_variable] = 10**xj
-            Zj.clear()
-            for path, ssystem in ssystems:
-                if path.contains_point((xj, yi)):
-                    Zj.add(ssystem.routh_index(params))
-            nums = [num for num in Zj]
-            if len(nums) == 0:
-                continue
-            key = str(nums[0])
-            for index in range(1, len(nums)):
-                key += ','+str(nums[index])
-            try:
-                Z[i,j] = values[key]
-            except KeyError:
-                Z[i,j] = len(values)
-                values[key] = len(values)
+    number_of_points = int(np.prod(shape))
+    if len(owners) == 0:
+        return np.zeros(shape, dtype=int) + empty, values
+    masked = np.where(owners, codes, -1).T
+    columns, first, inverse = np.unique(masked, axis=0,
+                                        return_index=True,
+                                        return_inverse=True)
+    region = np.zeros(len(columns), dtype=int) + empty
+    for u in np.argsort(first):
+        nums = [code for code in columns[u] if code >= 0]
+        if len(nums) == 0:
+            continue
+        if unique is True:
+            nums = set(nums)
+        key = ','.join([labels(code) for code in sorted(nums)])
+        if key not in values:
+            values[key] = len(values)
+        region[u] = values[key]
+    Z = region[inverse.reshape(number_of_points)].reshape(shape)
+    return Z, values
+
+def _positive_roots_code(roots):
+    if isinstance(roots, str) is True:
+        return 2*int(roots.strip('*')) + 1
+    return 2*int(roots)
+
+def _positive_roots_label(code):
+    if code % 2 == 1:
+        return str(code//2) + '*'
+    return str(code//2)
+
+def _draw_region_index(self, ax, X, Y, Z, values, color_dict, colorbar, cmap, 
+                       range_x, range_y, x_variable, y_variable, levels, edge_colors):
     colors = dict()
     for i in values:
         colors[values[i]] = cmap(values[i]/(len(values)))
@@ -237,8 +458,8 @@ def draw_2D_routh_index(self, ax, p_vals, x_variable, y_variable, range_x, range
             colors[values[i]] = color_dict[i]
     fc = [colors[i] for i in range(len(values))]
     cf=ax.contourf(X, Y, Z, cmap=None,
-                   levels=[-1] + [i for i in range(len(values)+1)],
-                   colors = fc + ['k'])
+                   levels=levels + [i for i in range(len(values)+1)],
+                   colors = edge_colors[0] + fc + edge_colors[1])
     colors = {key:colors[values[key]] for key in values}
     if colorbar is True:
         c_ax,kw=mt.colorbar.make_axes(ax)
@@ -254,6 +475,50 @@ def draw_2D_routh_index(self, ax, p_vals, x_variable, y_variable, range_x, range
     ax.set_ylabel(r'$\log_{10}$(' + y_variable + ')')
     return cf, colors
 
+@monkeypatch_method(dspace.models.designspace.DesignSpace)   
+def draw_2D_routh_index(self, ax, p_vals, x_variable, y_variable, range_x, range_y, color_dict=None,
+                           colorbar=True, resolution=100, cmap=mt.cm.Spectral_r):
+    
+    if color_dict is None:
+        color_dict = dict()
+    p_bounds = dict(p_vals)
+    p_bounds[x_variable] = range_x
+    p_bounds[y_variable] = range_y
+    valid_cases = self.valid_cases(p_bounds=p_bounds)
+    ssystems = list()
+    for case_number in valid_cases:
+        case = self(case_number)
+        V = case.vertices_2D_slice(p_vals, x_variable, y_variable, 
+                               range_x=[range_x[0]/2, range_x[1]*2], range_y=[range_y[0]/2, range_y[1]*2],
+                               log_out=True)
+        path=mt.path.Path(V, closed=False) 
+        ssystems.append((path, case.ssystem.remove_algebraic_constraints()))
+    x = np.linspace(log10(range_x[0]), log10(range_x[1]), resolution)
+    y = np.linspace(log10(range_y[0]), log10(range_y[1]), resolution)
+    X, Y = np.meshgrid(x, y)
+    points = np.column_stack((X.ravel(), Y.ravel()))
+    owners = np.array([path.contains_points(points) for path, ssystem in ssystems], dtype=bool)
+    codes = np.zeros(owners.shape, dtype=int)
+    params = VariablePool(p_vals)
+    for k, (path, ssystem) in enumerate(ssystems):
+        indices = np.flatnonzero(owners[k])
+        log_values = {x_variable:points[indices, 0],
+                      y_variable:points[indices, 1]}
+        log_parameters = _log_parameter_matrix(ssystem.independent_variables,
+                                               p_vals, log_values)
+        batch = ssystem.routh_index_batch(log_parameters)
+        if batch is not None:
+            codes[k, indices] = batch
+            continue
+        for n in indices:
+            params[x_variable] = 10**points[n, 0]
+            params[y_variable] = 10**points[n, 1]
+            codes[k, n] = ssystem.routh_index(params)
+    Z, values = _grid_region_index(owners, codes, X.shape, str, empty=0, unique=True)
+    return _draw_region_index(self, ax, X, Y, Z, values, color_dict, colorbar, cmap,
+                              range_x, range_y, x_variable, y_variable,
+                              [-1], [[], ['k']])
+
 @monkeypatch_method(dspace.models.designspace.DesignSpace)
 def draw_2D_positive_roots(self, ax, p_vals, x_variable, y_variable, range_x, 
                            range_y, color_dict=None, colorbar=True, 
@@ -298,67 +563,54 @@ def draw_2D_positive_roots(self, ax, p_vals, x_variable, y_variable, range_x,
     x = np.linspace(log10(range_x[0]), log10(range_x[1]), resolution)
     y = np.linspace(log10(range_y[0]), log10(range_y[1]), resolution)
     X, Y = np.meshgrid(x, y)
-    Z=np.zeros((len(x), len(y)), dtype=np.int)
-    Z = Z - 1
-    values = dict()
+    points = np.column_stack((X.ravel(), Y.ravel()))
     params = VariablePool(p_vals)
-    for i in range(len(y)):
-        yi = y[i]
-        params[y_variable] = 10**yi
-        for j in range(len(x)):
-            xj = x[j]
-            params[x_variable] = 10**xj
-            Zj = []
-            for path, system in ssystems:
-                if path.contains_point((xj, yi)):
-                    roots = system.positive_roots(params)
-                    if isinstance(roots, dict) is True:
-                        for subcase in roots:
-                            Zj.append(roots[subcase])
-                    else:
-                        Zj.append(roots)
-            Zj.sort()
-            nums = [num for num in Zj]
-            if len(nums) == 0:
-                continue
-            key = str(nums[0])
-            for index in range(1, len(nums)):
-                key += ','+str(nums[index])
-            try:
-                Z[i,j] = values[key]
-            except KeyError:
-                Z[i,j] = len(values)
-                values[key] = len(values)
-    colors = dict()
-    for i in values:
-        colors[values[i]] = cmap(values[i]/(len(values)))
-        if i in color_dict:
-            colors[values[i]] = color_dict[i]
-    fc = [colors[i] for i in range(len(values))]
-    cf=ax.contourf(X, Y, Z, cmap=None,
-                   levels=[-2, -1] + [i for i in range(len(values)+1)],
-                   colors = ['k'] + fc + ['k'])
-    colors = {key:colors[values[key]] for key in values}
-    if colorbar is True:
-        c_ax,kw=mt.colorbar.make_axes(ax)
-        c_ax.set_aspect(15)
-        self.draw_region_colorbar(c_ax, colors)
-    ax.set_xlim([log10(min(range_x)), log10(max(range_x))])
-    ax.set_ylim([log10(min(range_y)), log10(max(range_y))])
-    if x_variable in self._latex:
-        x_variable = '$'+self._latex[x_variable]+'$'
-    if y_variable in self._latex:
-        y_variable = '$'+self._latex[y_variable]+'$'
-    ax.set_xlabel(r'$\log_{10}$(' + x_variable + ')')
-    ax.set_ylabel(r'$\log_{10}$(' + y_variable + ')')
-    return cf, colors
+    owners = list()
+    codes = list()
+    for path, system in ssystems:
+        inside = path.contains_points(points)
+        indices = np.flatnonzero(inside)
+        batch = None
+        if isinstance(system, CyclicalCase) is False:
+            log_values = {x_variable:points[indices, 0],
+                          y_variable:points[indices, 1]}
+            log_parameters = _log_parameter_matrix(system.independent_variables,
+                                                   p_vals, log_values)
+            batch = system.positive_roots_batch(log_parameters)
+        if batch is not None:
+            roots, marginal = batch
+            system_codes = np.zeros(len(points), dtype=int)
+            system_codes[indices] = 2*roots + marginal
+            owners.append(inside)
+            codes.append(system_codes)
+            continue
+        # Cyclical cases report the roots of every subcase at each point.
+        subcase_codes = dict()
+        for n in indices:
+            params[x_variable] = 10**points[n, 0]
+            params[y_variable] = 10**points[n, 1]
+            roots = system.positive_roots(params)
+            if isinstance(roots, dict) is False:
+                roots = {None:roots}
+            for subcase in roots:
+                if subcase not in subcase_codes:
+                    subcase_codes[subcase] = np.zeros(len(points), dtype=int) - 1
+                subcase_codes[subcase][n] = _positive_roots_code(roots[subcase])
+        for subcase in subcase_codes:
+            owners.append(subcase_codes[subcase] >= 0)
+            codes.append(subcase_codes[subcase])
+    Z, values = _grid_region_index(np.array(owners, dtype=bool), np.array(codes, dtype=int),
+                                   X.shape, _positive_roots_label)
+    return _draw_region_index(self, ax, X, Y, Z, values, color_dict, colorbar, cmap,
+                              range_x, range_y, x_variable, y_variable,
+                              [-2, -1], [['k'], ['k']])
     
 @monkeypatch_method(dspace.models.designspace.DesignSpace)   
 def draw_2D_slice(self, ax, p_vals, x_variable, y_variable,
                   range_x, range_y, color_dict=None,
                   intersections=[1,2,3,4,5], included_cases=None, 
                   expand_cycles=True,
-                  colorbar=True, cmap=mt.cm.gist_rainbow, **kwargs):
+                  colorbar=True, cmap=mt.cm.gist_rainbow, engine=None, **kwargs):
     pvals = dspace.VariablePool(names=self.independent_variables)
     if set(pvals.keys()) != set(p_vals.keys()):
         raise ValueError('Incomplete parameter set')
@@ -368,11 +620,16 @@ def draw_2D_slice(self, ax, p_vals, x_variable, y_variable,
     p_bounds[x_variable] = range_x
     p_bounds[y_variable] = range_y
     hatched_cases = []
+    if engine is not None:
+        engine.check_slice(x_variable, y_variable, range_x, range_y, expand_cycles)
+        valid_cases_function = lambda p_bounds, strict=True: engine.valid_cases(p_vals, strict=strict)
+    else:
+        valid_cases_function = self.valid_cases
     if included_cases is not None:
         included_cases = [i.case_number for i in self(included_cases)]
         if self.number_of_cases < 1e5:
-            valid_cases = self.valid_cases(p_bounds=p_bounds)
-            valid_nonstrict = self.valid_cases(p_bounds=p_bounds, strict=False)
+            valid_cases = valid_cases_function(p_bounds=p_bounds)
+            valid_nonstrict = valid_cases_function(p_bounds=p_bounds, strict=False)
             hatched_cases = [i for i in valid_cases if i not in included_cases]
             valid_nonstrict = [i for i in valid_cases if i in included_cases]
             valid_cases = [i for i in valid_cases if i in included_cases]
@@ -381,14 +638,19 @@ def draw_2D_slice(self, ax, p_vals, x_variable, y_variable,
             valid_cases = [i for i in included_cases if self(i).is_valid(p_bounds=p_bounds)]
             valid_nonstrict = []
     else:
-        valid_cases = self.valid_cases(p_bounds=p_bounds)
-        valid_nonstrict = self.valid_cases(p_bounds=p_bounds, strict=False)
+        valid_cases = valid_cases_function(p_bounds=p_bounds)
+        valid_nonstrict = valid_cases_function(p_bounds=p_bounds, strict=False)
         valid_nonstrict = [i for i in valid_nonstrict if i not in valid_cases]
     if len(valid_cases)+len(valid_nonstrict) == 0:
         # fill black
         return
-    case_int_list = self.intersecting_cases(intersections, valid_cases+valid_nonstrict,
-                                            p_bounds=p_bounds, strict=False)
+    if engine is not None:
+        case_int_list = engine.valid_intersecting_cases(intersections, valid_cases+valid_nonstrict,
+                                                        p_vals, strict=False)
+        case_int_list = [', '.join(i) for i in case_int_list]
+    else:
+        case_int_list = self.intersecting_cases(intersections, valid_cases+valid_nonstrict,
+                                                p_bounds=p_bounds, strict=False)
     colors = dict()
     if color_dict is None:
         color_dict = dict()
@@ -396,6 +658,10 @@ def draw_2D_slice(self, ax, p_vals, x_variable, y_variable,
         kwargs['ec']='none'
     ## hatched_cases = self.cycles_to_subcases(hatched_cases)
     for case_num in hatched_cases:
+        if engine is not None:
+            engine.draw(ax, [case_num], p_vals, fc='none',
+                        ec=(0.8, 0.8, 0.8, 1.), hatch='/', lw=0.5)
+            continue
         case = self(case_num)
         case.draw_2D_slice(ax, p_vals, x_variable, y_variable,
                            range_x, range_y, fc='none', 
@@ -411,6 +677,9 @@ def draw_2D_slice(self, ax, p_vals, x_variable, y_variable,
         key = ', '.join(case_nums)
         if key not in color_dict:
             color_dict[key] = cmap((1.*case_int_list.index(case_int))/len(case_int_list))
+        if engine is not None:
+            engine.draw(ax, str(case_int).split(', '), p_vals, fc=color_dict[key], **kwargs)
+        else:
             V = case_int.draw_2D_slice(ax, p_vals, x_variable, y_variable,
                                        range_x, range_y, fc=color_dict[key], **kwargs)
         colors[key] = color_dict[key]
@@ -480,7 +749,7 @@ def draw_2D_slice_interactive(self, p_vals, x_variable, y_variable,
     update = SliderCallback(self, sliders, c_axs, cdict, 
                             ax, p_vals, x_variable, y_variable, range_x, range_y,
                             **kwargs)
-    update(1)
+    update.redraw()
     for i in sliders:
         sliders[i].on_changed(update)
     plt.show()
@@ -550,37 +819,39 @@ def draw_3D_slice(self, ax, p_vals, x_variable, y_variable,z_variable, range_x,
 
 def calculate_case_2D_function(case, function, p_vals, x_variable, y_variable, 
                         range_x, range_y, resolution, log_linear):
-    X, Y, Z, clim, patch = case.draw_2D_ss_function_data(function, 
+    X, Y, Z, clim, path = case.draw_2D_ss_function_data(function, 
                                                          p_vals, x_variable, y_variable,
                                                          range_x, range_y, 
                                                          resolution=resolution,
                                                          log_linear=log_linear
                                                          )
-    return case, X, Y, Z, clim, patch
+    # Z is returned through the shared memory of the executor, and the grid
+    # is rebuilt from its axes.
+    return Z, (X[0, :], Y[:, 0], clim, path)
 
 @monkeypatch_method(dspace.models.designspace.DesignSpace)   
 def _draw_2D_ss_function_parallel(self, ax, all_cases, function, p_vals, x_variable, y_variable, 
                         range_x, range_y, resolution=100, log_linear=False, 
                         zlim=None, included_cases=None, colorbar=True,
-                        cmap=mt.cm.jet, surface=False, **kwargs):
-    try:
-        from joblib import Parallel, delayed, cpu_count
-    except:
-        return None
+                        cmap=mt.cm.jet, surface=False, workers=None, **kwargs):
     min_lim = 1e20
     max_lim = -1e20
     patches = []
-    cores = cpu_count()
-    results = Parallel(n_jobs=min(cores, len(all_cases)))(delayed(calculate_case_2D_function)(self(i), 
-                                                                      function,
-                                                                      p_vals, 
-                                                                      x_variable,
-                                                                      y_variable,
-                                                                      range_x,
-                                                                      range_y,
-                                                                      resolution,
-                                                                      log_linear)
-                                                                      for i in all_cases)
+    grids = self.executor(workers).map_case_arrays(calculate_case_2D_function,
+                                                   all_cases,
+                                                   (resolution+1, resolution+1),
+                                                   args=(function,
+                                                         p_vals,
+                                                         x_variable,
+                                                         y_variable,
+                                                         range_x,
+                                                         range_y,
+                                                         resolution,
+                                                         log_linear))
+    results = list()
+    for case, (Z, (x, y, clim, path)) in zip([self(i) for i in all_cases], grids):
+        X, Y = np.meshgrid(x, y)
+        results.append((case, X, Y, np.ma.masked_invalid(Z), clim, path))
     for i in results:
         case, X, Y, Z, clim, path = i
         pc = case.draw_2D_ss_function_from_data(ax, X, Y, Z, clim, path, 
@@ -664,7 +935,7 @@ def draw_2D_ss_function(self, ax, function, p_vals, x_variable, y_variable,
             all_cases.append(case)
         else:
             all_cases.append(case)
-    if parallel is False:
+    if parallel is False or len(all_cases) == 0:
         patches = None
     else:  
         patches = self._draw_2D_ss_function_parallel(ax,
@@ -681,6 +952,7 @@ def draw_2D_ss_function(self, ax, function, p_vals, x_variable, y_variable,
                                                      included_cases=included_cases,
                                                      colorbar=colorbar,
                                                      cmap=cmap, surface=surface,
+                                                     workers=None if parallel is True else parallel,
                                                      **kwargs)
     if patches is not None:
         return patches  
@@ -990,6 +1262,7 @@ def draw_network_graph(self, ax, graph_type='dot', p_vals=None,
                        resolution=100, cmap=mt.cm.jet, colorbar=True,
                        show_regulation=True,
                        **kwargs):
+    from dspace.graphs.designspace_graph import GraphGenerator
     g = GraphGenerator(self)
     dot_data = g.graph(graph_type=graph_type,
                        p_vals=p_vals,
@@ -0,0 +1,320 @@
+''' Profiling of the calls to the design space toolbox C library.
+
+While a Profile is active, the functions of dspace.SWIG.dspace_interface are
+replaced, in every loaded dspace module, by wrappers that record the number of
+calls and the time spent in each function, grouped by the model method that
+made the call. Pointers returned by the library are followed until they are
+passed to the matching free function, which gives the number of C objects of
+each type allocated, freed and still alive. The original functions are put
+back when the profile ends, so profiling has no cost when it is not active.
+
+    with dspace.profile() as prof:
+        ds = dspace.DesignSpace(eq)
+        ds.valid_cases()
+    print(prof.report(by='caller', sort='time'))
+'''
+
+import re
+import sys
+import types
+from timeit import default_timer
+
+import dspace.SWIG.dspace_interface as _interface
+
+_swig_type = re.compile(r"type '([^']*)'")
+
+_active = list()
+_patches = list()
+
+
+def _library_functions():
+    ''' The Python functions of the SWIG interface, by name. '''
+    functions = dict()
+    for name, value in _interface.__dict__.items():
+        if name.startswith('DS') is False:
+            continue
+        if isinstance(value, types.FunctionType) is False:
+            continue
+        functions[name] = value
+    return functions
+
+
+def _freed_types(functions):
+    ''' The C type freed by each free function, e.g. DSCase for DSCaseFree. '''
+    freed = dict()
+    for name in functions:
+        if name.endswith('Free') is False or name == 'DSSecureFree':
+            continue
+        freed[name] = name[:-len('Free')]
+    return freed
+
+
+def _caller(frame):
+    code = frame.f_code
+    name = getattr(code, 'co_qualname', None)
+    if name is None:
+        name = code.co_name
+        if code.co_argcount > 0 and code.co_varnames[0] == 'self':
+            instance = frame.f_locals.get('self')
+            if instance is not None:
+                name = type(instance).__name__ + '.' + name
+    return frame.f_globals.get('__name__', '?') + '.' + name
+
+
+def _pointer(value):
+    ''' The C type and address of a pointer returned by the library, or None
+        for any other value.
+    '''
+    if type(value).__name__ != 'SwigPyObject':
+        return None
+    match = _swig_type.search(repr(value))
+    if match is None:
+        return None
+    return match.group(1).rstrip(' *'), int(value)
+
+
+def _wrapper(name, function, freed_type):
+    def wrapper(*args):
+        if len(_active) == 0:
+            return function(*args)
+        start = default_timer()
+        result = function(*args)
+        elapsed = default_timer() - start
+        caller = _caller(sys._getframe(1))
+        pointer = _pointer(result)
+        if freed_type is not None and len(args) > 0:
+            released = _pointer(args[0])
+        else:
+            released = None
+        for profile in _active:
+            profile._record(name, caller, elapsed, pointer, released)
+        return result
+    wrapper.__name__ = name
+    wrapper.__doc__ = function.__doc__
+    wrapper._profiled_function = function
+    return wrapper
+
+
+def _install():
+    functions = _library_functions()
+    freed = _freed_types(functions)
+    wrappers = dict((name, _wrapper(name, function, freed.get(name)))
+                    for name, function in functions.items())
+    originals = dict((id(function), name) for name, function in functions.items())
+    for module_name, module in list(sys.modules.items()):
+        if module is None:
+            continue
+        if module_name != 'dspace' and module_name.startswith('dspace.') is False:
+            continue
+        if module is _interface:
+            # Modules imported later copy the functions of the interface, so
+            # its own namespace is left untouched.
+            continue
+        namespace = module.__dict__
+        for attribute, value in list(namespace.items()):
+            name = originals.get(id(value))
+            if name is None or functions[name] is not value:
+                continue
+            namespace[attribute] = wrappers[name]
+            _patches.append((namespace, attribute, value))
+
+
+def _uninstall():
+    while len(_patches) > 0:
+        namespace, attribute, value = _patches.pop()
+        namespace[attribute] = value
+    # Wrappers copied by modules imported while profiling are restored too.
+    for module_name, module in list(sys.modules.items()):
+        if module is None:
+            continue
+        if module_name != 'dspace' and module_name.startswith('dspace.') is False:
+            continue
+        namespace = module.__dict__
+        for attribute, value in list(namespace.items()):
+            function = getattr(value, '_profiled_function', None)
+            if function is not None and isinstance(value, types.FunctionType) is True:
+                namespace[attribute] = function
+
+
+class Profile(object):
+    ''' Call counts, times and C object counts of the design space toolbox
+        library, recorded while the profile is active.
+
+    Profiles can be nested; calls are recorded by every active profile. Calls
+    made by modules imported while a profile is active, or by other processes,
+    are not recorded.
+    '''
+
+    def __init__(self):
+        setattr(self, 'calls', dict())
+        setattr(self, 'times', dict())
+        setattr(self, 'allocated', dict())
+        setattr(self, 'freed', dict())
+        setattr(self, 'live', dict())
+        setattr(self, 'elapsed', 0.)
+        setattr(self, '_start', None)
+
+    def start(self):
+        if self in _active:
+            raise ValueError('Profile is already active')
+        if len(_active) == 0:
+            _install()
+        _active.append(self)
+        self._start = default_timer()
+        return self
+
+    def stop(self):
+        if self not in _active:
+            return
+        _active.remove(self)
+        if len(_active) == 0:
+            _uninstall()
+        self.elapsed += default_timer() - self._start
+        self._start = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    @property
+    def active(self):
+        return self in _active
+
+    def _record(self, name, caller, elapsed, pointer, released):
+        key = (name, caller)
+        self.calls[key] = self.calls.get(key, 0) + 1
+        self.times[key] = self.times.get(key, 0.) + elapsed
+        if pointer is not None:
+            c_type, address = pointer
+            live = self.live.setdefault(c_type, set())
+            if address not in live:
+                live.add(address)
+                self.allocated[c_type] = self.allocated.get(c_type, 0) + 1
+        if released is not None:
+            c_type, address = released
+            live = self.live.get(c_type)
+            if live is not None and address in live:
+                live.remove(address)
+                self.freed[c_type] = self.freed.get(c_type, 0) + 1
+
+    def reset(self):
+        ''' Discards everything recorded so far. '''
+        self.calls.clear()
+        self.times.clear()
+        self.allocated.clear()
+        self.freed.clear()
+        self.live.clear()
+        self.elapsed = 0.
+        if self._start is not None:
+            self._start = default_timer()
+
+    def rows(self, by='function', sort='time'):
+        ''' The recorded calls, grouped and sorted.
+
+        Kwargs:
+            by (str): 'function' to group calls by library function, 'caller'
+                by the calling method, or 'both' by function and caller.
+            sort (str): 'time', 'calls', 'mean' or 'name'. Rows are sorted in
+                decreasing order, except by name.
+
+        Returns:
+            A list of dictionaries with the name, calls, time and mean time of
+            each group.
+        '''
+        if by not in ('function', 'caller', 'both'):
+            raise ValueError('by must be function, caller or both')
+        if sort not in ('time', 'calls', 'mean', 'name'):
+            raise ValueError('sort must be time, calls, mean or name')
+        groups = dict()
+        for key, calls in self.calls.items():
+            function, caller = key
+            if by == 'function':
+                name = function
+            elif by == 'caller':
+                name = caller
+            else:
+                name = caller + ' -> ' + function
+            group = groups.setdefault(name, [0, 0.])
+            group[0] += calls
+            group[1] += self.times[key]
+        rows = [dict(name=name, calls=calls, time=time, mean=time/calls)
+                for name, (calls, time) in groups.items()]
+        if sort == 'name':
+            rows.sort(key=lambda row: row['name'])
+        else:
+            rows.sort(key=lambda row: (-row[sort], row['name']))
+        return rows
+
+    def objects(self):
+        ''' The C objects of each type allocated and freed while profiling,
+            and those of them still alive.
+
+        Pointers returned by the library are counted once per address, when
+        first seen. Objects owned by other objects, which are never freed on
+        their own, remain alive.
+        '''
+        rows = list()
+        for c_type in sorted(self.live.keys()):
+            rows.append(dict(type=c_type,
+                             allocated=self.allocated.get(c_type, 0),
+                             freed=self.freed.get(c_type, 0),
+                             live=len(self.live[c_type])))
+        return rows
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    @property
+    def total_time(self):
+        return sum(self.times.values())
+
+    def report(self, by='function', sort='time', limit=30):
+        ''' A table of the recorded calls and C objects.
+
+        Kwargs:
+            by (str): How calls are grouped. See rows.
+            sort (str): How calls are sorted. See rows.
+            limit (int): The maximum number of rows of calls. All rows are
+                shown if None.
+        '''
+        elapsed = self.elapsed
+        if self._start is not None:
+            elapsed += default_timer() - self._start
+        lines = ['%d calls, %.4f s in the library, %.4f s elapsed' % (self.total_calls,
+                                                                    self.total_time,
+                                                                    elapsed)]
+        rows = self.rows(by=by, sort=sort)
+        if limit is not None:
+            rows = rows[:limit]
+        width = max([len(row['name']) for row in rows] + [len(by)])
+        lines.append('')
+        lines.append('%-*s %10s %12s %12s' % (width, by, 'calls', 'time (s)', 'mean (s)'))
+        for row in rows:
+            lines.append('%-*s %10d %12.6f %12.6f' % (width, row['name'], row['calls'],
+                                                      row['time'], row['mean']))
+        objects = self.objects()
+        if len(objects) > 0:
+            width = max([len(row['type']) for row in objects] + [4])
+            lines.append('')
+            lines.append('%-*s %10s %10s %10s' % (width, 'type', 'allocated', 'freed', 'live'))
+            for row in objects:
+                lines.append('%-*s %10d %10d %10d' % (width, row['type'], row['allocated'],
+                                                      row['freed'], row['live']))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+def profile():
+    ''' A new Profile, to be used as a context manager.
+
+        with dspace.profile() as prof:
+            ds.valid_cases()
+        print(prof.report(by='caller'))
+    '''
+    return Profile()
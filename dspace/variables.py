@@ -6,13 +6,17 @@
 
 from collections import OrderedDict
 
+import numpy as np
+
 ##
 # Required C api functionality.
 ##
 SWIG_REQUIREMENTS = ['DSVariablePoolSetReadWriteAdd',
                      'DSVariablePoolFree',
+                     'DSVariablePoolCopy',
                      'DSVariablePoolNumberOfVariables',
                      'DSVariablePoolVariableAtIndex',
+                     'DSVariablePoolValuesAsVector',
                      'DSVariablePoolAlloc',
                      'DSVariablePoolSetValueForVariableWithName',
                      'DSVariablePoolAddVariableWithName',
@@ -31,7 +35,13 @@ class VariablePool(dict):
         dict and is used to reference dependent and independent variables, as 
         well as system parameters. The dict object is ordered by the internal
         C data structure.
+
+        The position of each variable is kept in a dictionary, so that
+        existing variables are set with a single call to the C library, and
+        values can be set and read in bulk as arrays ordered like the pool.
     '''
+
+    __slots__ = ('_swigwrapper', '_keys', '_index')
     
     def __init__(self, names=None, **kwargs):
         ''' Init method only accepts a list of names. A dictionary cannot be used
@@ -42,6 +52,7 @@ class VariablePool(dict):
         super(VariablePool, self).__init__()
         setattr(self, '_swigwrapper', None)
         setattr(self, '_keys', list())
+        setattr(self, '_index', dict())
         if isinstance(names, list) is True:
             names = OrderedDict([(key,1.) for key in names])
         self.update(names=names, **kwargs)
@@ -57,14 +68,20 @@ class VariablePool(dict):
         self._swigwrapper = swigwrapper
         if self._swigwrapper is None:
             return
+        if hasattr(self, '_keys') is False:
+            setattr(self, '_keys', list())
+            setattr(self, '_index', dict())
         for i in range(0, DSVariablePoolNumberOfVariables(swigwrapper)):
-                variable = DSVariablePoolVariableAtIndex(swigwrapper, i)
-                self[variable[0]] = variable[1]
+            name, value = DSVariablePoolVariableAtIndex(swigwrapper, i)
+            if name not in self._index:
+                self._index[name] = len(self._keys)
+                self._keys.append(name)
+            super(VariablePool, self).__setitem__(name, value)
 
     def __del__(self):
         ''' Method to destroy a VariablePool object. The wrapped C construct must be
             freed to avoid memory leaks.'''
-        if self._swigwrapper is None:
+        if getattr(self, '_swigwrapper', None) is None:
             return
         DSVariablePoolSetReadWriteAdd(self._swigwrapper)
         DSVariablePoolFree(self._swigwrapper)
@@ -79,28 +96,76 @@ class VariablePool(dict):
         return odict
     
     def __setstate__(self, state):
-        setattr(self, '_swigwrapper', None)
+        if hasattr(self, '_index') is False:
+            setattr(self, '_swigwrapper', None)
+            setattr(self, '_keys', list())
+            setattr(self, '_index', dict())
         for key, value in state:
             self[key] = value
         
     def __setitem__(self, name, value):
-        if hasattr(self, '_swigwrapper') is False:
+        try:
+            index = self._index
+        except AttributeError:
             setattr(self, '_swigwrapper', None)
-        if hasattr(self, '_keys') is False:
             setattr(self, '_keys', list())
-        if self._swigwrapper == None:
-            self._swigwrapper = DSVariablePoolAlloc()
-        if isinstance(name, str) is False:
-            raise TypeError('VariablePool keys must be strings')
-        if DSVariablePoolHasVariableWithName(self._swigwrapper, name) == False:
-            DSVariablePoolAddVariableWithName(self._swigwrapper, name)
-        if name not in self._keys:
-            self._keys.append(name)
+            setattr(self, '_index', dict())
+            index = self._index
+        if name not in index:
+            self._add_variable(name)
         value = float(value)
         DSVariablePoolSetValueForVariableWithName(self._swigwrapper,
                                                   name,
                                                   value)
         super(VariablePool, self).__setitem__(name, value)
+
+    def _add_variable(self, name):
+        if isinstance(name, str) is False:
+            raise TypeError('VariablePool keys must be strings')
+        if self._swigwrapper is None:
+            self._swigwrapper = DSVariablePoolAlloc()
+        if DSVariablePoolHasVariableWithName(self._swigwrapper, name) == False:
+            DSVariablePoolAddVariableWithName(self._swigwrapper, name)
+        self._index[name] = len(self._keys)
+        self._keys.append(name)
+
+    def set_values(self, values, names=None):
+        ''' Sets the values of many variables at once.
+
+        Args:
+            values (array): The values, in the order of the pool.
+
+        Kwargs:
+            names (list): The variables set, in the order of values. Defaults
+                to every variable of the pool. Variables not in the pool are
+                added to it.
+        '''
+        if names is None:
+            names = self._keys
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) != len(names):
+            raise ValueError('Expected ' + str(len(names)) + ' values, got ' + str(len(values)))
+        for name in names:
+            if name not in self._index:
+                self._add_variable(name)
+        swigwrapper = self._swigwrapper
+        setitem = super(VariablePool, self).__setitem__
+        for name, value in zip(names, values.tolist()):
+            DSVariablePoolSetValueForVariableWithName(swigwrapper, name, value)
+            setitem(name, value)
+
+    def values_array(self, names=None):
+        ''' The values of the variables as an array.
+
+        Kwargs:
+            names (list): The variables, in the order of the array. Defaults
+                to every variable, in the order of the pool.
+        '''
+        if names is not None:
+            return np.array([self[name] for name in names], dtype=float)
+        if self._swigwrapper is None:
+            return np.array([], dtype=float)
+        return np.array(DSVariablePoolValuesAsVector(self._swigwrapper, False), dtype=float).ravel()
     
     def keys(self):
         keys = list()
@@ -114,10 +179,16 @@ class VariablePool(dict):
                     
     def copy(self):
         newPool = VariablePool()
-        for i in self._keys:
-            newPool[i] = self[i]
+        if self._swigwrapper is None:
+            return newPool
+        swigwrapper = DSVariablePoolCopy(self._swigwrapper)
+        DSVariablePoolSetReadWriteAdd(swigwrapper)
+        newPool.set_swigwrapper(swigwrapper)
         return newPool
 
     def index(self, name):
-        return self.keys().index(name)
+        try:
+            return self._index[name]
+        except KeyError:
+            raise ValueError(str(name) + ' is not in the VariablePool')
         
@@ -0,0 +1,48 @@
+''' Import time budget of the dspace package, and the attributes it loads
+    when first used.
+
+Each check that imports dspace runs in a new interpreter, so that the modules
+loaded by the test runner do not affect it.
+'''
+
+import sys
+import subprocess
+import unittest
+
+from dspace.benchmarks.imports import check_import_budget, format_import_check
+
+
+def _run(script):
+    return subprocess.check_output([sys.executable, '-c', script]).decode('utf-8').strip()
+
+
+class TestImportBudget(unittest.TestCase):
+
+    def test_import_budget(self):
+        result = check_import_budget()
+        self.assertTrue(result['passed'], format_import_check(result))
+
+    def test_full_system_resolves(self):
+        output = _run('import sys\n'
+                      'import dspace\n'
+                      'loaded = "dspace.models.fullsystem" in sys.modules\n'
+                      'print(loaded, dspace.FullSystem.__module__, "FullSystem" in dir(dspace))')
+        self.assertEqual(output, 'False dspace.models.fullsystem True')
+
+    def test_draw_methods_resolve(self):
+        output = _run('import sys\n'
+                      'import dspace\n'
+                      'ds = dspace.DesignSpace(dspace.Equations(["X1. = a1 - b1*X1"]), cache=False)\n'
+                      'loaded = "dspace.plotutils" in sys.modules\n'
+                      'print(loaded, callable(ds.draw_2D_slice), callable(ds(1).draw_2D_slice))')
+        self.assertEqual(output, 'False True True')
+
+    def test_missing_attributes_raise(self):
+        output = _run('import dspace\n'
+                      'ds = dspace.DesignSpace(dspace.Equations(["X1. = a1 - b1*X1"]), cache=False)\n'
+                      'print(hasattr(dspace, "NotAnAttribute"), hasattr(ds, "draw_nothing"))')
+        self.assertEqual(output, 'False False')
+
+
+if __name__ == '__main__':
+    unittest.main()